@@ -1,9 +1,35 @@
+import json
+from typing import Dict, List, Tuple
 from apps.api.settings import settings
 from ai.llm import get_chat_client
+from ai.plan_cache import cache_key, cached
+from ai.prompt_builder import build_context
 
-_client = get_chat_client()
+# Bump whenever the prompt below changes so cached letters are not reused.
+PROMPT_VERSION = "cover-letter-v2"
+TEMPERATURE = 0.4
 
-def tailored_cover_letter(profile: dict, job: dict) -> str:
+def _compact(profile: dict, job: dict) -> Tuple[dict, dict]:
+    # JD markup/boilerplate and off-topic resume sections never reach the prompt
+    ctx = build_context(job.get("title", ""), job.get("company", ""), job.get("description_html"), profile.get("resume_text"))
+    job = {k: v for k, v in job.items() if k != "description_html"}
+    if ctx.jd_text:
+        job["description"] = ctx.jd_text
+    return {**profile, "resume_text": ctx.resume_text}, job
+
+def _key(profile: dict, job: dict) -> str:
+    return cache_key(
+        "cover_letter",
+        json.dumps(job, sort_keys=True, default=str),
+        json.dumps(profile, sort_keys=True, default=str),
+        settings.LLM_MODEL, TEMPERATURE, PROMPT_VERSION,
+    )
+
+def tailored_cover_letter(profile: dict, job: dict, use_cache: bool = True) -> str:
+    profile, job = _compact(profile, job)
+    return cached(_key(profile, job), lambda: _complete(profile, job), bypass=not use_cache, cacheable=bool)
+
+def _messages(profile: dict, job: dict) -> List[Dict[str, str]]:
     prompt = f"""
 Write a one-page, high-impact cover letter for the following candidate and role.
 Candidate:
@@ -14,8 +40,10 @@ Role:
 
 Tone: confident, specific, outcomes-focused, and aligned to the company's mission.
 """
-    msg = [
+    return [
         {"role": "system", "content": "You write ATS-friendly cover letters."},
         {"role": "user", "content": prompt},
     ]
-    return _client.chat(model=settings.LLM_MODEL, messages=msg, temperature=0.4)
+
+def _complete(profile: dict, job: dict) -> str:
+    return get_chat_client().chat(model=settings.LLM_MODEL, messages=_messages(profile, job), temperature=TEMPERATURE)
@@ -0,0 +1,53 @@
+# ai/embeddings.py
+# CPU-only, offline text embeddings: a signed hashing vectorizer over
+# unigrams + bigrams with sublinear TF, L2-normalized into a small dense
+# vector. No model download, deterministic across processes (crc32, not hash()).
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+DIM = 256
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+_STOP = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to we will with you your".split()
+)
+
+
+def _features(text: str) -> Counter:
+    toks = [t for t in _WORD.findall(_TAG.sub(" ", text).lower()) if t not in _STOP]
+    feats = Counter(toks)
+    feats.update(f"{a} {b}" for a, b in zip(toks, toks[1:]))
+    return feats
+
+
+def embed(text: Optional[str], dim: int = DIM) -> np.ndarray:
+    vec = np.zeros(dim, dtype=np.float32)
+    for feat, tf in _features(text or "").items():
+        h = zlib.crc32(feat.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vec[h % dim] += sign * (1.0 + math.log(tf))
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+def embed_many(texts: Iterable[Optional[str]], dim: int = DIM) -> np.ndarray:
+    texts = list(texts)
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, t in enumerate(texts):
+        out[i] = embed(t, dim)
+    return out
+
+
+def job_text(title: str, company: str = "", description: Optional[str] = None) -> str:
+    # title twice: it is the strongest signal and descriptions are long
+    return f"{title}\n{title}\n{company}\n{description or ''}"
+
+
+def profile_text(summary: Optional[str], skills: List[str], resume_text: Optional[str]) -> str:
+    return f"{summary or ''}\n{' '.join(skills or [])}\n{' '.join(skills or [])}\n{resume_text or ''}"
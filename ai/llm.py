@@ -1,44 +1,146 @@
-from typing import List, Dict, Any
+import asyncio
+import threading
+import weakref
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional
 from apps.api.settings import settings
 
-# Simple shim to unify different SDKs into a single .chat(...) call
+# Simple shim to unify different SDKs into a single .chat(...) / .achat(...) call,
+# plus .stream(...) / .astream(...) yielding text deltas as they arrive.
+# Provider SDK clients own an HTTP connection pool, so they are built once per
+# process (see get_chat_client) and reused by every request. Async clients'
+# pools are tied to an event loop, so those are built once per loop.
 class ChatClient:
-    def chat(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3) -> str:
+    def chat(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> str:
         raise NotImplementedError
 
-class OpenAIChat(ChatClient):
+    async def achat(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> str:
+        # Providers without an async SDK run the blocking call off the event loop
+        return await asyncio.to_thread(self.chat, model, messages, temperature, **kwargs)
+
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> Iterator[str]:
+        # Non-streaming providers deliver the whole completion as one delta
+        yield self.chat(model, messages, temperature, **kwargs)
+
+    async def astream(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> AsyncIterator[str]:
+        yield await self.achat(model, messages, temperature, **kwargs)
+
+class _OpenAICompatible(ChatClient):
+    """Shared logic for SDKs exposing OpenAI-style chat.completions."""
     def __init__(self):
-        from openai import OpenAI
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = self._make_sync()
+        # async clients are bound to the loop they were first used on
+        self._aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._alock = threading.Lock()
+
+    def _make_sync(self):
+        raise NotImplementedError
+
+    def _make_async(self):
+        raise NotImplementedError
+
+    @property
+    def aclient(self):
+        """Async client for the running event loop, built on first use there."""
+        loop = asyncio.get_running_loop()
+        client = self._aclients.get(loop)
+        if client is None:
+            with self._alock:
+                client = self._aclients.get(loop)
+                if client is None:
+                    client = self._aclients[loop] = self._make_async()
+        return client
 
-    def chat(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3) -> str:
+    def chat(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> str:
         resp = self.client.chat.completions.create(
-            model=model, messages=messages, temperature=temperature
+            model=model, messages=messages, temperature=temperature, **kwargs
         )
-        return resp.choices[0].message.content.strip()
+        return (resp.choices[0].message.content or "").strip()
 
-class GroqChat(ChatClient):
-    def __init__(self):
-        # pip install groq
-        from groq import Groq
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+    async def achat(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> str:
+        resp = await self.aclient.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, **kwargs
+        )
+        return (resp.choices[0].message.content or "").strip()
+
+    @staticmethod
+    def _delta(chunk) -> str:
+        return (chunk.choices[0].delta.content or "") if chunk.choices else ""
 
-    def chat(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3) -> str:
-        # Groq uses OpenAI-compatible Chat Completions
+    def stream(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> Iterator[str]:
         resp = self.client.chat.completions.create(
-            model=model, messages=messages, temperature=temperature
+            model=model, messages=messages, temperature=temperature, stream=True, **kwargs
         )
-        return resp.choices[0].message.content.strip()
+        try:
+            for chunk in resp:
+                delta = self._delta(chunk)
+                if delta:
+                    yield delta
+        finally:
+            # closing early (consumer stopped iterating) aborts the HTTP stream
+            resp.close()
 
-def get_chat_client() -> ChatClient:
+    async def astream(self, model: str, messages: List[Dict[str, str]], temperature: float = 0.3, **kwargs: Any) -> AsyncIterator[str]:
+        resp = await self.aclient.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, stream=True, **kwargs
+        )
+        try:
+            async for chunk in resp:
+                delta = self._delta(chunk)
+                if delta:
+                    yield delta
+        finally:
+            await resp.close()
+
+class OpenAIChat(_OpenAICompatible):
+    def _make_sync(self):
+        from openai import OpenAI
+        return OpenAI(api_key=settings.OPENAI_API_KEY, timeout=settings.LLM_TIMEOUT_SECONDS)
+
+    def _make_async(self):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, timeout=settings.LLM_TIMEOUT_SECONDS)
+
+class GroqChat(_OpenAICompatible):
+    # pip install groq; Groq uses OpenAI-compatible Chat Completions
+    def _make_sync(self):
+        from groq import Groq
+        return Groq(api_key=settings.GROQ_API_KEY, timeout=settings.LLM_TIMEOUT_SECONDS)
+
+    def _make_async(self):
+        from groq import AsyncGroq
+        return AsyncGroq(api_key=settings.GROQ_API_KEY, timeout=settings.LLM_TIMEOUT_SECONDS)
+
+_PROVIDER_KEYS = {"openai": "OPENAI_API_KEY", "groq": "GROQ_API_KEY"}
+_PROVIDERS = {"openai": OpenAIChat, "groq": GroqChat}
+
+_client: Optional[ChatClient] = None
+_client_lock = threading.Lock()
+
+def is_configured() -> bool:
+    """True when the selected provider is supported and has an API key."""
+    key = _PROVIDER_KEYS.get(settings.LLM_PROVIDER)
+    return bool(key and getattr(settings, key))
+
+def _build_client() -> ChatClient:
     provider = settings.LLM_PROVIDER
-    if provider == "openai":
-        if not settings.OPENAI_API_KEY:
-            raise RuntimeError("OPENAI_API_KEY is not set in .env")
-        return OpenAIChat()
-    if provider == "groq":
-        if not settings.GROQ_API_KEY:
-            raise RuntimeError("GROQ_API_KEY is not set in .env")
-        return GroqChat()
-    # Extend here for anthropic/vertex/bedrock
-    raise RuntimeError(f"Unsupported LLM_PROVIDER: {provider}")
+    if provider not in _PROVIDERS:
+        # Extend here for anthropic/vertex/bedrock
+        raise RuntimeError(f"Unsupported LLM_PROVIDER: {provider}")
+    if not getattr(settings, _PROVIDER_KEYS[provider]):
+        raise RuntimeError(f"{_PROVIDER_KEYS[provider]} is not set in .env")
+    return _PROVIDERS[provider]()
+
+def get_chat_client() -> ChatClient:
+    """Process-wide client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+def reset_chat_client() -> None:
+    """Drop the shared client (e.g. after changing provider settings)."""
+    global _client
+    with _client_lock:
+        _client = None
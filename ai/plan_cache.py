@@ -0,0 +1,223 @@
+# ai/plan_cache.py
+# Content-addressed cache for LLM planning output (answers, cover letters).
+#
+# Keys hash everything that determines the completion: the normalized JD text,
+# resume text, model, temperature and prompt version. So a hit is always safe
+# to reuse, and any prompt change just needs a PROMPT_VERSION bump.
+# Tiers: local SQLite file (TTL + LRU eviction by entry count and bytes), then
+# optional Redis shared across processes.
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from apps.api.settings import settings
+
+log = logging.getLogger(__name__)
+
+_TAG = re.compile(r"<[^>]+>")
+_WS = re.compile(r"\s+")
+REDIS_PREFIX = "autoapply:plan:"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    return _WS.sub(" ", _TAG.sub(" ", text or "")).strip()
+
+
+def cache_key(kind: str, jd_text: str, resume_text: str, model: str, temperature: float, prompt_version: str) -> str:
+    h = hashlib.sha256()
+    for part in (kind, normalize_text(jd_text), normalize_text(resume_text), model, f"{temperature:.3f}", prompt_version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class PlanCache:
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 5000,
+        max_bytes: int = 200 * 1024 * 1024,
+        redis_url: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.redis_url = redis_url
+        self._redis = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    # ---- backends ----
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS plan_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_plan_cache_accessed ON plan_cache (accessed_at)")
+            self._db = db
+        return self._db
+
+    def _redis_call(self, fn: Callable, default=None):
+        if not self.redis_url:
+            return default
+        try:
+            if self._redis is None:
+                from redis import Redis
+                self._redis = Redis.from_url(self.redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+            return fn(self._redis)
+        except Exception as e:
+            log.warning("plan cache redis error: %s", e)
+            return default
+
+    # ---- api ----
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT value, created_at FROM plan_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] <= self.ttl_seconds:
+                db.execute("UPDATE plan_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits_local += 1
+                return json.loads(row[0])
+        raw = self._redis_call(lambda r: r.get(REDIS_PREFIX + key))
+        if raw is not None:
+            value = json.loads(raw)
+            self._put_local(key, raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+            self.hits_redis += 1
+            return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        self._put_local(key, payload)
+        self._redis_call(lambda r: r.set(REDIS_PREFIX + key, payload, ex=int(self.ttl_seconds)))
+
+    def _put_local(self, key: str, payload: str) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO plan_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._evict(db, now)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        n = db.execute("DELETE FROM plan_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM plan_cache").fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            # drop least recently used until both limits hold
+            victims = []
+            for key, size in db.execute("SELECT key, size FROM plan_cache ORDER BY accessed_at ASC"):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                victims.append((key,))
+                count -= 1
+                total -= size
+            db.executemany("DELETE FROM plan_cache WHERE key = ?", victims)
+            n += len(victims)
+        self.evictions += n
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], bypass: bool = False,
+                       cacheable: Callable[[Any], bool] = lambda v: True) -> Any:
+        """
+        Return the cached value for key or compute and store it. bypass=True
+        skips the lookup (forcing a fresh completion) but still refreshes the
+        entry. Values rejected by cacheable (e.g. fail-soft fallbacks) are not stored.
+        """
+        if bypass:
+            self.bypassed += 1
+        else:
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+        value = compute()
+        if value is not None and cacheable(value):
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_local + self.hits_redis + self.misses
+        with self._lock:
+            count, total = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM plan_cache"
+            ).fetchone()
+        return {
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round((self.hits_local + self.hits_redis) / lookups, 4) if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+            "evictions": self.evictions,
+            "redis_enabled": bool(self.redis_url),
+        }
+
+
+_default: Optional[PlanCache] = None
+_default_lock = threading.Lock()
+
+
+def get_plan_cache() -> Optional[PlanCache]:
+    global _default
+    if not settings.PLAN_CACHE_ENABLED:
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = PlanCache(
+                settings.PLAN_CACHE_PATH,
+                ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS,
+                max_entries=settings.PLAN_CACHE_MAX_ENTRIES,
+                max_bytes=settings.PLAN_CACHE_MAX_BYTES,
+                redis_url=settings.REDIS_URL if settings.PLAN_CACHE_REDIS else None,
+            )
+        return _default
+
+
+def cached(key: str, compute: Callable[[], Any], bypass: bool = False,
+           cacheable: Callable[[Any], bool] = lambda v: True) -> Any:
+    cache = get_plan_cache()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(key, compute, bypass=bypass, cacheable=cacheable)
+
+
+# Split lookup/store for callers that cannot wrap the completion in a single
+# callable (streaming): check first, stream on a miss, store the final value.
+def cached_get(key: str, bypass: bool = False) -> Optional[Any]:
+    cache = get_plan_cache()
+    if cache is None:
+        return None
+    if bypass:
+        cache.bypassed += 1
+        return None
+    return cache.get(key)
+
+
+def cached_set(key: str, value: Any, cacheable: Callable[[Any], bool] = lambda v: True) -> None:
+    cache = get_plan_cache()
+    if cache is not None and value is not None and cacheable(value):
+        cache.set(key, value)
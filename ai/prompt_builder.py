@@ -0,0 +1,266 @@
+# ai/prompt_builder.py
+# Prompt assembly under a token budget.
+#
+# Job descriptions arrive as HTML full of markup and legal boilerplate, and
+# resumes carry sections unrelated to the role. Before prompting we:
+#   1. convert HTML to compact text (block tags -> line breaks, lists -> "- ")
+#   2. drop boilerplate paragraphs (EEO, accommodation, privacy notices, ...)
+#   3. split both texts into chunks and rank them by similarity to the role
+#   4. pack the best chunks into the budget, re-emitted in original order
+# Token counts use tiktoken when installed, otherwise a ~4 chars/token estimate.
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from html import unescape
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ai.embeddings import embed, embed_many
+from apps.api.settings import settings
+
+_BLOCK_TAGS = frozenset(
+    "p div br h1 h2 h3 h4 h5 h6 ul ol li tr table section article header footer blockquote pre hr dd dt".split()
+)
+_SKIP_TAGS = frozenset(("script", "style", "noscript", "svg", "head", "template"))
+
+BOILERPLATE = re.compile(
+    "|".join((
+        r"equal (employment )?opportunity",
+        r"\beeo\b",
+        r"affirmative action",
+        r"regardless of (race|color|religion|sex|gender|age|national origin)",
+        r"without regard to (race|color|religion|sex|gender|age|national origin)",
+        r"sexual orientation,? gender identity",
+        r"protected veteran",
+        r"reasonable accommodations?",
+        r"e-verify",
+        r"pay transparency",
+        r"(applicant|candidate) privacy (notice|policy)",
+        r"fair chance (ordinance|act)",
+        r"arrest (and|or) conviction records",
+        r"we do not accept unsolicited (resumes|agency)",
+        r"recruitment (agencies|fraud)",
+    )),
+    re.IGNORECASE,
+)
+
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANKS = re.compile(r"\n{3,}")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+# JD sections worth keeping even when they share few words with the title
+_REQUIREMENTS = re.compile(
+    r"responsibilit|requirement|qualification|what you.?ll do|you will|you.?ll|must have|nice to have|experience with|skills",
+    re.IGNORECASE,
+)
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS and tag != "li":
+            # list items only break before, so a list stays one paragraph
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(html: Optional[str]) -> str:
+    """Compact plain text from an HTML fragment (also accepts plain text)."""
+    if not html:
+        return ""
+    if "<" not in html:
+        text = unescape(html)
+    else:
+        parser = _TextExtractor()
+        parser.feed(html)
+        parser.close()
+        text = "".join(parser.parts)
+    return compact_whitespace(text)
+
+
+def compact_whitespace(text: str) -> str:
+    lines = (_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return _BLANKS.sub("\n\n", "\n".join(lines)).strip()
+
+
+def drop_boilerplate(text: str) -> str:
+    return "\n".join(p for p in text.split("\n") if not BOILERPLATE.search(p))
+
+
+# ---- token counting ----
+try:  # optional: exact counts for OpenAI models
+    import tiktoken
+    _ENC = tiktoken.get_encoding("o200k_base")
+except Exception:  # not installed / no encoding data
+    _ENC = None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENC is not None:
+        return len(_ENC.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+# ---- chunking / ranking / packing ----
+def chunk_text(text: str, max_tokens: int = 120) -> List[str]:
+    """
+    Paragraph-ish chunks. Consecutive lines are merged up to max_tokens, a
+    blank line ends a chunk unless the chunk so far is a lone heading (so
+    headings stay attached to their section), and overlong paragraphs are
+    split on sentence boundaries.
+    """
+    chunks: List[str] = []
+    buf: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal buf, size
+        if buf:
+            chunks.append("\n".join(buf))
+        buf, size = [], 0
+
+    for para in text.split("\n"):
+        para = para.strip()
+        if not para:
+            if not (len(buf) == 1 and _is_heading(buf[0])):
+                flush()
+            continue
+        n = count_tokens(para)
+        if n > max_tokens:
+            flush()
+            for sent in _SENTENCE.split(para):
+                m = count_tokens(sent)
+                if size + m > max_tokens:
+                    flush()
+                buf.append(sent)
+                size += m
+            flush()
+            continue
+        if size + n > max_tokens:
+            flush()
+        buf.append(para)
+        size += n
+    flush()
+    return chunks
+
+
+def _is_heading(line: str) -> bool:
+    return count_tokens(line) <= 12 and not line.endswith((".", "!", "?")) and not line.startswith("- ")
+
+
+def _jd_prior(chunk: str) -> float:
+    # requirement-style sections and bullet lists carry most of a JD's signal
+    return (0.15 if _REQUIREMENTS.search(chunk) else 0.0) + (0.1 if "\n- " in f"\n{chunk}" else 0.0)
+
+
+def pack(chunks: Sequence[str], query: str, budget: int, keep_first: int = 0,
+         prior: Optional[Sequence[float]] = None) -> str:
+    """
+    Greedily keep the chunks most similar to query (plus an optional
+    per-chunk prior) until budget tokens are used. The first keep_first
+    chunks are always considered first (e.g. the role summary at the top of
+    a JD). Output preserves the original order; the "\n" between chunks
+    counts against the budget.
+    """
+    if not chunks or budget <= 0:
+        return ""
+    sizes = [count_tokens(c) for c in chunks]
+    sep = count_tokens("\n")
+    if sum(sizes) + sep * (len(chunks) - 1) <= budget:
+        return "\n".join(chunks)
+    sims = embed_many(chunks) @ embed(query)
+    if prior is not None:
+        sims = sims + np.asarray(prior, dtype=np.float32)
+    order = list(range(min(keep_first, len(chunks)))) + [
+        int(i) for i in np.argsort(-sims, kind="stable") if i >= keep_first
+    ]
+    chosen, used = [], 0
+    for i in order:
+        cost = sizes[i] + (sep if chosen else 0)
+        if used + cost <= budget:
+            chosen.append(i)
+            used += cost
+    return "\n".join(chunks[i] for i in sorted(chosen))
+
+
+@dataclass
+class PromptContext:
+    jd_text: str
+    resume_text: str
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+# process-wide totals for /admin/metrics
+_totals = {"requests": 0, "tokens_before": 0, "tokens_after": 0}
+_totals_lock = threading.Lock()
+
+
+def build_context(
+    title: str,
+    company: str,
+    description_html: Optional[str],
+    resume_text: Optional[str],
+    budget: Optional[int] = None,
+    jd_share: Optional[float] = None,
+) -> PromptContext:
+    """
+    Compact JD + resume into `budget` tokens (default PROMPT_TOKEN_BUDGET),
+    giving the JD `jd_share` of it (more if the resume is short); budget the
+    JD leaves unused goes to the resume. JD chunks are ranked against the
+    role title and resume (with a prior for requirement sections), resume
+    chunks against the compacted JD.
+    """
+    budget = settings.PROMPT_TOKEN_BUDGET if budget is None else budget
+    jd_share = settings.PROMPT_JD_SHARE if jd_share is None else jd_share
+    raw_jd, raw_resume = description_html or "", resume_text or ""
+
+    role = f"{title} {title} {company}"
+    resume_text = compact_whitespace(raw_resume)
+    jd_chunks = chunk_text(drop_boilerplate(html_to_text(raw_jd)))
+    jd_budget = max(int(budget * jd_share), budget - count_tokens(resume_text))
+    jd = pack(jd_chunks, f"{role}\n{resume_text}", jd_budget, keep_first=1,
+              prior=[_jd_prior(c) for c in jd_chunks])
+    jd_tokens = count_tokens(jd)
+    resume = pack(chunk_text(resume_text), f"{role}\n{jd}", budget - jd_tokens)
+
+    stats = {
+        "jd_tokens_before": count_tokens(raw_jd),
+        "jd_tokens_after": jd_tokens,
+        "resume_tokens_before": count_tokens(raw_resume),
+        "resume_tokens_after": count_tokens(resume),
+        "budget": budget,
+    }
+    with _totals_lock:
+        _totals["requests"] += 1
+        _totals["tokens_before"] += stats["jd_tokens_before"] + stats["resume_tokens_before"]
+        _totals["tokens_after"] += stats["jd_tokens_after"] + stats["resume_tokens_after"]
+    return PromptContext(jd_text=jd, resume_text=resume, stats=stats)
+
+
+def stats() -> Dict[str, float]:
+    with _totals_lock:
+        out = dict(_totals)
+    out["compaction_ratio"] = round(out["tokens_after"] / out["tokens_before"], 4) if out["tokens_before"] else 0.0
+    return out
@@ -1,8 +1,36 @@
 # ai/qa.py
-from typing import Dict, Any
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Any, List, Tuple
 from apps.api.settings import settings
+from ai.llm import get_chat_client, is_configured
+from ai.plan_cache import cache_key, cached, cached_get, cached_set
+from ai.prompt_builder import PromptContext, build_context
 
-def generate_answers(job: Dict[str, Any], resume_text: str = "") -> Dict[str, Any]:
+# Bump whenever the prompt below changes so cached plans are not reused.
+PROMPT_VERSION = "qa-v2"
+TEMPERATURE = 0.4
+
+def _has_content(plan: Dict[str, Any]) -> bool:
+    return bool(plan.get("answers") or plan.get("cover_letter"))
+
+def _context(job: Dict[str, Any], resume_text: str) -> PromptContext:
+    return build_context(job.get("title",""), job.get("company",""), job.get("description_html"), resume_text)
+
+def _mock_plan(title: str, company: str, resume_text: str) -> Dict[str, Any]:
+    return {
+        "resume_variant": "default",
+        "cover_letter": f"Cover letter for {title} at {company}.\n\nResume highlights:\n{resume_text[:800]}",
+        "answers": {
+            "Briefly describe your most relevant experience": (resume_text[:900] or "See resume."),
+            "Why do you want to work here?": f"I’m excited about {company} and the {title} role.",
+        },
+    }
+
+def _key(title: str, company: str, jd_text: str, resume_text: str, model: str) -> str:
+    return cache_key("answers", f"{title}\n{company}\n{jd_text}", resume_text, model, TEMPERATURE, PROMPT_VERSION)
+
+def generate_answers(job: Dict[str, Any], resume_text: str = "", use_cache: bool = True) -> Dict[str, Any]:
     """
     Returns a plan dict like:
       {
@@ -10,35 +38,70 @@ def generate_answers(job: Dict[str, Any], resume_text: str = "") -> Dict[str, An
         "cover_letter": "...",
         "answers": { "q": "a", ... }
       }
-    Uses OpenAI if configured; otherwise falls back to a simple heuristic.
+    Uses the configured LLM provider (ai/llm.py); otherwise falls back to a simple heuristic.
+    LLM results are served from the plan cache unless use_cache is False.
+    The JD and resume are compacted into PROMPT_TOKEN_BUDGET first; the
+    token counts before/after are returned under "prompt_stats".
     """
-    jd_text = (job.get("description_html") or "")[:12000]
-    title = job.get("title","")
-    company = job.get("company","")
+    title, company = job.get("title",""), job.get("company","")
 
     # If no API configured, fallback mock
-    if settings.LLM_PROVIDER != "openai" or not settings.OPENAI_API_KEY:
-        return {
-            "resume_variant": "default",
-            "cover_letter": f"Cover letter for {title} at {company}.\n\nResume highlights:\n{resume_text[:800]}",
-            "answers": {
-                "Briefly describe your most relevant experience": (resume_text[:900] or "See resume."),
-                "Why do you want to work here?": f"I’m excited about {company} and the {title} role.",
-            },
-        }
+    if not is_configured():
+        return _mock_plan(title, company, resume_text)
+
+    model = settings.LLM_MODEL or "gpt-4o-mini"
+    ctx = _context(job, resume_text)
+    plan = cached(
+        _key(title, company, ctx.jd_text, ctx.resume_text, model),
+        lambda: _complete_answers(title, company, ctx.jd_text, ctx.resume_text, model),
+        bypass=not use_cache,
+        cacheable=_has_content,
+    )
+    return {**plan, "prompt_stats": ctx.stats}
 
-    # --- OpenAI path ---
-    from openai import OpenAI
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+async def stream_answers(job: Dict[str, Any], resume_text: str = "", use_cache: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming generate_answers: yields ("token", text) for each completion
+    delta, then exactly one ("plan", dict) with the parsed result. Cache hits
+    and the mock fallback yield the plan only. Closing the iterator early
+    aborts the completion (nothing is cached).
+    """
+    title, company = job.get("title",""), job.get("company","")
+    if not is_configured():
+        yield "plan", _mock_plan(title, company, resume_text)
+        return
+
+    model = settings.LLM_MODEL or "gpt-4o-mini"
+    # compaction (tokenizer) and the cache (SQLite/Redis) block: keep them off the loop
+    ctx = await asyncio.to_thread(_context, job, resume_text)
+    key = _key(title, company, ctx.jd_text, ctx.resume_text, model)
+    hit = await asyncio.to_thread(cached_get, key, bypass=not use_cache)
+    if hit is not None:
+        yield "plan", {**hit, "prompt_stats": ctx.stats}
+        return
+
+    parts: List[str] = []
+    async for delta in get_chat_client().astream(
+        model=model,
+        messages=_messages(title, company, ctx.jd_text, ctx.resume_text),
+        temperature=TEMPERATURE,
+        response_format={ "type":"json_object" },
+    ):
+        parts.append(delta)
+        yield "token", delta
+    plan = _parse("".join(parts))
+    await asyncio.to_thread(cached_set, key, plan, cacheable=_has_content)
+    yield "plan", {**plan, "prompt_stats": ctx.stats}
 
+def _messages(title: str, company: str, jd_text: str, resume_text: str) -> List[Dict[str, str]]:
     system = (
         "You are an application assistant. Write concise, specific answers grounded ONLY in the resume text. "
         "Avoid generic fluff. Use bullet points sparingly. Return JSON with keys: resume_variant, cover_letter, answers."
     )
     user = (
         f"JOB TITLE: {title}\nCOMPANY: {company}\n"
-        f"JOB DESCRIPTION (HTML allowed):\n{jd_text}\n\n"
-        f"RESUME TEXT:\n{resume_text}\n\n"
+        f"JOB DESCRIPTION:\n{jd_text}\n\n"
+        f"RESUME TEXT (most relevant excerpts):\n{resume_text}\n\n"
         "Tasks:\n"
         "1) Choose resume_variant (short token like 'ml_senior', 'data_eng').\n"
         "2) Draft a one-page cover_letter tailored to the job.\n"
@@ -47,17 +110,10 @@ def generate_answers(job: Dict[str, Any], resume_text: str = "") -> Dict[str, An
         "   - Why do you want to work here?\n"
         "Return strict JSON."
     )
+    return [{"role":"system","content":system},{"role":"user","content":user}]
 
-    # Note: use your preferred model here
-    chat = client.chat.completions.create(
-        model=settings.OPENAI_MODEL or "gpt-4o-mini",
-        messages=[{"role":"system","content":system},{"role":"user","content":user}],
-        response_format={ "type":"json_object" },
-        temperature=0.4,
-    )
-    import json
+def _parse(content: str) -> Dict[str, Any]:
     try:
-        content = chat.choices[0].message.content
         data = json.loads(content)
         data.setdefault("resume_variant", "default")
         data.setdefault("cover_letter", None)
@@ -70,3 +126,12 @@ def generate_answers(job: Dict[str, Any], resume_text: str = "") -> Dict[str, An
             "cover_letter": None,
             "answers": {},
         }
+
+def _complete_answers(title: str, company: str, jd_text: str, resume_text: str, model: str) -> Dict[str, Any]:
+    content = get_chat_client().chat(
+        model=model,
+        messages=_messages(title, company, jd_text, resume_text),
+        temperature=TEMPERATURE,
+        response_format={ "type":"json_object" },
+    )
+    return _parse(content)
@@ -1,9 +1,79 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Optional, Type
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, scoped_session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from apps.api.settings import settings
 
+# ---- pool checkout wait time ----
+class PoolWaitStats:
+    """How long checkouts waited for a pooled connection (recent samples + totals)."""
+    def __init__(self, samples: int = 1000):
+        self._waits = deque(maxlen=samples)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_ms = 0.0
+
+    def record(self, ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._waits.append(ms)
+            self.max_ms = max(self.max_ms, ms)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+        pct = lambda q: round(waits[min(len(waits) - 1, int(q * len(waits)))], 2) if waits else None
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_p50": pct(0.5),
+            "wait_ms_p95": pct(0.95),
+            "wait_ms_max": round(self.max_ms, 2),
+        }
+
+def timed_pool(base: Type[QueuePool], stats: PoolWaitStats) -> Type[QueuePool]:
+    """base, recording into stats how long each checkout waited (incl. timeouts)."""
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                stats.record((time.perf_counter() - started) * 1000, timed_out=True)
+                raise
+            stats.record((time.perf_counter() - started) * 1000)
+            return conn
+    return TimedPool
+
+def _engine_kwargs(url: URL, stats: PoolWaitStats, pool: Type[QueuePool]) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return kwargs  # SQLite keeps SQLAlchemy's default pool (file lock / in-memory)
+    kwargs.update(
+        poolclass=timed_pool(pool, stats),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return kwargs
+
 # Engine (psycopg v3)
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, future=True)
+sync_wait_stats = PoolWaitStats()
+engine = create_engine(settings.DATABASE_URL, future=True,
+                       **_engine_kwargs(make_url(settings.DATABASE_URL), sync_wait_stats, QueuePool))
 
 # Session factory
 SessionLocal = scoped_session(sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True))
@@ -17,3 +87,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# ---- async path (discovery reads) ----
+# A second engine with its own pool of the same size: async handlers wait on
+# the event loop instead of holding a threadpool worker per query.
+_ASYNC_DRIVERS = {"postgresql": "psycopg", "sqlite": "aiosqlite"}
+
+def async_database_url(url: str) -> URL:
+    """DATABASE_URL with its async driver (psycopg v3 serves both sync and async)."""
+    u = make_url(url)
+    driver = _ASYNC_DRIVERS.get(u.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {u.get_backend_name()}")
+    return u.set(drivername=f"{u.get_backend_name()}+{driver}")
+
+async_wait_stats = PoolWaitStats()
+_async_engine: Optional[AsyncEngine] = None
+_async_sessions: Optional[async_sessionmaker] = None
+_async_lock = threading.Lock()
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_sessions
+    if _async_engine is None:
+        with _async_lock:
+            if _async_engine is None:
+                url = make_url(settings.DATABASE_URL_ASYNC) if settings.DATABASE_URL_ASYNC \
+                    else async_database_url(settings.DATABASE_URL)
+                _async_engine = create_async_engine(
+                    url, **_engine_kwargs(url, async_wait_stats, AsyncAdaptedQueuePool))
+                _async_sessions = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_engine
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _async_sessions() as db:
+        yield db
+
+def pool_stats() -> Dict[str, Any]:
+    out = {"sync": {"status": engine.pool.status(), **sync_wait_stats.stats()}}
+    if _async_engine is not None:
+        out["async"] = {"status": _async_engine.pool.status(), **async_wait_stats.stats()}
+    return out
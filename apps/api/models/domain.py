@@ -1,7 +1,7 @@
 # apps/api/models/domain.py
 from pydantic import BaseModel, AnyUrl, EmailStr, Field
 from typing import List, Optional, Dict
-from datetime import date
+from datetime import date, datetime
 from uuid import UUID
 
 class WorkExp(BaseModel):
@@ -31,8 +31,11 @@ class Profile(BaseModel):
     resume_path: Optional[str] = None
     # NEW: raw text extracted from resume
     resume_text: Optional[str] = None
+    # content hash of the resume file; also the parse handle (/profile/resume/parse/{id})
+    resume_sha256: Optional[str] = None
 
-class Job(BaseModel):
+class JobSummary(BaseModel):
+    # List projection: everything but the (large) description
     id: str | UUID
     title: str
     company: str
@@ -41,11 +44,44 @@ class Job(BaseModel):
     location: Optional[str] = None
     source: str  # greenhouse | lever | workday | ashby | linkedin | etc.
     salary: Optional[str] = None
+
+class Job(JobSummary):
     description_html: Optional[str] = None
 
+class JobPage(BaseModel):
+    items: List[JobSummary | Job] = Field(default_factory=list)
+    # opaque keyset cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
+
 class ApplicationPlan(BaseModel):
     job: Job
     resume_variant: str
     cover_letter: Optional[str] = None
     answers: Dict[str, str] = Field(default_factory=dict)
     requires_hitl: bool = True
+    # token counts before/after prompt compaction (ai/prompt_builder.py); empty for the mock planner
+    prompt_stats: Dict[str, int] = Field(default_factory=dict)
+
+class PlanBatchRequest(BaseModel):
+    # full jobs are planned as given; bare ids are looked up in the jobs table
+    jobs: List[Job] = Field(default_factory=list)
+    job_ids: List[str] = Field(default_factory=list)
+
+class PlanBatchItem(BaseModel):
+    # one streamed line/event; exactly one of plan / error is set
+    index: int
+    job_id: str
+    plan: Optional[ApplicationPlan] = None
+    error: Optional[str] = None
+
+class CheckpointSummary(BaseModel):
+    # HITL review queue entry; screenshot at /apply/checkpoints/{id}/screenshot
+    id: str
+    job_id: str
+    source: str
+    company: Optional[str] = None
+    status: str
+    url: str
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
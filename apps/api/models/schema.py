@@ -0,0 +1,32 @@
+# apps/api/models/schema.py
+# Idempotent schema setup. The jobs table predates these models in existing
+# deployments, so columns added later are patched in with IF NOT EXISTS.
+from sqlalchemy import Engine, text
+from apps.api.models.db import Base
+from apps.api.models.sql import jobs, boards, checkpoints, profiles  # noqa: F401  (register tables)
+
+# Postgres-only DDL, applied in order after create_all().
+POSTGRES_DDL = [
+    "ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+    "ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS dup_of VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_dup_of ON public.jobs (dup_of)",
+    "ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS search_tsv tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_tsv ON public.jobs USING gin (search_tsv)",
+    # keyset pagination order for find_jobs_page
+    "CREATE INDEX IF NOT EXISTS ix_jobs_posted_at_id ON public.jobs (posted_at DESC NULLS LAST, id DESC)",
+]
+
+# SQLite full-text fallback (services/search_index.py)
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+    "job_id UNINDEXED, title, company, body, tokenize='porter unicode61')",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_posted_at_id ON jobs (posted_at DESC, id DESC)",
+]
+
+def ensure_schema(engine: Engine) -> None:
+    Base.metadata.create_all(engine)
+    ddl = {"postgresql": POSTGRES_DDL, "sqlite": SQLITE_DDL}.get(engine.dialect.name, [])
+    if ddl:
+        with engine.begin() as conn:
+            for stmt in ddl:
+                conn.execute(text(stmt))
@@ -0,0 +1,15 @@
+from sqlalchemy import String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from apps.api.models.db import Base
+
+class BoardStateRow(Base):
+    """Per-board conditional fetch state (see connectors.base.BoardState)."""
+    __tablename__ = "board_state"
+    __table_args__ = {"schema": "public"}
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    company: Mapped[str] = mapped_column(String, primary_key=True)
+    etag: Mapped[str | None] = mapped_column(String, nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+    fetched_at: Mapped[DateTime | None] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import JSON, DateTime, Index, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from apps.api.models.db import Base
+
+class CheckpointRow(Base):
+    """
+    A filled application form parked for human review (automation/checkpoints.py):
+    enough to rehydrate a fresh browser context and submit after approval.
+    """
+    __tablename__ = "application_checkpoints"
+    __table_args__ = (
+        Index("ix_application_checkpoints_status", "status"),
+        {"schema": "public"},
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    job_id: Mapped[str] = mapped_column(String)
+    source: Mapped[str] = mapped_column(String)
+    company: Mapped[str | None] = mapped_column(String, nullable=True)
+    # pending -> approved | rejected; approved -> submitted | failed
+    status: Mapped[str] = mapped_column(String, default="pending")
+    url: Mapped[str] = mapped_column(Text)
+    storage_state: Mapped[dict] = mapped_column(JSON)
+    form_state: Mapped[dict] = mapped_column(JSON)          # {frame index: {selector: value}}
+    files: Mapped[dict] = mapped_column(JSON, default=dict) # {selector: path} re-attached on resume
+    plan: Mapped[dict] = mapped_column(JSON)
+    screenshot: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)  # JPEG
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
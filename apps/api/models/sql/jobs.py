@@ -1,10 +1,14 @@
-from sqlalchemy import String, Text, Boolean, Integer, DateTime, Float
+from sqlalchemy import String, Text, Boolean, Integer, DateTime, Float, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from apps.api.models.db import Base
 
 class JobRow(Base):
     __tablename__ = "jobs"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        Index("ix_jobs_dup_of", "dup_of"),
+        {"schema": "public"},
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     source: Mapped[str] = mapped_column(String, nullable=False)
@@ -27,6 +31,27 @@ class JobRow(Base):
     description_md: Mapped[str | None] = mapped_column(Text, nullable=True)
     description_raw: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # 64-bit SimHash (hex) of title/company/description, see services/dedup.py
     hash_sim: Mapped[str | None] = mapped_column(String, nullable=True)
+    # id of the canonical posting when this one is a near-duplicate; NULL if canonical
+    dup_of: Mapped[str | None] = mapped_column(String, nullable=True)
+    # connectors.base.posting_hash of the last ingested version (change detection)
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
     meta: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Full-text search vector kept up to date by ingestion (services/search_index.py).
+    # Postgres only; SQLite uses the jobs_fts FTS5 table instead.
+    search_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR().with_variant(Text(), "sqlite"), nullable=True, deferred=True
+    )
     created_at: Mapped[DateTime | None] = mapped_column(DateTime, nullable=True)
+
+class JobSimBandRow(Base):
+    """LSH band index over JobRow.hash_sim: one row per (band bucket, job)."""
+    __tablename__ = "job_sim_bands"
+    __table_args__ = (
+        Index("ix_job_sim_bands_job_id", "job_id"),
+        {"schema": "public"},
+    )
+
+    bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[str] = mapped_column(String, primary_key=True)
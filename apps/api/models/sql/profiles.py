@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import JSON, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from apps.api.models.db import Base
+
+class ProfileRow(Base):
+    """
+    One applicant profile per user (services/profile_service.py). `data` is
+    the Profile model as JSON; `version` bumps on every save so readers can
+    reuse an already-validated Profile until it changes.
+    """
+    __tablename__ = "profiles"
+    __table_args__ = {"schema": "public"}
+
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    data: Mapped[dict] = mapped_column(JSON)
+    version: Mapped[int] = mapped_column(Integer, default=1)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
@@ -1,8 +1,36 @@
 # apps/api/routers/admin.py
+import logging
 from fastapi import APIRouter
+from ai import prompt_builder
+from ai.plan_cache import get_plan_cache
+from apps.api.models.db import pool_stats
+from apps.api.services.resume_parser import get_resume_parser
+from apps.api.services.search_cache import search_cache
+from apps.worker import tasks as worker_tasks
+
+log = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _queue_stats():
+    try:
+        return worker_tasks.stats()
+    except Exception as e:  # Redis down: metrics still answer
+        log.warning("worker queue stats unavailable: %s", e)
+        return None
+
 @router.get("/health")
 async def health():
     return {"status": "ok"}
+
+@router.get("/metrics")
+def metrics():
+    plan_cache = get_plan_cache()
+    return {
+        "search_cache": search_cache.stats(),
+        "plan_cache": plan_cache.stats() if plan_cache else None,
+        "prompt_tokens": prompt_builder.stats(),
+        "worker_queue": _queue_stats(),
+        "resume_parse": get_resume_parser().stats(),
+        "db_pool": pool_stats(),
+    }
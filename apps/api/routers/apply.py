@@ -1,10 +1,138 @@
 # apps/api/routers/apply.py
-from fastapi import APIRouter, Body
-from apps.api.models.domain import Job, ApplicationPlan
-from apps.api.services.application_service import plan_application
+import json
+import logging
+from typing import AsyncIterator, List, Literal, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from apps.api.models.db import get_db
+from apps.api.models.domain import Job, ApplicationPlan, CheckpointSummary, PlanBatchItem, PlanBatchRequest
+from apps.api.services.application_service import plan_application, plan_batch, stream_plan
+from apps.api.services import checkpoint_service
+from apps.api.services.discovery_service import get_job
+from apps.api.settings import settings
+from apps.worker import tasks as worker_tasks
+
+log = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_USER_ID = Query(None, description="Plan with this user's profile (profiles table) instead of profile.json")
+
 @router.post("/plan", response_model=ApplicationPlan)
-def plan(job: Job = Body(...)) -> ApplicationPlan:
-    return plan_application(job)
+def plan(
+    job: Job = Body(...),
+    bypass_cache: bool = Query(False, description="Force a fresh LLM completion instead of a cached plan"),
+    user_id: Optional[str] = _USER_ID,
+) -> ApplicationPlan:
+    try:
+        return plan_application(job, use_cache=not bypass_cache, user_id=user_id)
+    except LookupError as e:
+        raise HTTPException(404, str(e))
+
+async def _plan_events(job: Job, use_cache: bool, user_id: Optional[str] = None) -> AsyncIterator[str]:
+    try:
+        async for kind, value in stream_plan(job, use_cache=use_cache, user_id=user_id):
+            if kind == "token":
+                yield f"event: token\ndata: {json.dumps({'text': value})}\n\n"
+            else:
+                yield f"event: plan\ndata: {value.model_dump_json()}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'error': f'{type(e).__name__}: {e}'})}\n\n"
+
+# SSE variant of /plan: "token" events carry raw completion deltas as they
+# arrive, then one "plan" event with the validated ApplicationPlan (or an
+# "error" event). Disconnecting cancels the underlying LLM stream.
+@router.post("/plan/stream")
+def plan_stream(
+    job: Job = Body(...),
+    bypass_cache: bool = Query(False, description="Force a fresh LLM completion instead of a cached plan"),
+    user_id: Optional[str] = _USER_ID,
+) -> StreamingResponse:
+    return StreamingResponse(_plan_events(job, not bypass_cache, user_id), media_type="text/event-stream",
+                             headers=_SSE_HEADERS)
+
+async def _ndjson(items: AsyncIterator[PlanBatchItem]) -> AsyncIterator[str]:
+    async for item in items:
+        yield item.model_dump_json() + "\n"
+
+async def _sse(items: AsyncIterator[PlanBatchItem]) -> AsyncIterator[str]:
+    async for item in items:
+        yield f"event: {'error' if item.error else 'plan'}\ndata: {item.model_dump_json()}\n\n"
+    yield "event: done\ndata: {}\n\n"
+
+# Streams one PlanBatchItem per job as soon as it is planned (completion order;
+# use `index` to map back to the request). Per-job failures are reported
+# inline and never fail the batch.
+@router.post("/plan_batch")
+def plan_batch_endpoint(
+    req: PlanBatchRequest = Body(...),
+    format: Literal["ndjson", "sse"] = Query("ndjson"),
+    concurrency: Optional[int] = Query(None, ge=1, le=32, description="Max plans in flight (default PLAN_BATCH_CONCURRENCY)"),
+    bypass_cache: bool = Query(False, description="Force fresh LLM completions instead of cached plans"),
+    user_id: Optional[str] = _USER_ID,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    total = len(req.jobs) + len(req.job_ids)
+    if total == 0:
+        raise HTTPException(400, "Provide jobs or job_ids")
+    if total > settings.PLAN_BATCH_MAX_JOBS:
+        raise HTTPException(413, f"At most {settings.PLAN_BATCH_MAX_JOBS} jobs per batch")
+
+    # resolve ids up front so the DB session is not held while streaming
+    items = [(str(j.id), j) for j in req.jobs]
+    items += [(jid, get_job(db, jid)) for jid in req.job_ids]
+
+    results = plan_batch(items, concurrency or settings.PLAN_BATCH_CONCURRENCY, use_cache=not bypass_cache,
+                         user_id=user_id)
+    if format == "sse":
+        return StreamingResponse(_sse(results), media_type="text/event-stream",
+                                 headers=_SSE_HEADERS)
+    return StreamingResponse(_ndjson(results), media_type="application/x-ndjson")
+
+# ---- HITL review queue (automation/checkpoints.py) ----
+@router.get("/checkpoints", response_model=List[CheckpointSummary])
+def list_checkpoints(
+    status: Optional[str] = Query("pending", description="Filter by status; empty for all"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    return checkpoint_service.list_checkpoints(db, status=status or None, limit=limit)
+
+@router.get("/checkpoints/{checkpoint_id}/screenshot", response_class=Response)
+def checkpoint_screenshot(checkpoint_id: str, db: Session = Depends(get_db)):
+    row = checkpoint_service.get_checkpoint(db, checkpoint_id)
+    if row is None or row.screenshot is None:
+        raise HTTPException(404, "No screenshot for this checkpoint")
+    return Response(row.screenshot, media_type="image/jpeg")
+
+def _transition(db: Session, checkpoint_id: str, status: str) -> CheckpointSummary:
+    try:
+        out = checkpoint_service.set_status(db, checkpoint_id, status)
+    except checkpoint_service.InvalidTransition as e:
+        raise HTTPException(409, str(e))
+    if out is None:
+        raise HTTPException(404, "Checkpoint not found")
+    return out
+
+# Approval flips the status and queues a resume task; a worker rehydrates
+# and submits it. If the task cannot be queued (Redis down) the status is left
+# unchanged and the caller gets a 503, so approving again later retries.
+@router.post("/checkpoints/{checkpoint_id}/approve", response_model=CheckpointSummary)
+def approve_checkpoint(checkpoint_id: str, db: Session = Depends(get_db)):
+    try:
+        out = checkpoint_service.approve(db, checkpoint_id, worker_tasks.enqueue_resume)
+    except checkpoint_service.InvalidTransition as e:
+        raise HTTPException(409, str(e))
+    except Exception as e:
+        log.warning("could not queue resume for checkpoint %s: %s", checkpoint_id, e)
+        raise HTTPException(503, "Could not queue the checkpoint for submission; approve it again later")
+    if out is None:
+        raise HTTPException(404, "Checkpoint not found")
+    return out
+
+@router.post("/checkpoints/{checkpoint_id}/reject", response_model=CheckpointSummary)
+def reject_checkpoint(checkpoint_id: str, db: Session = Depends(get_db)):
+    return _transition(db, checkpoint_id, "rejected")
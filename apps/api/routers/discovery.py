@@ -1,27 +1,49 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select
-from apps.api.models.db import get_db
-from apps.api.models.domain import Job
-from apps.api.models.sql.jobs import JobRow
-from apps.api.services.discovery_service import find_jobs
+from apps.api.models.db import get_async_db, get_db
+from apps.api.models.domain import Job, JobSummary
+from apps.api.services.discovery_service import InvalidCursor, count_jobs_async, find_jobs_page_async, get_job
+from apps.api.services.search_cache import normalize_params, search_cache
 
 router = APIRouter()
 
+# Read-heavy routes run on the async engine: a waiting query parks a
+# coroutine instead of a threadpool worker.
 @router.get("/debug_count")
-def debug_count(db: Session = Depends(get_db)):
-    n = db.execute(select(func.count()).select_from(JobRow)).scalar_one()
-    return {"count": n}
+async def debug_count(db: AsyncSession = Depends(get_async_db)):
+    return {"count": await count_jobs_async(db)}
 
-@router.get("/search", response_model=List[Job])
-def search_jobs(
+# List results are summaries; fetch /jobs/{id} for the description.
+@router.get("/search", response_model=List[JobSummary])
+async def search_jobs(
+    response: Response,
     query: Optional[str] = Query(None),
     location: Optional[str] = Query(None),
     remote: Optional[bool] = Query(None),
     source: Optional[str] = Query(None),
     limit: int = Query(25, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    collapse: bool = Query(False, description="Return one canonical posting per near-duplicate cluster"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor; overrides offset. Empty string starts from the first page"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return find_jobs(db, query, location, remote, source, limit, offset)
+    params = normalize_params(query, location, remote, source, limit, offset, cursor, collapse=collapse)
+    try:
+        page = await search_cache.aget_or_compute(params, lambda: find_jobs_page_async(
+            db, query, location, remote, source, limit, offset,
+            collapse_duplicates=collapse, cursor=cursor, summary=True,
+        ))
+    except InvalidCursor as e:
+        raise HTTPException(400, str(e))
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
+
+@router.get("/jobs/{job_id}", response_model=Job)
+def job_detail(job_id: str, db: Session = Depends(get_db)):
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(404, f"Job not found: {job_id}")
+    return job
@@ -1,10 +1,14 @@
 # apps/api/routers/profile.py
-from fastapi import APIRouter, UploadFile, File, Body, HTTPException
+from fastapi import APIRouter, UploadFile, File, Body, Depends, HTTPException
 from typing import Optional
+from sqlalchemy.orm import Session
+from apps.api.models.db import get_db
 from apps.api.models.domain import Profile
 from apps.api.services.profile_service import (
-    get_profile, save_profile, attach_resume, attach_cover_letter
+    get_profile, save_profile, attach_resume, attach_cover_letter, get_resume_parse, upload_versions,
+    get_user_profile, save_user_profile,
 )
+from apps.api.services.storage import UploadTooLarge
 
 router = APIRouter()
 
@@ -16,19 +20,51 @@ def read_profile():
 def save_profile_route(profile: Profile = Body(...)):
     return save_profile(profile)
 
+# Multi-user profiles (profiles table); /me and /save keep using profile.json
+@router.get("/users/{user_id}", response_model=Profile)
+def read_user_profile(user_id: str, db: Session = Depends(get_db)):
+    prof = get_user_profile(db, user_id)
+    if prof is None:
+        raise HTTPException(404, "Profile not found")
+    return prof
+
+@router.put("/users/{user_id}", response_model=Profile)
+def save_user_profile_route(user_id: str, profile: Profile = Body(...), db: Session = Depends(get_db)):
+    return save_user_profile(db, user_id, profile)
+
 @router.post("/upload", response_model=dict)
 def upload_profile_assets(
     resume: Optional[UploadFile] = File(None),
     cover_letter: Optional[UploadFile] = File(None),
 ):
     result = {}
-    if resume:
-        prof = attach_resume(resume)
-        result["resume_path"] = prof.resume_path
-        result["resume_text_len"] = len(prof.resume_text or "")
-    if cover_letter:
-        path = attach_cover_letter(cover_letter)
-        result["cover_letter_path"] = str(path.resolve())
+    try:
+        if resume:
+            # parsing runs in the background; poll resume_parse["id"] until done
+            prof, parse = attach_resume(resume)
+            result["resume_path"] = prof.resume_path
+            result["resume_sha256"] = prof.resume_sha256
+            result["resume_parse"] = parse
+            result["resume_text_len"] = len(prof.resume_text or "")
+        if cover_letter:
+            path = attach_cover_letter(cover_letter)
+            result["cover_letter_path"] = str(path)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
     if not result:
         raise HTTPException(400, "Provide at least one file: resume or cover_letter.")
     return result
+
+@router.get("/resume/parse/{parse_id}", response_model=dict)
+def resume_parse_status(parse_id: str):
+    status = get_resume_parse(parse_id)
+    if status is None:
+        raise HTTPException(404, "Unknown parse id")
+    return status
+
+# Every distinct upload is kept; name is "resume" or "cover_letter"
+@router.get("/uploads/{name}/versions", response_model=list)
+def upload_version_history(name: str):
+    if name not in ("resume", "cover_letter"):
+        raise HTTPException(404, "Unknown upload name")
+    return upload_versions(name)
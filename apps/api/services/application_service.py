@@ -1,18 +1,30 @@
 # apps/api/services/application_service.py
-from typing import Dict, Any
-from apps.api.services.profile_service import get_profile
-from apps.api.models.domain import Job, ApplicationPlan
-from ai.qa import generate_answers  # your existing LLM helper
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Any, List, Optional, Sequence, Tuple
+from apps.api.services.profile_service import resume_text_for
+from apps.api.models.domain import Job, ApplicationPlan, PlanBatchItem
+from ai.qa import generate_answers, stream_answers  # your existing LLM helper
 
-def plan_application(job: Job) -> ApplicationPlan:
-    prof = get_profile()
-    resume_text = prof.resume_text if prof else None
+log = logging.getLogger(__name__)
 
+def plan_application(job: Job, use_cache: bool = True, user_id: Optional[str] = None) -> ApplicationPlan:
+    # user_id selects a DB profile; None uses the single-user profile.json
     # Your LLM helper should accept resume_text + job description/html
     plan = generate_answers(
         job=job.model_dump(),
-        resume_text=resume_text or "",
+        resume_text=resume_text_for(user_id),
+        use_cache=use_cache,
     )
+    return _to_plan(job, plan)
+
+async def stream_plan(job: Job, use_cache: bool = True, user_id: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+    """Yields ("token", text) deltas, then ("plan", ApplicationPlan)."""
+    resume_text = await asyncio.to_thread(resume_text_for, user_id)
+    async for kind, value in stream_answers(job.model_dump(), resume_text=resume_text, use_cache=use_cache):
+        yield kind, (_to_plan(job, value) if kind == "plan" else value)
+
+def _to_plan(job: Job, plan: Dict[str, Any]) -> ApplicationPlan:
     # Ensure required fields exist even if LLM returns partials
     plan.setdefault("answers", {})
     plan.setdefault("cover_letter", None)
@@ -24,4 +36,39 @@ def plan_application(job: Job) -> ApplicationPlan:
         cover_letter=plan.get("cover_letter"),
         answers=plan["answers"],
         requires_hitl=True,
+        prompt_stats=plan.get("prompt_stats") or {},
     )
+
+async def plan_batch(
+    items: Sequence[Tuple[str, Optional[Job]]],
+    concurrency: int = 4,
+    use_cache: bool = True,
+    user_id: Optional[str] = None,
+) -> AsyncIterator[PlanBatchItem]:
+    """
+    Plan (job_id, job) pairs with at most `concurrency` in flight, yielding
+    each result as soon as it is ready (completion order, not input order).
+    A missing job (None) or a failing plan becomes an item with `error` set;
+    it never aborts the rest of the batch. Closing the iterator early (client
+    disconnect) cancels everything still queued.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(index: int, job_id: str, job: Optional[Job]) -> PlanBatchItem:
+        if job is None:
+            return PlanBatchItem(index=index, job_id=job_id, error="job not found")
+        async with sem:
+            try:
+                plan = await asyncio.to_thread(plan_application, job, use_cache, user_id)
+                return PlanBatchItem(index=index, job_id=job_id, plan=plan)
+            except Exception as e:
+                log.warning("plan_batch: job %s failed: %s", job_id, e)
+                return PlanBatchItem(index=index, job_id=job_id, error=f"{type(e).__name__}: {e}")
+
+    tasks: List[asyncio.Task] = [asyncio.create_task(run(i, jid, job)) for i, (jid, job) in enumerate(items)]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
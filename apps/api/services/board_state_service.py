@@ -0,0 +1,83 @@
+# apps/api/services/board_state_service.py
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from apps.api.models.domain import Job
+from apps.api.models.sql.boards import BoardStateRow
+from apps.api.models.sql.jobs import JobRow
+from connectors.base import BoardState, posting_hash
+from connectors.crawl import BoardResult, Target
+
+@dataclass
+class BoardDiff:
+    source: str
+    company: str
+    added: List[Job] = field(default_factory=list)
+    changed: List[Job] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def upserts(self) -> List[Job]:
+        return self.added + self.changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+def load_states(db: Session, targets: Iterable[Target] | None = None) -> Dict[Target, BoardState]:
+    stmt = select(BoardStateRow)
+    if targets is not None:
+        keys = list(targets)
+        if not keys:
+            return {}
+        stmt = stmt.where(tuple_(BoardStateRow.source, BoardStateRow.company).in_(keys))
+    return {
+        (r.source, r.company): BoardState(
+            source=r.source,
+            company=r.company,
+            etag=r.etag,
+            last_modified=r.last_modified,
+            content_hash=r.content_hash,
+            fetched_at=r.fetched_at,
+        )
+        for r in db.execute(stmt).scalars()
+    }
+
+def save_states(db: Session, states: Iterable[BoardState]) -> None:
+    for st in states:
+        db.merge(BoardStateRow(
+            source=st.source,
+            company=st.company,
+            etag=st.etag,
+            last_modified=st.last_modified,
+            content_hash=st.content_hash,
+            fetched_at=st.fetched_at,
+        ))
+    db.commit()
+
+def diff_board(db: Session, source: str, company: str, jobs: List[Job]) -> BoardDiff:
+    """Compare a freshly fetched board against what JobRow already holds for it."""
+    existing = dict(db.execute(
+        select(JobRow.id, JobRow.content_hash)
+        .where(JobRow.source == source, JobRow.company == company)
+    ).all())
+    diff = BoardDiff(source=source, company=company)
+    seen = set()
+    for job in jobs:
+        jid = str(job.id)
+        seen.add(jid)
+        if jid not in existing:
+            diff.added.append(job)
+        elif existing[jid] != posting_hash(job):
+            diff.changed.append(job)
+    diff.removed = [jid for jid in existing if jid not in seen]
+    return diff
+
+def iter_changes(db: Session, results: Iterable[BoardResult]) -> Iterator[Tuple[BoardResult, BoardDiff]]:
+    """Yield (result, diff) only for boards that were fetched OK and actually changed."""
+    for res in results:
+        if not res.ok or not res.changed:
+            continue
+        diff = diff_board(db, res.source, res.company, res.jobs)
+        if diff:
+            yield res, diff
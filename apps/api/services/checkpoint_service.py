@@ -0,0 +1,87 @@
+# apps/api/services/checkpoint_service.py
+# Durable HITL checkpoints (rows written by automation/checkpoints.py).
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from apps.api.models.domain import CheckpointSummary
+from apps.api.models.sql.checkpoints import CheckpointRow
+
+# allowed status transitions
+_TRANSITIONS = {
+    "pending": {"approved", "rejected"},
+    "approved": {"submitted", "failed", "rejected"},
+    "failed": {"approved", "rejected"},
+}
+
+class InvalidTransition(ValueError):
+    pass
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def to_summary(row: CheckpointRow) -> CheckpointSummary:
+    return CheckpointSummary(
+        id=row.id, job_id=row.job_id, source=row.source, company=row.company,
+        status=row.status, url=row.url, error=row.error,
+        created_at=row.created_at, updated_at=row.updated_at,
+    )
+
+def create_checkpoint(db: Session, *, job_id: str, source: str, company: Optional[str], url: str,
+                      storage_state: Dict[str, Any], form_state: Dict[str, Any], plan: Dict[str, Any],
+                      screenshot: Optional[bytes] = None, files: Optional[Dict[str, str]] = None) -> str:
+    now = _now()
+    row = CheckpointRow(
+        id=uuid.uuid4().hex, job_id=job_id, source=source, company=company, status="pending",
+        url=url, storage_state=storage_state, form_state=form_state, files=files or {},
+        plan=plan, screenshot=screenshot, created_at=now, updated_at=now,
+    )
+    db.add(row)
+    db.commit()
+    return row.id
+
+def get_checkpoint(db: Session, checkpoint_id: str) -> Optional[CheckpointRow]:
+    return db.get(CheckpointRow, checkpoint_id)
+
+def list_checkpoints(db: Session, status: Optional[str] = "pending", limit: int = 100) -> List[CheckpointSummary]:
+    # summaries only: storage state and screenshots stay out of listings
+    stmt = select(CheckpointRow).order_by(CheckpointRow.created_at.desc()).limit(limit)
+    if status:
+        stmt = stmt.where(CheckpointRow.status == status)
+    return [to_summary(r) for r in db.scalars(stmt)]
+
+def set_status(db: Session, checkpoint_id: str, status: str, error: Optional[str] = None) -> Optional[CheckpointSummary]:
+    row = db.get(CheckpointRow, checkpoint_id)
+    if row is None:
+        return None
+    if status not in _TRANSITIONS.get(row.status, set()):
+        raise InvalidTransition(f"checkpoint {checkpoint_id} is {row.status}; cannot become {status}")
+    row.status = status
+    row.error = error
+    row.updated_at = _now()
+    if status in ("submitted", "rejected"):
+        # terminal: session cookies and the screenshot are no longer needed
+        row.storage_state = {}
+        row.screenshot = None
+    db.commit()
+    return to_summary(row)
+
+def approve(db: Session, checkpoint_id: str, enqueue: Callable[[str], Any]) -> Optional[CheckpointSummary]:
+    """
+    Approve and hand the checkpoint to enqueue (the resume task). If enqueue
+    raises, the previous status is restored before re-raising: an approved
+    checkpoint nobody will submit could never be approved again.
+    """
+    row = db.get(CheckpointRow, checkpoint_id)
+    if row is None:
+        return None
+    previous = (row.status, row.error, row.updated_at)
+    out = set_status(db, checkpoint_id, "approved")
+    try:
+        enqueue(checkpoint_id)
+    except Exception:
+        row.status, row.error, row.updated_at = previous
+        db.commit()
+        raise
+    return out
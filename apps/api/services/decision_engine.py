@@ -1,21 +1,153 @@
-from typing import List
+import heapq
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+import numpy as np
+import yaml
+from ai.embeddings import embed, embed_many, job_text, profile_text
 from ..models.domain import Job, Profile
+from .vector_index import VectorIndex
 
-class DecisionEngine:
+PREFERENCES_YAML = Path("policies/preferences.yaml")
+
+TITLE_WEIGHT = 0.4      # per distinct included title phrase
+LOCATION_WEIGHT = 0.3   # preferred location (or no location preference)
+SIMILARITY_WEIGHT = 0.3 # x cosine(profile, job) when a vector index is attached
+
+_NUM = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+def _alternation(terms: Iterable[str], whole_words: bool = False) -> Optional[Pattern]:
+    terms = sorted({t.strip().lower() for t in terms if t and t.strip()}, key=len, reverse=True)
+    if not terms:
+        return None
+    body = "(?:%s)" % "|".join(re.escape(t) for t in terms)
+    if whole_words:
+        # lookarounds rather than \b so terms with non-word edges ("c++", ".net") still match
+        body = r"(?<!\w)%s(?!\w)" % body
+    return re.compile(body, re.IGNORECASE)
+
+def _salary_ceiling_usd(salary: Optional[str]) -> Optional[float]:
+    # Parses discovery_service._format_salary output, e.g. "USD 120,000–150,000/year"
+    if not salary or not salary.upper().startswith("USD") or not salary.endswith("/year"):
+        return None
+    nums = [float(n.replace(",", "")) for n in _NUM.findall(salary)]
+    return max(nums) if nums else None
+
+class CompiledPrefs:
+    """preferences.yaml compiled into regex matchers, built once per engine."""
     def __init__(self, prefs: dict):
+        titles = prefs.get("role_titles") or {}
+        locs = prefs.get("locations") or {}
+        # Includes match substrings ("Data Scientist" hits "Data Scientists");
+        # excludes match whole words so "Intern" does not veto "Internal".
+        self.title_include = _alternation(titles.get("include") or [])
+        self.title_exclude = _alternation(titles.get("exclude") or [], whole_words=True)
+        self.loc_preferred = _alternation(locs.get("preferred") or [])
+        self.loc_exclude = _alternation(locs.get("exclude") or [], whole_words=True)
+        self.salary_min_usd = prefs.get("salary_min_usd")
+
+    def title_part(self, title: str) -> Tuple[float, bool]:
+        """(score contribution, excluded)"""
+        if self.title_exclude is not None and self.title_exclude.search(title):
+            return 0.0, True
+        if self.title_include is None:
+            return 0.0, False
+        hits = {m.lower() for m in self.title_include.findall(title)}
+        return TITLE_WEIGHT * len(hits), False
+
+    def location_part(self, location: Optional[str]) -> Tuple[float, bool]:
+        if location and self.loc_exclude is not None and self.loc_exclude.search(location):
+            return 0.0, True
+        if self.loc_preferred is None:
+            return LOCATION_WEIGHT, False
+        if location and self.loc_preferred.search(location):
+            return LOCATION_WEIGHT, False
+        return 0.0, False
+
+    def salary_ok(self, salary: Optional[str]) -> bool:
+        if not self.salary_min_usd:
+            return True
+        ceiling = _salary_ceiling_usd(salary)
+        return ceiling is None or ceiling >= float(self.salary_min_usd)
+
+def profile_vector(profile: Profile) -> np.ndarray:
+    return embed(profile_text(profile.summary, profile.skills, profile.resume_text))
+
+class DecisionEngine:
+    def __init__(self, prefs: dict, index: Optional[VectorIndex] = None, similarity_weight: float = SIMILARITY_WEIGHT):
         self.prefs = prefs
+        self.compiled = CompiledPrefs(prefs)
+        self.index = index
+        self.similarity_weight = similarity_weight
+
+    @classmethod
+    def from_yaml(cls, path: Path = PREFERENCES_YAML, index: Optional[VectorIndex] = None) -> "DecisionEngine":
+        return cls(yaml.safe_load(Path(path).read_text()) or {}, index=index)
+
+    def _similarities(self, profile: Profile, jobs: Sequence[Job]) -> Optional[np.ndarray]:
+        if self.index is None or not self.similarity_weight:
+            return None
+        pv = profile_vector(profile)
+        sims = self.index.similarities(pv, [str(j.id) for j in jobs])
+        # jobs not (yet) in the index are embedded on the fly
+        missing = np.flatnonzero(np.isnan(sims))
+        if missing.size:
+            vecs = embed_many(job_text(jobs[i].title, jobs[i].company, jobs[i].description_html) for i in missing)
+            sims[missing] = vecs @ pv
+        return np.clip(sims, 0.0, 1.0)
+
+    def top_matches(self, profile: Profile, k: int = 200) -> List[Tuple[str, float]]:
+        """Nearest job ids to the profile from the vector index (candidate generation)."""
+        if self.index is None:
+            return []
+        return self.index.search(profile_vector(profile), k)
 
     def score(self, profile: Profile, job: Job) -> float:
-        score = 0.0
-        for inc in self.prefs.get("role_titles", {}).get("include", []):
-            if inc.lower() in job.title.lower():
-                score += 0.4
-        locs = self.prefs.get("locations", {}).get("preferred", [])
-        if not locs or (job.location and any(l.lower() in job.location.lower() for l in locs)):
-            score += 0.3
-        # TODO: JD embedding similarity with profile summary/skills
-        return min(score, 1.0)
-
-    def filter_rank(self, profile: Profile, jobs: List[Job]) -> List[Job]:
-        ranked = sorted(jobs, key=lambda j: self.score(profile, j), reverse=True)
-        return [j for j in ranked if self.score(profile, j) >= 0.5]
\ No newline at end of file
+        return self.score_many(profile, [job])[0]
+
+    def score_many(self, profile: Profile, jobs: Sequence[Job]) -> List[float]:
+        """
+        Score a batch in one pass. Titles and locations repeat heavily across
+        large candidate sets, so each distinct string is matched only once.
+        Excluded jobs (title/location exclude lists, salary below
+        salary_min_usd) score 0. With a vector index attached, profile-to-JD
+        embedding similarity adds up to similarity_weight.
+        """
+        c = self.compiled
+        sims = self._similarities(profile, jobs)
+        title_memo: Dict[str, Tuple[float, bool]] = {}
+        loc_memo: Dict[Optional[str], Tuple[float, bool]] = {}
+        salary_memo: Dict[Optional[str], bool] = {}
+        out = []
+        for i, job in enumerate(jobs):
+            t = title_memo.get(job.title)
+            if t is None:
+                t = title_memo[job.title] = c.title_part(job.title)
+            if t[1]:
+                out.append(0.0)
+                continue
+            l = loc_memo.get(job.location)
+            if l is None:
+                l = loc_memo[job.location] = c.location_part(job.location)
+            if l[1]:
+                out.append(0.0)
+                continue
+            ok = salary_memo.get(job.salary)
+            if ok is None:
+                ok = salary_memo[job.salary] = c.salary_ok(job.salary)
+            if not ok:
+                out.append(0.0)
+                continue
+            sim = self.similarity_weight * float(sims[i]) if sims is not None else 0.0
+            out.append(min(t[0] + l[0] + sim, 1.0))
+        return out
+
+    def filter_rank(self, profile: Profile, jobs: List[Job], k: Optional[int] = None, threshold: float = 0.5) -> List[Job]:
+        """Jobs scoring >= threshold, best first; with k, only the top k via a heap."""
+        scores = self.score_many(profile, jobs)
+        passing = [(s, -i) for i, s in enumerate(scores) if s >= threshold]
+        if k is not None and k < len(passing):
+            top = heapq.nlargest(k, passing)
+        else:
+            top = sorted(passing, reverse=True)
+        return [jobs[-neg_i] for _, neg_i in top]
@@ -0,0 +1,173 @@
+# apps/api/services/dedup.py
+# Near-duplicate detection: 64-bit SimHash fingerprints + banded LSH lookup.
+#
+# A fingerprint is split into BANDS 16-bit bands; two fingerprints within
+# MAX_DISTANCE bits of each other (MAX_DISTANCE < BANDS) must agree on at least
+# one band (pigeonhole), so candidate lookup is an indexed equality probe on
+# job_sim_bands instead of a scan over every stored fingerprint.
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Connection, delete, insert, select, update
+
+from apps.api.models.sql.jobs import JobRow, JobSimBandRow
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+MAX_DISTANCE = 3
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"\w+", re.UNICODE)
+_BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def _tokens(title: str, company: str, description: str) -> List[str]:
+    text = _TAG.sub(" ", f"{title} {company} {description}").lower()
+    return _WORD.findall(text)
+
+
+def _shingle_hashes(tokens: Sequence[str], k: int = 3) -> np.ndarray:
+    if len(tokens) < k:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+def simhash(title: str, company: str = "", description: Optional[str] = None) -> int:
+    # Title and company are repeated so short postings are not dominated by boilerplate.
+    toks = _tokens(title, company, "") * 2 + _tokens("", "", description or "")
+    hashes = _shingle_hashes(toks)
+    if hashes.size == 0:
+        return 0
+    bits = np.unpackbits(hashes.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - hashes.size
+    return int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+
+
+def to_hex(fp: int) -> str:
+    return f"{fp:016x}"
+
+
+def from_hex(h: str) -> int:
+    return int(h, 16)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def buckets(fp: int) -> List[int]:
+    """One integer per band: band index in the high bits, band value in the low 16."""
+    return [(i << BAND_BITS) | ((fp >> (i * BAND_BITS)) & _BAND_MASK) for i in range(BANDS)]
+
+
+def _description(row: Dict[str, Any]) -> Optional[str]:
+    return row.get("description_md") or row.get("description_raw")
+
+
+def fingerprint_row(row: Dict[str, Any], stored_description: Optional[str] = None) -> int:
+    # stored_description stands in for a missing one, as the upsert's COALESCE keeps it
+    return simhash(row.get("title") or "", row.get("company") or "",
+                   _description(row) or stored_description)
+
+
+def assign_duplicates(conn: Connection, rows: List[Dict[str, Any]]) -> None:
+    """
+    Fill hash_sim and dup_of on a batch of jobs-table rows in place.
+
+    dup_of points at the canonical row of the cluster (the first posting seen);
+    canonical rows keep dup_of NULL. Candidates come from the stored band
+    index plus the rows earlier in this batch. Rows arriving without a
+    description (board listings) are fingerprinted with the stored one, i.e.
+    as the merged row the upsert will leave behind.
+    """
+    sparse = [r["id"] for r in rows if not _description(r)]
+    stored_desc: Dict[str, Optional[str]] = {}
+    if sparse:
+        for jid, md, raw in conn.execute(
+            select(JobRow.id, JobRow.description_md, JobRow.description_raw).where(JobRow.id.in_(sparse))
+        ):
+            stored_desc[jid] = md or raw
+
+    fps = {}
+    for r in rows:
+        fp = fingerprint_row(r, stored_desc.get(r["id"]))
+        r["hash_sim"] = to_hex(fp)
+        fps[r["id"]] = fp
+
+    wanted = {b for fp in fps.values() for b in buckets(fp)}
+    stored: Dict[str, tuple] = {}
+    if wanted:
+        cand_ids = select(JobSimBandRow.job_id).where(JobSimBandRow.bucket.in_(wanted)).distinct()
+        for jid, h, dup in conn.execute(
+            select(JobRow.id, JobRow.hash_sim, JobRow.dup_of).where(JobRow.id.in_(cand_ids))
+        ):
+            if h:
+                stored[jid] = (from_hex(h), dup)
+
+    # bucket -> [(id, fp, dup_of)] for stored rows and rows already processed in this batch
+    index: Dict[int, List[tuple]] = {}
+    for jid, (fp, dup) in stored.items():
+        if jid not in fps:
+            for b in buckets(fp):
+                index.setdefault(b, []).append((jid, fp, dup))
+
+    for r in rows:
+        jid, fp = r["id"], fps[r["id"]]
+        best = None
+        for b in buckets(fp):
+            for cid, cfp, cdup in index.get(b, ()):
+                if cid == jid or cdup == jid:
+                    continue
+                d = hamming(fp, cfp)
+                if d <= MAX_DISTANCE and (best is None or d < best[0]):
+                    best = (d, cdup or cid)
+        r["dup_of"] = best[1] if best else None
+        for b in buckets(fp):
+            index.setdefault(b, []).append((jid, fp, r["dup_of"]))
+
+
+def write_bands(conn: Connection, rows: Iterable[Dict[str, Any]]) -> None:
+    rows = [r for r in rows if r.get("hash_sim")]
+    if not rows:
+        return
+    conn.execute(delete(JobSimBandRow).where(JobSimBandRow.job_id.in_([r["id"] for r in rows])))
+    conn.execute(insert(JobSimBandRow), [
+        {"bucket": b, "job_id": r["id"]}
+        for r in rows for b in buckets(from_hex(r["hash_sim"]))
+    ])
+
+
+def delete_bands(conn: Connection, ids: Sequence[str]) -> None:
+    conn.execute(delete(JobSimBandRow).where(JobSimBandRow.job_id.in_(list(ids))))
+
+
+def reelect_canonicals(conn: Connection, deleted: Sequence[str]) -> None:
+    """
+    Before deleting rows: each cluster whose canonical row is among them gets
+    its oldest surviving member as the new canonical, and the rest of the
+    cluster points at it (rather than every member becoming canonical).
+    """
+    deleted = list(deleted)
+    orphans = conn.execute(
+        select(JobRow.id, JobRow.dup_of)
+        .where(JobRow.dup_of.in_(deleted), JobRow.id.not_in(deleted))
+        .order_by(JobRow.dup_of, JobRow.created_at, JobRow.id)
+    ).all()
+    clusters: Dict[str, List[str]] = {}
+    for jid, old in orphans:
+        clusters.setdefault(old, []).append(jid)
+    for head, *rest in clusters.values():
+        conn.execute(update(JobRow).where(JobRow.id == head).values(dup_of=None))
+        if rest:
+            conn.execute(update(JobRow).where(JobRow.id.in_(rest)).values(dup_of=head))
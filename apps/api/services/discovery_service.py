@@ -1,8 +1,13 @@
-from typing import List, Optional
-from sqlalchemy import select, or_
-from sqlalchemy.orm import Session
-from apps.api.models.domain import Job
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer
+from apps.api.models.domain import Job, JobPage, JobSummary
 from apps.api.models.sql.jobs import JobRow
+from apps.api.services.search_index import apply_search
 
 def _format_salary(row: JobRow) -> Optional[str]:
     if row.salary_min is None and row.salary_max is None:
@@ -15,10 +20,9 @@ def _format_salary(row: JobRow) -> Optional[str]:
         return f"{cur} {int(row.salary_min):,}+/{per}"
     return f"{cur} up to {int(row.salary_max):,}/{per}"
 
-def _to_job(row: JobRow) -> Job:
+def _to_summary(row: JobRow) -> JobSummary:
     url = row.canonical_url or row.apply_url or "http://example.com"  # fallback
-    desc = row.description_md or row.description_raw
-    return Job(
+    return JobSummary(
         id=row.id,
         title=row.title,
         company=row.company,
@@ -26,28 +30,76 @@ def _to_job(row: JobRow) -> Job:
         location=row.location,
         source=row.source,
         salary=_format_salary(row),
-        description_html=desc,
     )
 
-def find_jobs(
-    db: Session,
+def _to_job(row: JobRow) -> Job:
+    desc = row.description_md or row.description_raw
+    return Job(**_to_summary(row).model_dump(), description_html=desc)
+
+def get_job(db: Session, job_id: str) -> Optional[Job]:
+    row = db.get(JobRow, job_id)
+    return _to_job(row) if row else None
+
+class InvalidCursor(ValueError):
+    pass
+
+# Cursors are opaque to clients: base64(json([mode, sort_key, id])).
+# mode "t" = newest first on (posted_at, id); mode "r" = relevance on (rank, id).
+def _encode_cursor(mode: str, key, row_id: str) -> str:
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps([mode, key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, mode: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        got, key, row_id = json.loads(raw)
+        if got != mode:
+            raise ValueError("cursor belongs to a different ordering")
+        if mode == "t" and key is not None:
+            key = datetime.fromisoformat(key)
+        elif mode == "r":
+            key = float(key)
+        return key, str(row_id)
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+def _after_cursor(stmt, mode: str, rank, key, row_id: str):
+    if mode == "r":
+        return stmt.where(or_(rank < key, and_(rank == key, JobRow.id < row_id)))
+    if key is None:
+        return stmt.where(JobRow.posted_at.is_(None), JobRow.id < row_id)
+    return stmt.where(or_(
+        JobRow.posted_at < key,
+        and_(JobRow.posted_at == key, JobRow.id < row_id),
+        JobRow.posted_at.is_(None),
+    ))
+
+def _page_query(
+    dialect: str,
     query: Optional[str],
     location: Optional[str],
     remote: Optional[bool],
     source: Optional[str],
-    limit: int = 25,
-    offset: int = 0,
-) -> List[Job]:
+    limit: int,
+    offset: int,
+    collapse_duplicates: bool,
+    cursor: Optional[str],
+    summary: bool,
+) -> Tuple[Select, str]:
     stmt = select(JobRow)
+    if summary:
+        stmt = stmt.options(defer(JobRow.description_md), defer(JobRow.description_raw))
 
+    if collapse_duplicates:
+        # one canonical row per near-duplicate cluster (see services/dedup.py)
+        stmt = stmt.where(JobRow.dup_of.is_(None))
+
+    rank = None
     if query:
-        like = f"%{query}%"
-        stmt = stmt.where(or_(
-            JobRow.title.ilike(like),
-            JobRow.company.ilike(like),
-            JobRow.description_md.ilike(like),
-            JobRow.description_raw.ilike(like),
-        ))
+        stmt, rank = apply_search(stmt, query, dialect)
+    mode = "r" if rank is not None else "t"
 
     if location:
         stmt = stmt.where(JobRow.location.ilike(f"%{location}%"))
@@ -58,6 +110,108 @@ def find_jobs(
     if source:
         stmt = stmt.where(JobRow.source.ilike(source))
 
-    stmt = stmt.order_by(JobRow.posted_at.desc().nullslast()).limit(limit).offset(offset)
-    rows = db.execute(stmt).scalars().all()
-    return [_to_job(r) for r in rows]
+    # Most relevant first when searching, newest first otherwise
+    if mode == "r":
+        stmt = stmt.add_columns(rank.label("rank")).order_by(rank.desc(), JobRow.id.desc())
+    else:
+        # backed by ix_jobs_posted_at_id (posted_at DESC NULLS LAST, id DESC)
+        stmt = stmt.order_by(JobRow.posted_at.desc().nullslast(), JobRow.id.desc())
+
+    if cursor:
+        key, row_id = _decode_cursor(cursor, mode)
+        stmt = _after_cursor(stmt, mode, rank, key, row_id)
+    elif offset and cursor is None:
+        stmt = stmt.offset(offset)
+
+    # one extra row tells us whether there is a next page
+    return stmt.limit(limit + 1), mode
+
+def _to_page(results, limit: int, mode: str, summary: bool) -> JobPage:
+    has_more = len(results) > limit
+    results = results[:limit]
+
+    next_cursor = None
+    if has_more and results:
+        last = results[-1]
+        key = last.rank if mode == "r" else last[0].posted_at
+        next_cursor = _encode_cursor(mode, key, last[0].id)
+    convert = _to_summary if summary else _to_job
+    return JobPage(items=[convert(r[0]) for r in results], next_cursor=next_cursor)
+
+def find_jobs_page(
+    db: Session,
+    query: Optional[str],
+    location: Optional[str],
+    remote: Optional[bool],
+    source: Optional[str],
+    limit: int = 25,
+    offset: int = 0,
+    collapse_duplicates: bool = False,
+    cursor: Optional[str] = None,
+    summary: bool = False,
+) -> JobPage:
+    """
+    Search jobs. Results are ordered by relevance when a query is given and by
+    recency otherwise, with id as the tie-breaker so the order is total.
+
+    Pass cursor (the previous page's next_cursor) for keyset pagination; it
+    takes precedence over offset, which is kept for backward compatibility.
+    Pass cursor="" to start a keyset walk from the first page.
+
+    With summary=True the description columns are never loaded and items are
+    JobSummary; use get_job() for the full posting.
+    """
+    stmt, mode = _page_query(db.get_bind().dialect.name, query, location, remote, source,
+                             limit, offset, collapse_duplicates, cursor, summary)
+    return _to_page(db.execute(stmt).all(), limit, mode, summary)
+
+async def find_jobs_page_async(
+    db: AsyncSession,
+    query: Optional[str],
+    location: Optional[str],
+    remote: Optional[bool],
+    source: Optional[str],
+    limit: int = 25,
+    offset: int = 0,
+    collapse_duplicates: bool = False,
+    cursor: Optional[str] = None,
+    summary: bool = False,
+) -> JobPage:
+    """find_jobs_page on an AsyncSession (models/db.get_async_db); same query and paging."""
+    stmt, mode = _page_query(db.get_bind().dialect.name, query, location, remote, source,
+                             limit, offset, collapse_duplicates, cursor, summary)
+    return _to_page((await db.execute(stmt)).all(), limit, mode, summary)
+
+def find_jobs(
+    db: Session,
+    query: Optional[str],
+    location: Optional[str],
+    remote: Optional[bool],
+    source: Optional[str],
+    limit: int = 25,
+    offset: int = 0,
+    collapse_duplicates: bool = False,
+) -> List[Job]:
+    return find_jobs_page(
+        db, query, location, remote, source, limit, offset,
+        collapse_duplicates=collapse_duplicates,
+    ).items
+
+async def find_jobs_async(
+    db: AsyncSession,
+    query: Optional[str],
+    location: Optional[str],
+    remote: Optional[bool],
+    source: Optional[str],
+    limit: int = 25,
+    offset: int = 0,
+    collapse_duplicates: bool = False,
+) -> List[Job]:
+    page = await find_jobs_page_async(
+        db, query, location, remote, source, limit, offset,
+        collapse_duplicates=collapse_duplicates,
+    )
+    return page.items
+
+async def count_jobs_async(db: AsyncSession) -> int:
+    return (await db.execute(select(func.count()).select_from(JobRow))).scalar_one()
@@ -0,0 +1,225 @@
+# apps/api/services/ingest_service.py
+# Streaming, batched upserts from connectors into public.jobs.
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from sqlalchemy import Engine, delete, func, select
+from sqlalchemy.orm import Session
+
+from ai.embeddings import embed_many, job_text
+from apps.api.models import db as dbmod
+from apps.api.models.domain import Job
+from apps.api.models.sql.jobs import JobRow
+from apps.api.services.board_state_service import iter_changes, save_states
+from apps.api.services.dedup import assign_duplicates, delete_bands, reelect_canonicals, write_bands
+from apps.api.services.search_cache import bump_generation
+from apps.api.services.search_index import drop_from_index, refresh_index
+from apps.api.services.vector_index import get_vector_index
+from connectors.base import posting_hash
+from connectors.crawl import BoardResult
+
+log = logging.getLogger(__name__)
+
+Record = Union[Job, JobRow, Mapping[str, Any]]
+
+JOBS = JobRow.__table__
+COLUMNS = [c.name for c in JOBS.columns]
+# Never overwritten on conflict
+_KEEP_ON_UPDATE = {"id", "created_at"}
+# Always overwritten on conflict, even with NULL (recomputed per ingest; the
+# fingerprint from the merged row, see dedup.assign_duplicates)
+_OVERWRITE = {"hash_sim", "dup_of", "search_tsv"}
+# Bound-parameter ceilings (SQLite default 32766, Postgres 65535) with headroom
+_MAX_PARAMS = {"sqlite": 30000, "postgresql": 60000}
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    batches: int = 0
+    deleted: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed_s if self.elapsed_s else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "deleted": self.deleted,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_row(rec: Record, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Map a Job, JobRow or plain mapping onto the full jobs column set."""
+    if isinstance(rec, Job):
+        url = str(rec.url) if rec.url else None
+        row = {
+            "id": str(rec.id),
+            "source": rec.source,
+            "company": rec.company,
+            "title": rec.title,
+            "location": rec.location,
+            "apply_url": url,
+            "canonical_url": url,
+            "description_raw": rec.description_html,
+            "content_hash": posting_hash(rec),
+        }
+    elif isinstance(rec, JobRow):
+        row = {c: getattr(rec, c) for c in COLUMNS}
+    else:
+        row = {c: rec.get(c) for c in COLUMNS}
+        row["id"] = str(row["id"])
+    out = {c: row.get(c) for c in COLUMNS}
+    if out["created_at"] is None:
+        out["created_at"] = now or _now()
+    return out
+
+
+def _insert_for(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Bulk upsert not supported on dialect: {dialect}")
+    return insert
+
+
+def _upsert_stmt(dialect: str, rows: List[Dict[str, Any]]):
+    insert = _insert_for(dialect)
+    stmt = insert(JOBS).values(rows)
+    # NULLs from a sparse source (e.g. a board listing without descriptions)
+    # must not wipe values that an earlier, richer ingest filled in.
+    set_ = {
+        c: stmt.excluded[c] if c in _OVERWRITE else func.coalesce(stmt.excluded[c], JOBS.c[c])
+        for c in COLUMNS if c not in _KEEP_ON_UPDATE
+    }
+    return stmt.on_conflict_do_update(index_elements=[JOBS.c.id], set_=set_)
+
+
+def _batched(it: Iterable[Record], n: int) -> Iterator[List[Record]]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, n))
+        if not chunk:
+            return
+        yield chunk
+
+
+def upsert_jobs(
+    records: Iterable[Record],
+    engine: Optional[Engine] = None,
+    batch_size: int = 500,
+) -> IngestStats:
+    """
+    Consume records lazily and write them as multi-row INSERT ... ON CONFLICT
+    (id) DO UPDATE statements, one transaction per batch. Only one batch is
+    held in memory at a time regardless of how large the input is.
+
+    Each batch is fingerprinted for near-duplicate detection (hash_sim/dup_of);
+    its LSH bands and full-text index entries are refreshed in the same
+    transaction. With EMBEDDINGS_ENABLED the batch is also embedded into the
+    job vector index.
+    """
+    engine = engine or dbmod.engine
+    vindex = get_vector_index()
+    dialect = engine.dialect.name
+    batch_size = max(1, min(batch_size, _MAX_PARAMS.get(dialect, 30000) // len(COLUMNS)))
+    stats = IngestStats()
+    t0 = time.perf_counter()
+
+    with engine.connect() as conn:
+        for chunk in _batched(records, batch_size):
+            now = _now()
+            # Postgres rejects a multi-row upsert touching the same key twice; last one wins.
+            rows = list({r["id"]: r for r in (to_row(rec, now) for rec in chunk)}.values())
+            assign_duplicates(conn, rows)
+            conn.execute(_upsert_stmt(dialect, rows))
+            write_bands(conn, rows)
+            refresh_index(conn, [r["id"] for r in rows])
+            # embed the merged rows: a sparse re-crawl keeps the stored description
+            merged = conn.execute(
+                select(JOBS.c.id, JOBS.c.title, JOBS.c.company, JOBS.c.description_md, JOBS.c.description_raw)
+                .where(JOBS.c.id.in_([r["id"] for r in rows]))
+            ).all() if vindex is not None else []
+            conn.commit()
+            if merged:
+                vindex.upsert([m.id for m in merged], embed_many(
+                    job_text(m.title, m.company, m.description_md or m.description_raw) for m in merged
+                ))
+            stats.rows += len(rows)
+            stats.batches += 1
+
+    if stats.rows:
+        bump_generation()  # invalidate cached search results
+    stats.elapsed_s = time.perf_counter() - t0
+    log.info("ingest: %s", stats.as_dict())
+    return stats
+
+
+def delete_jobs(ids: Iterable[str], engine: Optional[Engine] = None, batch_size: int = 1000) -> int:
+    engine = engine or dbmod.engine
+    vindex = get_vector_index()
+    n = 0
+    with engine.connect() as conn:
+        for chunk in _batched(ids, batch_size):
+            delete_bands(conn, chunk)
+            drop_from_index(conn, chunk)
+            # clusters losing their canonical posting elect a new one from the survivors
+            reelect_canonicals(conn, chunk)
+            n += conn.execute(delete(JOBS).where(JOBS.c.id.in_(chunk))).rowcount or 0
+            conn.commit()
+            if vindex is not None:
+                vindex.remove(chunk)
+    if n:
+        bump_generation()
+    return n
+
+
+def ingest_crawl(
+    results: Iterable[BoardResult],
+    engine: Optional[Engine] = None,
+    batch_size: int = 500,
+) -> IngestStats:
+    """
+    Crawl -> diff -> upsert pipeline. Unchanged boards cost nothing beyond
+    their state update; changed boards only write added/changed postings and
+    delete removed ones.
+    """
+    engine = engine or dbmod.engine
+    states = []
+    removed: List[str] = []
+
+    def _upserts(session: Session) -> Iterator[Job]:
+        for res in _track_states(results, states):
+            for _, diff in iter_changes(session, [res]):
+                removed.extend(diff.removed)
+                yield from diff.upserts
+
+    with Session(bind=engine) as session:
+        stats = upsert_jobs(_upserts(session), engine=engine, batch_size=batch_size)
+        stats.deleted = delete_jobs(removed, engine=engine) if removed else 0
+        save_states(session, states)
+    return stats
+
+
+def _track_states(results: Iterable[BoardResult], out: list) -> Iterator[BoardResult]:
+    for res in results:
+        if res.ok and res.state is not None:
+            out.append(res.state)
+        yield res
@@ -1,15 +1,28 @@
 # apps/api/services/profile_service.py
 from __future__ import annotations
+from collections import OrderedDict
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import json
+import threading
 from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from apps.api.models.db import SessionLocal
 from apps.api.models.domain import Profile
+from apps.api.models.sql.profiles import ProfileRow
+from apps.api.settings import settings
+from apps.api.services.resume_parser import get_resume_parser
+from apps.api.services.storage import StoredObject, get_storage, list_versions, store_upload_stream
 
 DATA_DIR = Path("data")
-UPLOADS_DIR = DATA_DIR / "uploads"
 PROFILE_JSON = DATA_DIR / "profile.json"
-UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+
+# profile.json is read-modify-written by requests and by background parses
+_profile_lock = threading.Lock()
+# (st_mtime_ns, st_size, Profile) of the last profile.json read or written here
+_file_cache: Optional[Tuple[int, int, Profile]] = None
 
 def _safe_write_json(path: Path, obj: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -18,56 +31,141 @@ def _safe_write_json(path: Path, obj: dict) -> None:
     tmp.replace(path)
 
 def get_profile() -> Optional[Profile]:
-    if PROFILE_JSON.exists():
-        return Profile(**json.loads(PROFILE_JSON.read_text()))
-    return None
+    """
+    The single-user profile from profile.json. Re-read and re-validated only
+    when the file's mtime or size changes; the returned Profile is shared,
+    so copy it (model_copy) before modifying.
+    """
+    global _file_cache
+    try:
+        st = PROFILE_JSON.stat()
+    except FileNotFoundError:
+        _file_cache = None
+        return None
+    cached = _file_cache
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    prof = Profile(**json.loads(PROFILE_JSON.read_text()))
+    _file_cache = (st.st_mtime_ns, st.st_size, prof)
+    return prof
 
-def save_profile(p: Profile) -> Profile:
+def _write_profile(p: Profile) -> None:
+    # caller holds _profile_lock
+    global _file_cache
     _safe_write_json(PROFILE_JSON, p.model_dump())
+    st = PROFILE_JSON.stat()
+    _file_cache = (st.st_mtime_ns, st.st_size, p.model_copy(deep=True))
+
+def save_profile(p: Profile) -> Profile:
+    with _profile_lock:
+        _write_profile(p)
     return p
 
-def _parse_pdf_text(pdf_path: Path) -> str:
-    # lightweight, robust parser
-    try:
-        from pypdf import PdfReader
-        text = []
-        reader = PdfReader(str(pdf_path))
-        for page in reader.pages:
-            text.append(page.extract_text() or "")
-        return "\n".join(text).strip()
-    except Exception as e:
-        return f""  # fail-soft
-
-def _parse_docx_text(docx_path: Path) -> str:
-    try:
-        import docx
-        doc = docx.Document(str(docx_path))
-        return "\n".join(p.text for p in doc.paragraphs).strip()
-    except Exception:
-        return ""
-
-def store_upload(file: UploadFile, prefix: str) -> Path:
-    ext = Path(file.filename).suffix or ".bin"
-    out = UPLOADS_DIR / f"{prefix}{ext}"
-    with out.open("wb") as f:
-        f.write(file.file.read())
-    return out
-
-def attach_resume(file: UploadFile) -> Profile:
-    path = store_upload(file, prefix="resume")
-    prof = get_profile() or Profile(
-        full_name="", email="you@example.com"
-    )
-    prof.resume_path = str(path.resolve())
-
-    text = ""
-    if path.suffix.lower() == ".pdf":
-        text = _parse_pdf_text(path)
-    elif path.suffix.lower() in {".docx"}:
-        text = _parse_docx_text(path)
-    prof.resume_text = (text or None)
-
-    return save_profile(prof)
+def store_upload(file: UploadFile, name: str) -> Tuple[StoredObject, Path]:
+    """Stream the upload into content-addressed storage; returns it and a local path to read."""
+    storage = get_storage()
+    obj = store_upload_stream(file.file, name, filename=file.filename,
+                              content_type=file.content_type, storage=storage)
+    return obj, storage.local_path(obj.key)
+
+def upload_versions(name: str) -> List[Dict[str, Any]]:
+    return list_versions(name)
+
+def _apply_resume_text(sha256: str, text: Optional[str]) -> None:
+    # parse finished: only update the profile if it still points at this file
+    with _profile_lock:
+        prof = get_profile()
+        if prof is None or prof.resume_sha256 != sha256:
+            return
+        prof = prof.model_copy(update={"resume_text": text})
+        _write_profile(prof)
+
+def attach_resume(file: UploadFile) -> Tuple[Profile, Dict[str, Any]]:
+    """
+    Store the resume and start parsing it in the background. Returns the
+    profile and the parse status handle ({"id": sha256, "status": ...});
+    poll get_resume_parse(id) until "done". Identical bytes parse once.
+    """
+    obj, path = store_upload(file, "resume")
+    sha256 = obj.sha256
+    with _profile_lock:
+        prof = get_profile()
+        prof = prof.model_copy(deep=True) if prof else Profile(
+            full_name="", email="you@example.com"
+        )
+        prof.resume_path = str(path)
+        prof.resume_sha256 = sha256
+        prof.resume_text = None
+        status = get_resume_parser().submit(path, sha256, on_done=_apply_resume_text)
+        if status["status"] == "done":
+            prof.resume_text = status.pop("text") or None
+        _write_profile(prof)
+    return prof, status
+
+def get_resume_parse(parse_id: str) -> Optional[Dict[str, Any]]:
+    return get_resume_parser().status(parse_id)
 
 def attach_cover_letter(file: UploadFile) -> Path:
-    return store_upload(file, prefix="cover_letter")
+    return store_upload(file, "cover_letter")[1]
+
+# ---- multi-user profiles (profiles table) ----
+# user_id -> (version, Profile); a hit costs one primary-key lookup of
+# `version` instead of loading and validating the JSON document.
+_user_cache: "OrderedDict[str, Tuple[int, Profile]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+def _cache_user(user_id: str, version: int, prof: Profile) -> None:
+    with _user_cache_lock:
+        _user_cache[user_id] = (version, prof)
+        _user_cache.move_to_end(user_id)
+        while len(_user_cache) > settings.PROFILE_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+def get_user_profile(db: Session, user_id: str) -> Optional[Profile]:
+    """Profile for user_id (shared instance; copy before modifying)."""
+    version = db.execute(select(ProfileRow.version).where(ProfileRow.user_id == user_id)).scalar()
+    if version is None:
+        with _user_cache_lock:
+            _user_cache.pop(user_id, None)
+        return None
+    with _user_cache_lock:
+        hit = _user_cache.get(user_id)
+        if hit is not None and hit[0] == version:
+            _user_cache.move_to_end(user_id)
+            return hit[1]
+    row = db.get(ProfileRow, user_id)
+    prof = Profile.model_validate(row.data)
+    _cache_user(user_id, row.version, prof)
+    return prof
+
+def save_user_profile(db: Session, user_id: str, p: Profile) -> Profile:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    row = db.get(ProfileRow, user_id)
+    if row is None:
+        row = ProfileRow(user_id=user_id, version=0)
+        db.add(row)
+    row.data = p.model_dump(mode="json")
+    row.version = (row.version or 0) + 1
+    row.updated_at = now
+    db.commit()
+    _cache_user(user_id, row.version, p.model_copy(deep=True))
+    return p
+
+def profile_for(user_id: Optional[str] = None) -> Optional[Profile]:
+    """The user's DB profile, or profile.json when user_id is None (LookupError for an unknown user)."""
+    if user_id is None:
+        return get_profile()
+    db = SessionLocal()
+    try:
+        prof = get_user_profile(db, user_id)
+    finally:
+        db.close()
+    if prof is None:
+        raise LookupError(f"no profile for user {user_id}")
+    return prof
+
+
+def resume_text_for(user_id: Optional[str] = None) -> str:
+    """Resume text for planning (see profile_for)."""
+    prof = profile_for(user_id)
+    return (prof.resume_text if prof else None) or ""
@@ -0,0 +1,199 @@
+# apps/api/services/resume_parser.py
+# Background resume parsing, keyed by the file's SHA-256.
+#
+# submit() returns a status handle immediately; a coordinator thread fans the
+# document out to a process pool (PDFs in runs of RESUME_PARSE_PAGES_PER_TASK
+# pages, so long PDFs use every worker process) and writes the joined text
+# to RESUME_PARSE_CACHE_DIR/<sha256>.json. Re-uploading identical bytes is a
+# cache hit and never re-parses; concurrent uploads of the same bytes share
+# one parse. Parsers are fail-soft: a broken file ends up "failed", not 500.
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from apps.api.settings import settings
+
+log = logging.getLogger(__name__)
+
+PARSER_VERSION = 1   # bump to invalidate cached text when extraction changes
+
+
+# ---- parse functions (run in pool processes; keep them top-level) ----
+def pdf_page_count(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def pdf_pages_text(path: str, start: int, stop: int) -> List[str]:
+    from pypdf import PdfReader
+    pages = PdfReader(path).pages
+    out = []
+    for i in range(start, min(stop, len(pages))):
+        try:
+            out.append(pages[i].extract_text() or "")
+        except Exception:  # one bad page should not lose the rest
+            out.append("")
+    return out
+
+
+def docx_text(path: str) -> str:
+    import docx
+    doc = docx.Document(path)
+    return "\n".join(p.text for p in doc.paragraphs)
+
+
+class ResumeParser:
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        workers: int = 2,
+        pages_per_task: int = 4,
+        pool: Optional[Executor] = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self._pool = pool
+        self._coordinator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="resume-parse")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _processes(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn: forking a threaded API server is unsafe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    # ---- cache ----
+    def _cache_path(self, sha256: str) -> Path:
+        return self.cache_dir / f"{sha256}.json"
+
+    def cached(self, sha256: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = json.loads(self._cache_path(sha256).read_text())
+        except (OSError, ValueError):
+            return None
+        return data if data.get("version") == PARSER_VERSION else None
+
+    def _store(self, sha256: str, data: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._cache_path(sha256)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(path)
+
+    # ---- parsing ----
+    def parse(self, path: Path) -> Dict[str, Any]:
+        """Extract text from path (blocking). Returns {"text", "pages"}."""
+        suffix = path.suffix.lower()
+        procs = self._processes()
+        if suffix == ".pdf":
+            n = procs.submit(pdf_page_count, str(path)).result()
+            runs = [procs.submit(pdf_pages_text, str(path), i, i + self.pages_per_task)
+                    for i in range(0, n, self.pages_per_task)]
+            pages = [text for run in runs for text in run.result()]
+            return {"text": "\n".join(pages).strip(), "pages": n}
+        if suffix == ".docx":
+            return {"text": procs.submit(docx_text, str(path)).result().strip(), "pages": None}
+        raise ValueError(f"unsupported resume type {suffix or '(none)'}; upload .pdf or .docx")
+
+    def _run(self, sha256: str, path: Path, on_done: Optional[Callable[[str, Optional[str]], None]]) -> None:
+        started = time.perf_counter()
+        text = None
+        try:
+            data = self.parse(path)
+            text = data["text"] or None
+            data.update(version=PARSER_VERSION, ms=round((time.perf_counter() - started) * 1000, 1))
+            self._store(sha256, data)
+            status = {"status": "done", "pages": data["pages"], "chars": len(data["text"]), "ms": data["ms"]}
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # a parser process died (e.g. OOM on a hostile PDF); start a fresh pool next time
+                with self._lock:
+                    self._pool = None
+            log.warning("resume parse %s failed: %s", sha256[:12], e)
+            status = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        with self._lock:
+            if status["status"] == "done":
+                self._jobs.pop(sha256, None)   # the cache file answers from now on
+            else:
+                self._jobs[sha256].update(status)
+        if on_done is not None:
+            try:
+                on_done(sha256, text)
+            except Exception as e:
+                log.warning("resume parse %s: on_done failed: %s", sha256[:12], e)
+
+    def submit(
+        self,
+        path: Path,
+        sha256: str,
+        on_done: Optional[Callable[[str, Optional[str]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Start parsing path unless its content is cached or already being parsed.
+        on_done(sha256, text) runs when a new parse finishes (text None on failure);
+        for cache hits the caller uses the returned status's "text" directly.
+        """
+        hit = self.cached(sha256)
+        if hit is not None:
+            self.hits += 1
+            return {"id": sha256, "status": "done", "pages": hit["pages"], "chars": len(hit["text"]),
+                    "text": hit["text"], "cached": True}
+        with self._lock:
+            job = self._jobs.get(sha256)
+            if job is None or job["status"] == "failed":
+                self.misses += 1
+                job = self._jobs[sha256] = {"id": sha256, "status": "pending"}
+                self._coordinator.submit(self._run, sha256, Path(path), on_done)
+            return dict(job)
+
+    def status(self, sha256: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(sha256)
+            if job is not None:
+                return dict(job)
+        hit = self.cached(sha256)
+        if hit is None:
+            return None
+        return {"id": sha256, "status": "done", "pages": hit["pages"], "chars": len(hit["text"]), "ms": hit.get("ms")}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j["status"] == "pending")
+        return {"hits": self.hits, "misses": self.misses, "pending": pending}
+
+    def shutdown(self) -> None:
+        self._coordinator.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+_parser: Optional[ResumeParser] = None
+_parser_lock = threading.Lock()
+
+
+def get_resume_parser() -> ResumeParser:
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = ResumeParser(
+                    settings.RESUME_PARSE_CACHE_DIR,
+                    workers=settings.RESUME_PARSE_WORKERS,
+                    pages_per_task=settings.RESUME_PARSE_PAGES_PER_TASK,
+                )
+    return _parser
@@ -0,0 +1,194 @@
+# apps/api/services/search_cache.py
+# Two-tier response cache for find_jobs_page: in-process LRU + optional Redis.
+#
+# Invalidation is by generation: every key embeds the current generation
+# number and the ingestion pipeline bumps it after writing, so entries from
+# before a crawl can never be served again (they just age out of the LRU).
+# Whenever a Redis URL is configured the generation lives in Redis, so a bump
+# from an ingest process invalidates every API process even when the result
+# tier itself is local-only. Without Redis (or while it is unreachable) the
+# generation is per-process and the local TTL bounds staleness.
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from apps.api.models.domain import JobPage
+from apps.api.settings import settings
+
+log = logging.getLogger(__name__)
+
+GEN_KEY = "autoapply:search:gen"
+KEY_PREFIX = "autoapply:search:v1:"
+
+
+def normalize_params(
+    query: Optional[str] = None,
+    location: Optional[str] = None,
+    remote: Optional[bool] = None,
+    source: Optional[str] = None,
+    limit: int = 25,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    **flags: Any,
+) -> Dict[str, Any]:
+    def _text(v: Optional[str]) -> Optional[str]:
+        v = " ".join((v or "").lower().split())
+        return v or None
+
+    out = {
+        "query": _text(query),
+        "location": _text(location),
+        "remote": remote,
+        "source": _text(source),
+        "limit": limit,
+        "offset": offset if cursor is None else 0,
+        "cursor": cursor,
+    }
+    out.update(sorted(flags.items()))
+    return out
+
+
+class SearchCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 60,
+        redis_url: Optional[str] = None,
+        redis_ttl_seconds: int = 600,
+        redis_results: bool = True,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self.redis_ttl_seconds = redis_ttl_seconds
+        # False keeps pages in the local LRU only; the generation is shared regardless
+        self.redis_results = redis_results
+        self._lru: "OrderedDict[str, tuple[float, JobPage]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local_gen = 0
+        self._redis = None
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    # ---- redis tier (optional, fail-soft) ----
+    def _client(self):
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            from redis import Redis
+            self._redis = Redis.from_url(self.redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return self._redis
+
+    def _redis_call(self, fn: Callable, default=None):
+        client = self._client()
+        if client is None:
+            return default
+        try:
+            return fn(client)
+        except Exception as e:
+            self.redis_errors += 1
+            log.warning("search cache redis error: %s", e)
+            return default
+
+    # ---- generation ----
+    def generation(self) -> int:
+        gen = self._redis_call(lambda r: r.get(GEN_KEY))
+        return int(gen) if gen is not None else self._local_gen
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._local_gen += 1
+            self._lru.clear()
+        gen = self._redis_call(lambda r: r.incr(GEN_KEY))
+        return int(gen) if gen is not None else self._local_gen
+
+    # ---- lookups ----
+    def key(self, params: Dict[str, Any], generation: int) -> str:
+        raw = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        return f"{KEY_PREFIX}{generation}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[JobPage]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is not None and now - hit[0] <= self.ttl_seconds:
+                self._lru.move_to_end(key)
+                self.hits_local += 1
+                return hit[1]
+        raw = self._redis_call(lambda r: r.get(key)) if self.redis_results else None
+        if raw is not None:
+            page = JobPage.model_validate_json(raw)
+            self._put_local(key, page)
+            self.hits_redis += 1
+            return page
+        self.misses += 1
+        return None
+
+    def set(self, key: str, page: JobPage) -> None:
+        self._put_local(key, page)
+        if self.redis_url and self.redis_results:
+            payload = page.model_dump_json()
+            self._redis_call(lambda r: r.set(key, payload, ex=self.redis_ttl_seconds))
+
+    def _put_local(self, key: str, page: JobPage) -> None:
+        with self._lock:
+            self._lru[key] = (time.monotonic(), page)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get_or_compute(self, params: Dict[str, Any], compute: Callable[[], JobPage]) -> JobPage:
+        key = self.key(params, self.generation())
+        page = self.get(key)
+        if page is None:
+            page = compute()
+            self.set(key, page)
+        return page
+
+    async def aget_or_compute(self, params: Dict[str, Any], compute: Callable[[], Awaitable[JobPage]]) -> JobPage:
+        """get_or_compute for async handlers; Redis round trips run off the event loop."""
+        async def call(fn, *args):
+            return await asyncio.to_thread(fn, *args) if self.redis_url else fn(*args)
+
+        key = self.key(params, await call(self.generation))
+        page = await call(self.get, key)
+        if page is None:
+            page = await compute()
+            await call(self.set, key, page)
+        return page
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_local + self.hits_redis + self.misses
+        return {
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "hit_rate": round((self.hits_local + self.hits_redis) / lookups, 4) if lookups else 0.0,
+            "entries_local": len(self._lru),
+            "generation": self.generation(),
+            "redis_enabled": bool(self.redis_url and self.redis_results),
+            "shared_generation": bool(self.redis_url),
+            "redis_errors": self.redis_errors,
+        }
+
+
+search_cache = SearchCache(
+    max_entries=settings.SEARCH_CACHE_SIZE,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+    redis_url=settings.REDIS_URL or None,
+    redis_results=settings.SEARCH_CACHE_REDIS,
+)
+
+
+def bump_generation() -> int:
+    """Called by ingestion after it writes to the jobs table."""
+    return search_cache.bump_generation()
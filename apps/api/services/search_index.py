@@ -0,0 +1,116 @@
+# apps/api/services/search_index.py
+# Ranked full-text search over jobs.
+#   postgresql: jobs.search_tsv (weighted tsvector) + GIN index, ranked by ts_rank_cd
+#   sqlite:     jobs_fts FTS5 table, ranked by bm25 (portable fallback for tests/local)
+# Anything else falls back to the original ILIKE scan, unranked.
+from __future__ import annotations
+
+import re
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import Connection, Double, Select, bindparam, cast, func, literal_column, or_, select, table, column, text
+from sqlalchemy.sql.elements import ColumnElement
+
+from apps.api.models.sql.jobs import JobRow
+
+TS_CONFIG = "english"
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TAG = re.compile(r"<[^>]+>")
+
+# title > company > description, same weighting on both backends
+_FTS = table("jobs_fts", column("job_id"), column("title"), column("company"), column("body"))
+_BM25 = func.bm25(literal_column("jobs_fts"), 0.0, 10.0, 5.0, 1.0)
+
+_PG_TSV = """
+    setweight(to_tsvector('{cfg}', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('{cfg}', coalesce(company, '')), 'B') ||
+    setweight(to_tsvector('{cfg}', regexp_replace(
+        coalesce(description_md, description_raw, ''), '<[^>]+>', ' ', 'g')), 'C')
+""".format(cfg=TS_CONFIG)
+
+
+def query_terms(q: Optional[str]) -> list[str]:
+    return _WORD.findall((q or "").lower())
+
+
+def _pg_tsquery(terms: Sequence[str]) -> ColumnElement:
+    # prefix match on every term so partially typed words still hit
+    return func.to_tsquery(TS_CONFIG, " & ".join(f"{t}:*" for t in terms))
+
+
+def _fts5_query(terms: Sequence[str]) -> str:
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def apply_search(stmt: Select, query: Optional[str], dialect: str) -> Tuple[Select, Optional[ColumnElement]]:
+    """
+    Restrict stmt (a select over JobRow) to rows matching query and return
+    (stmt, rank) where a higher rank is more relevant. rank is None when the
+    backend can't rank or the query has no searchable terms.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return stmt, None
+
+    if dialect == "postgresql":
+        tsq = _pg_tsquery(terms)
+        # ts_rank_cd is float4; as float8 the rank round-trips through a
+        # (Python float) cursor key and rank == key still holds at page edges
+        rank = cast(func.ts_rank_cd(JobRow.search_tsv, tsq), Double)
+        return stmt.where(JobRow.search_tsv.op("@@")(tsq)), rank
+
+    if dialect == "sqlite":
+        hits = (
+            select(_FTS.c.job_id, (-_BM25).label("rank"))
+            .select_from(_FTS)
+            .where(literal_column("jobs_fts").op("MATCH")(_fts5_query(terms)))
+            .subquery("fts_hits")
+        )
+        return stmt.join(hits, hits.c.job_id == JobRow.id), hits.c.rank
+
+    like = f"%{query}%"
+    return stmt.where(or_(
+        JobRow.title.ilike(like),
+        JobRow.company.ilike(like),
+        JobRow.description_md.ilike(like),
+        JobRow.description_raw.ilike(like),
+    )), None
+
+
+def refresh_index(conn: Connection, ids: Sequence[str]) -> None:
+    """Re-index the given job ids from their current jobs-table values."""
+    if not ids:
+        return
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.execute(
+            text(f"UPDATE public.jobs SET search_tsv = {_PG_TSV} WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(ids)},
+        )
+    elif dialect == "sqlite":
+        drop_from_index(conn, ids)
+        rows = conn.execute(
+            select(JobRow.id, JobRow.title, JobRow.company, JobRow.description_md, JobRow.description_raw)
+            .where(JobRow.id.in_(list(ids)))
+        ).all()
+        if rows:
+            conn.execute(_FTS.insert(), [
+                {"job_id": r.id, "title": r.title or "", "company": r.company or "",
+                 "body": _TAG.sub(" ", r.description_md or r.description_raw or "")}
+                for r in rows
+            ])
+
+
+def drop_from_index(conn: Connection, ids: Sequence[str]) -> None:
+    if ids and conn.dialect.name == "sqlite":
+        conn.execute(_FTS.delete().where(_FTS.c.job_id.in_(list(ids))))
+
+
+def rebuild_index(conn: Connection, batch_size: int = 1000) -> int:
+    """Backfill the index for every row, e.g. after first deploying it."""
+    ids = list(conn.execute(select(JobRow.id)).scalars())
+    for i in range(0, len(ids), batch_size):
+        refresh_index(conn, ids[i:i + batch_size])
+    conn.commit()
+    return len(ids)
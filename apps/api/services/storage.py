@@ -0,0 +1,242 @@
+# apps/api/services/storage.py
+# Content-addressed upload storage behind STORAGE_PROVIDER.
+#
+# store_upload_stream() copies an upload to a temp file in CHUNK_BYTES
+# pieces, hashing as it goes and aborting past UPLOAD_MAX_BYTES, so a file is
+# never held in memory. The blob is then committed under its hash:
+#   objects/<sha[:2]>/<sha256><ext>    the bytes (written once; duplicates dedupe)
+#   versions/<name>.json               upload history for a logical name ("resume")
+# Backends only move whole objects: LocalStorage (LOCAL_STORAGE_PATH) and
+# S3Storage (boto3; S3_ENDPOINT_URL points it at MinIO/LocalStack locally).
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from apps.api.settings import settings
+
+CHUNK_BYTES = 1 << 20
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class StoredObject:
+    key: str
+    sha256: str
+    size: int
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    created_at: Optional[str] = None
+    deduped: bool = False   # bytes were already stored
+
+
+def object_key(sha256: str, ext: str = "") -> str:
+    return f"objects/{sha256[:2]}/{sha256}{ext.lower()}"
+
+
+# ---- backends ----
+class LocalStorage:
+    name = "local"
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"   # same filesystem: commits are renames
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def put_file(self, key: str, src: Path) -> None:
+        dest = self._path(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(src), dest)   # a rename when src is on the same filesystem
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        dest = self._path(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(dest)
+
+    def local_path(self, key: str) -> Path:
+        return self._path(key).resolve()
+
+
+class S3Storage:
+    """S3 or any S3-compatible store. Blobs are downloaded to cache_dir on demand (parsers need a path)."""
+    name = "s3"
+
+    def __init__(self, bucket: str, cache_dir: str | Path, prefix: str = "", client=None, **client_kwargs):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("STORAGE_PROVIDER=s3 needs boto3 (pip install boto3)") from e
+            client = boto3.client("s3", **{k: v for k, v in client_kwargs.items() if v})
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.cache_dir = Path(cache_dir)
+        self.tmp_dir = self.cache_dir / "tmp"
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:
+            if _s3_missing(e):
+                return False
+            raise
+
+    def put_file(self, key: str, src: Path) -> None:
+        # upload_file streams and switches to multipart for large files
+        self.client.upload_file(str(src), self.bucket, self._key(key))
+        # keep the local copy: parsing runs against it next
+        dest = self.cache_dir / key
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(src), dest)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"].read()
+        except Exception as e:
+            if _s3_missing(e):
+                return None
+            raise
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def local_path(self, key: str) -> Path:
+        dest = self.cache_dir / key
+        if not dest.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(dest.name + ".tmp")
+            self.client.download_file(self.bucket, self._key(key), str(tmp))
+            tmp.replace(dest)
+        return dest.resolve()
+
+
+def _s3_missing(e: Exception) -> bool:
+    # botocore ClientError carries the S3 error code in e.response
+    code = (getattr(e, "response", None) or {}).get("Error", {}).get("Code")
+    return str(code) in ("404", "NoSuchKey", "NotFound")
+
+
+# ---- uploads ----
+_versions_lock = threading.Lock()
+
+
+def _spool(src: BinaryIO, max_bytes: int, tmp_dir: Path):
+    """Copy src to a temp file chunk by chunk; returns (path, sha256, size)."""
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    h = hashlib.sha256()
+    size = 0
+    fd, name = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: src.read(CHUNK_BYTES), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+                h.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(name)
+        raise
+    return Path(name), h.hexdigest(), size
+
+
+def store_upload_stream(
+    src: BinaryIO,
+    name: str,
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    storage=None,
+    max_bytes: Optional[int] = None,
+) -> StoredObject:
+    """
+    Stream src into content-addressed storage and record it as the newest
+    version of name. Raises UploadTooLarge past max_bytes (UPLOAD_MAX_BYTES).
+    """
+    storage = storage or get_storage()
+    max_bytes = settings.UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    tmp, sha256, size = _spool(src, max_bytes, storage.tmp_dir)
+    ext = Path(filename or "").suffix or ".bin"
+    key = object_key(sha256, ext)
+    deduped = storage.exists(key)
+    try:
+        if not deduped:
+            storage.put_file(key, tmp)
+    finally:
+        tmp.unlink(missing_ok=True)
+    obj = StoredObject(
+        key=key, sha256=sha256, size=size, filename=filename, content_type=content_type,
+        created_at=datetime.now(timezone.utc).replace(tzinfo=None).isoformat(), deduped=deduped,
+    )
+    _add_version(storage, name, obj)
+    return obj
+
+
+def _add_version(storage, name: str, obj: StoredObject) -> None:
+    key = f"versions/{name}.json"
+    with _versions_lock:
+        versions = json.loads(storage.get_bytes(key) or b"[]")
+        if versions and versions[-1]["sha256"] == obj.sha256 and versions[-1]["key"] == obj.key:
+            return  # re-upload of the current version
+        entry = asdict(obj)
+        entry.pop("deduped")
+        versions.append(entry)
+        storage.put_bytes(key, json.dumps(versions, indent=2).encode())
+
+
+def list_versions(name: str, storage=None) -> List[Dict[str, Any]]:
+    """Upload history for name, oldest first."""
+    storage = storage or get_storage()
+    return json.loads(storage.get_bytes(f"versions/{name}.json") or b"[]")
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if settings.STORAGE_PROVIDER == "s3":
+                    _storage = S3Storage(
+                        settings.S3_BUCKET,
+                        cache_dir=Path(settings.LOCAL_STORAGE_PATH) / "s3-cache",
+                        prefix=settings.S3_PREFIX,
+                        endpoint_url=settings.S3_ENDPOINT_URL,
+                        region_name=settings.S3_REGION,
+                    )
+                elif settings.STORAGE_PROVIDER == "local":
+                    _storage = LocalStorage(settings.LOCAL_STORAGE_PATH)
+                else:
+                    raise ValueError(f"Unsupported STORAGE_PROVIDER: {settings.STORAGE_PROVIDER}")
+    return _storage
@@ -0,0 +1,213 @@
+# apps/api/services/vector_index.py
+# Compact on-disk job vector store + exact top-k search.
+#
+# Layout under EMBEDDINGS_DIR:
+#   vectors.f16  float16 matrix (capacity x dim), memory-mapped
+#   ids.log      append-only "+<id>" (new row, in row order) / "-<id>" (tombstone)
+#   meta.json    {"dim", "capacity", "count"}
+# Rows are never moved, so readers only need to reload when count changes.
+# Only the writer (the first instance to upsert/remove, i.e. the ingest job)
+# ever grows or rewrites files; it grows vectors.f16 before committing the
+# new meta.json, so readers map it read-only and never touch its size.
+# Search is brute force in fixed-size chunks: float16 storage keeps 300k jobs
+# at ~150 MB and a full scan is a handful of matrix-vector products.
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai.embeddings import DIM
+from apps.api.settings import settings
+
+CHUNK_ROWS = 16384
+
+
+class VectorIndex:
+    def __init__(self, root: Path | str, dim: int = DIM, initial_capacity: int = 4096):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._meta_mtime = None
+        self._ids: List[Optional[str]] = []
+        self._pos: Dict[str, int] = {}
+        self._mat: Optional[np.memmap] = None
+        self._writable = False
+        self.capacity = 0
+        if not self._meta_path.exists():
+            self._grow(initial_capacity)
+            self._write_meta(0, initial_capacity)
+        self._load()
+
+    # ---- files ----
+    @property
+    def _meta_path(self) -> Path:
+        return self.root / "meta.json"
+
+    @property
+    def _vec_path(self) -> Path:
+        return self.root / "vectors.f16"
+
+    @property
+    def _log_path(self) -> Path:
+        return self.root / "ids.log"
+
+    def _write_meta(self, count: int, capacity: int) -> None:
+        tmp = self._meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"dim": self.dim, "capacity": capacity, "count": count}))
+        tmp.replace(self._meta_path)
+
+    def _grow(self, capacity: int) -> None:
+        # writer only; never shrinks, so no reader's mapping can lose pages under it
+        size = capacity * self.dim * 2
+        if not self._vec_path.exists() or self._vec_path.stat().st_size < size:
+            with open(self._vec_path, "ab") as f:
+                f.truncate(size)
+
+    def _map(self, capacity: int) -> None:
+        mode = "r+" if self._writable else "r"
+        self._mat = np.memmap(self._vec_path, dtype=np.float16, mode=mode, shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def _become_writer(self) -> None:
+        if not self._writable:
+            self._writable = True
+            self._load()
+
+    def _load(self) -> None:
+        meta = json.loads(self._meta_path.read_text())
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Index at {self.root} has dim {meta['dim']}, expected {self.dim}")
+        self._meta_mtime = self._meta_path.stat().st_mtime_ns
+        ids: List[Optional[str]] = []
+        pos: Dict[str, int] = {}
+        if self._log_path.exists():
+            with open(self._log_path, encoding="utf-8") as f:
+                for line in f:
+                    op, jid = line[0], line[1:].rstrip("\n")
+                    if op == "+":
+                        pos[jid] = len(ids)
+                        ids.append(jid)
+                    elif jid in pos:
+                        ids[pos.pop(jid)] = None
+        if len(ids) > meta["count"]:
+            # rows past meta["count"] belong to a write that has not committed its
+            # meta (yet, or ever); only the writer may drop them from the log
+            ids = ids[:meta["count"]]
+            if self._writable:
+                self._rewrite_log(ids)
+        self._ids, self._pos = ids, {k: v for k, v in pos.items() if v < len(ids)}
+        self._map(meta["capacity"])
+
+    def _rewrite_log(self, ids: List[Optional[str]]) -> None:
+        tmp = self._log_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row, jid in enumerate(ids):
+                # dead rows keep their slot with a placeholder id
+                f.write(f"+{jid}\n" if jid is not None else f"+\x00{row}\n-\x00{row}\n")
+        tmp.replace(self._log_path)
+
+    def refresh(self) -> None:
+        """Pick up rows written by another process (e.g. the ingest job)."""
+        with self._lock:
+            if self._meta_path.stat().st_mtime_ns != self._meta_mtime:
+                self._load()
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    # ---- writes ----
+    def upsert(self, ids: Sequence[str], vecs: np.ndarray) -> None:
+        with self._lock:
+            self._become_writer()
+            new = [jid for jid in dict.fromkeys(ids) if jid not in self._pos]
+            need = len(self._ids) + len(new)
+            if need > self.capacity:
+                cap = self.capacity
+                while cap < need:
+                    cap *= 2
+                self._grow(cap)
+                self._map(cap)
+            if new:
+                with open(self._log_path, "a", encoding="utf-8") as f:
+                    f.writelines(f"+{jid}\n" for jid in new)
+                for jid in new:
+                    self._pos[jid] = len(self._ids)
+                    self._ids.append(jid)
+            rows = np.fromiter((self._pos[jid] for jid in ids), dtype=np.int64, count=len(ids))
+            self._mat[rows] = vecs.astype(np.float16)
+            self._mat.flush()
+            self._write_meta(len(self._ids), self.capacity)
+            self._meta_mtime = self._meta_path.stat().st_mtime_ns
+
+    def remove(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            self._become_writer()
+            gone = [jid for jid in ids if jid in self._pos]
+            if not gone:
+                return
+            with open(self._log_path, "a", encoding="utf-8") as f:
+                f.writelines(f"-{jid}\n" for jid in gone)
+            for jid in gone:
+                row = self._pos.pop(jid)
+                self._ids[row] = None
+                self._mat[row] = 0
+            self._mat.flush()
+            self._write_meta(len(self._ids), self.capacity)
+            self._meta_mtime = self._meta_path.stat().st_mtime_ns
+
+    # ---- reads ----
+    def similarities(self, query: np.ndarray, ids: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of query to each id; NaN where the id is not indexed."""
+        out = np.full(len(ids), np.nan, dtype=np.float32)
+        idx = [(i, self._pos[jid]) for i, jid in enumerate(ids) if jid in self._pos]
+        if idx:
+            where, rows = zip(*idx)
+            out[list(where)] = self._mat[list(rows)].astype(np.float32) @ query.astype(np.float32)
+        return out
+
+    def search(self, query: np.ndarray, k: int = 50) -> List[Tuple[str, float]]:
+        """Exact top-k ids by cosine similarity, best first."""
+        q = query.astype(np.float32)
+        n = len(self._ids)
+        if n == 0 or k <= 0:
+            return []
+        dead = np.fromiter((r for r, jid in enumerate(self._ids) if jid is None), dtype=np.int64) \
+            if len(self._pos) < n else np.empty(0, dtype=np.int64)
+        best_s = np.empty(0, dtype=np.float32)
+        best_r = np.empty(0, dtype=np.int64)
+        for start in range(0, n, CHUNK_ROWS):
+            sims = self._mat[start:min(start + CHUNK_ROWS, n)].astype(np.float32) @ q
+            if dead.size:
+                in_chunk = dead[(dead >= start) & (dead < start + sims.size)]
+                sims[in_chunk - start] = -np.inf
+            take = min(k, sims.size)
+            part = np.argpartition(-sims, take - 1)[:take]
+            best_s = np.concatenate([best_s, sims[part]])
+            best_r = np.concatenate([best_r, part + start])
+            if best_s.size > k:
+                keep = np.argpartition(-best_s, k - 1)[:k]
+                best_s, best_r = best_s[keep], best_r[keep]
+        order = np.argsort(-best_s, kind="stable")
+        return [(self._ids[best_r[i]], float(best_s[i])) for i in order if np.isfinite(best_s[i])]
+
+
+_default: Optional[VectorIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_vector_index() -> Optional[VectorIndex]:
+    """Process-wide index, or None when EMBEDDINGS_ENABLED is off."""
+    global _default
+    if not settings.EMBEDDINGS_ENABLED:
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = VectorIndex(settings.EMBEDDINGS_DIR)
+        else:
+            _default.refresh()
+        return _default
@@ -12,9 +12,35 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     REDIS_URL: str = "redis://127.0.0.1:6379/0"
 
+    # DB connection pools (apps/api/models/db.py); the sync and async engines
+    # each get their own pool of this size. Ignored for SQLite.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_STATEMENT_TIMEOUT_MS: int = 0          # Postgres statement_timeout; 0 = server default
+    DATABASE_URL_ASYNC: Optional[str] = None  # default: DATABASE_URL with an async driver
+
     # LLM
     LLM_PROVIDER: SupportedProvider = "openai"
     LLM_MODEL: str = "gpt-4o-mini"
+    LLM_TIMEOUT_SECONDS: float = 60
+
+    # Prompt assembly (ai/prompt_builder.py): JD + resume token budget per prompt
+    PROMPT_TOKEN_BUDGET: int = 3000
+    PROMPT_JD_SHARE: float = 0.5
+
+    # LLM plan cache (ai/plan_cache.py)
+    PLAN_CACHE_ENABLED: bool = True
+    PLAN_CACHE_PATH: str = "data/plan_cache.sqlite3"
+    PLAN_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    PLAN_CACHE_MAX_ENTRIES: int = 5000
+    PLAN_CACHE_MAX_BYTES: int = 200 * 1024 * 1024
+    PLAN_CACHE_REDIS: bool = False
+
+    # /apply/plan_batch
+    PLAN_BATCH_CONCURRENCY: int = 4
+    PLAN_BATCH_MAX_JOBS: int = 100
 
     # Provider keys (optional; validated at runtime)
     OPENAI_API_KEY: Optional[str] = None
@@ -27,9 +53,47 @@ class Settings(BaseSettings):
     HITL_REQUIRED: bool = True
     RATE_LIMIT_GLOBAL_PER_MIN: int = 8
 
-    # Storage (optional)
-    STORAGE_PROVIDER: str = "local"
-    LOCAL_STORAGE_PATH: str = "./uploads"
+    # Shared Chromium for submissions (automation/browser_pool.py)
+    BROWSER_POOL_MAX_CONTEXTS: int = 4
+    BROWSER_POOL_MAX_USES: int = 50          # relaunch after this many contexts
+    BROWSER_POOL_MAX_MEMORY_MB: float = 1500 # ...or when Chromium RSS exceeds this
+    BROWSER_POOL_MEMORY_CHECK_SECONDS: float = 10  # how often that RSS is sampled
+    BROWSER_LEAN_MODE: bool = False          # block images/fonts/media/trackers (automation/lean_mode.py)
+    FORM_SCHEMA_DIR: str = "data/form_schemas"  # cached per-company form schemas (automation/form_schema.py)
+
+    # Async worker (apps/worker/worker.py)
+    WORKER_CONCURRENCY: int = 3              # submissions in flight per worker process
+    WORKER_VISIBILITY_TIMEOUT: float = 900   # lease before an unacked task is re-run elsewhere
+    WORKER_MAX_ATTEMPTS: int = 3
+    WORKER_RETRY_BACKOFF_SECONDS: float = 30 # doubled per attempt
+    WORKER_DRAIN_SECONDS: float = 60         # grace period for running tasks on SIGTERM
+    WORKER_POLL_SECONDS: float = 1
+
+    # Search result cache (apps/api/services/search_cache.py)
+    SEARCH_CACHE_SIZE: int = 1024
+    SEARCH_CACHE_TTL_SECONDS: float = 60
+    SEARCH_CACHE_REDIS: bool = False   # also share cached pages via REDIS_URL (the generation always is)
+
+    # Local embeddings (ai/embeddings.py + services/vector_index.py)
+    EMBEDDINGS_ENABLED: bool = False
+    EMBEDDINGS_DIR: str = "data/embeddings"
+
+    # Per-user profiles (profiles table): validated Profiles kept in memory
+    PROFILE_CACHE_SIZE: int = 1024
+
+    # Resume parsing (apps/api/services/resume_parser.py)
+    RESUME_PARSE_WORKERS: int = 2          # parser processes
+    RESUME_PARSE_PAGES_PER_TASK: int = 4   # PDF pages per pool task
+    RESUME_PARSE_CACHE_DIR: str = "data/resume_cache"  # parsed text by content SHA-256
+
+    # Storage (optional) — content-addressed uploads (apps/api/services/storage.py)
+    STORAGE_PROVIDER: Literal["local", "s3"] = "local"
+    LOCAL_STORAGE_PATH: str = "data/uploads"   # blobs (local) / temp + download cache (s3)
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    S3_BUCKET: str = "autoapply-uploads"
+    S3_REGION: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None      # MinIO/LocalStack or other S3-compatible stores
+    S3_PREFIX: str = ""
 
     model_config = SettingsConfigDict(
         env_file=".env",
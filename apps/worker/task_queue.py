@@ -0,0 +1,200 @@
+# apps/worker/task_queue.py
+# Reliable Redis task queue for the async worker (apps/worker/worker.py).
+#
+# Tasks are small ID-based payloads ({"kind": "submit", "job_id": ...}); the
+# worker loads everything else from the DB. Keys under PREFIX:
+#   ready     ZSET id -> priority-then-FIFO score
+#   delayed   ZSET id -> due time (retries with backoff, deferrals)
+#   inflight  ZSET id -> visibility deadline; expired ids are reclaimed
+#   task:<id> STRING JSON payload (+ attempts, enqueued_at, last_error)
+#   dead      LIST of ids that exhausted their attempts
+#   latency   LIST of recent "wait_ms run_ms" samples (capped)
+# claim() is one Lua script: promote due retries, reclaim expired leases,
+# then pop the best ready id and lease it, so a crashed worker's tasks come
+# back after the visibility timeout and no task is handed out twice at once.
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+PREFIX = "autoapply:q:"
+LATENCY_SAMPLES = 1000
+
+_CLAIM_LUA = """
+local ready, delayed, inflight = KEYS[1], KEYS[2], KEYS[3]
+local now, lease = tonumber(ARGV[1]), tonumber(ARGV[2])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', delayed, '-inf', now, 'LIMIT', 0, 100)) do
+  redis.call('ZREM', delayed, id)
+  redis.call('ZADD', ready, tonumber(redis.call('HGET', ARGV[3] .. 'score', id) or now), id)
+end
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', inflight, '-inf', now, 'LIMIT', 0, 100)) do
+  redis.call('ZREM', inflight, id)
+  redis.call('ZADD', ready, tonumber(redis.call('HGET', ARGV[3] .. 'score', id) or now), id)
+end
+local top = redis.call('ZRANGE', ready, 0, 0)
+if #top == 0 then return nil end
+local id = top[1]
+redis.call('ZREM', ready, id)
+redis.call('ZADD', inflight, now + lease, id)
+return {id, redis.call('GET', ARGV[3] .. 'task:' .. id)}
+"""
+
+
+def _now() -> float:
+    return time.time()
+
+
+def priority_score(priority: int, enqueued_at: float) -> float:
+    # higher priority first, then FIFO; ms timestamps stay below 1e13
+    return -priority * 1e13 + enqueued_at * 1000
+
+
+def _new_task(kind: str, priority: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": uuid.uuid4().hex, "kind": kind, "priority": priority,
+            "attempts": 0, "enqueued_at": _now(), **payload}
+
+
+def enqueue_sync(redis, kind: str, priority: int = 0, **payload: Any) -> str:
+    """Enqueue from synchronous code (API handlers, scripts) with a redis.Redis client."""
+    task = _new_task(kind, priority, payload)
+    score = priority_score(priority, task["enqueued_at"])
+    pipe = redis.pipeline()
+    pipe.set(PREFIX + "task:" + task["id"], json.dumps(task))
+    pipe.hset(PREFIX + "score", task["id"], score)
+    pipe.zadd(PREFIX + "ready", {task["id"]: score})
+    pipe.execute()
+    return task["id"]
+
+
+class TaskQueue:
+    """Async side of the queue, used by the worker (redis.asyncio client)."""
+    def __init__(self, redis, visibility_timeout: float = 900, max_attempts: int = 3,
+                 backoff_seconds: float = 30):
+        self.redis = redis
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self._claim = redis.register_script(_CLAIM_LUA)
+
+    def _k(self, name: str) -> str:
+        return PREFIX + name
+
+    async def enqueue(self, kind: str, priority: int = 0, delay: float = 0, **payload: Any) -> str:
+        task = _new_task(kind, priority, payload)
+        score = priority_score(priority, task["enqueued_at"])
+        pipe = self.redis.pipeline()
+        pipe.set(self._k("task:" + task["id"]), json.dumps(task))
+        pipe.hset(self._k("score"), task["id"], score)
+        if delay > 0:
+            pipe.zadd(self._k("delayed"), {task["id"]: task["enqueued_at"] + delay})
+        else:
+            pipe.zadd(self._k("ready"), {task["id"]: score})
+        await pipe.execute()
+        return task["id"]
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the highest-priority ready task, or None."""
+        res = await self._claim(
+            keys=[self._k("ready"), self._k("delayed"), self._k("inflight")],
+            args=[_now(), self.visibility_timeout, PREFIX],
+        )
+        if not res:
+            return None
+        task_id, raw = res[0], res[1]
+        task_id = task_id.decode() if isinstance(task_id, bytes) else task_id
+        if raw is None:  # payload vanished (acked elsewhere); drop the lease
+            await self.redis.zrem(self._k("inflight"), task_id)
+            return None
+        task = json.loads(raw)
+        task["attempts"] += 1
+        task["claimed_at"] = _now()
+        await self.redis.set(self._k("task:" + task_id), json.dumps(task))
+        return task
+
+    async def extend(self, task: Dict[str, Any]) -> None:
+        """Heartbeat: push the lease deadline out while the task is still running."""
+        await self.redis.zadd(self._k("inflight"), {task["id"]: _now() + self.visibility_timeout}, xx=True)
+
+    async def ack(self, task: Dict[str, Any]) -> None:
+        done = _now()
+        wait_ms = (task.get("claimed_at", done) - task["enqueued_at"]) * 1000
+        run_ms = (done - task.get("claimed_at", done)) * 1000
+        pipe = self.redis.pipeline()
+        pipe.zrem(self._k("inflight"), task["id"])
+        pipe.delete(self._k("task:" + task["id"]))
+        pipe.hdel(self._k("score"), task["id"])
+        pipe.lpush(self._k("latency"), f"{wait_ms:.1f} {run_ms:.1f}")
+        pipe.ltrim(self._k("latency"), 0, LATENCY_SAMPLES - 1)
+        pipe.hincrby(self._k("counters"), "succeeded", 1)
+        await pipe.execute()
+
+    async def retry(self, task: Dict[str, Any], error: str, delay: Optional[float] = None,
+                    count_attempt: bool = True) -> bool:
+        """
+        Put a failed task back with exponential backoff; after max_attempts it
+        goes to the dead list instead. Returns True if it will run again.
+        """
+        task["last_error"] = error
+        if not count_attempt:
+            task["attempts"] -= 1
+        pipe = self.redis.pipeline()
+        pipe.zrem(self._k("inflight"), task["id"])
+        pipe.set(self._k("task:" + task["id"]), json.dumps(task))
+        again = task["attempts"] < self.max_attempts
+        if again:
+            delay = self.backoff_seconds * 2 ** (task["attempts"] - 1) if delay is None else delay
+            pipe.zadd(self._k("delayed"), {task["id"]: _now() + delay})
+            pipe.hincrby(self._k("counters"), "retried", 1)
+        else:
+            pipe.lpush(self._k("dead"), task["id"])
+            pipe.hincrby(self._k("counters"), "dead", 1)
+        await pipe.execute()
+        return again
+
+    async def stats(self) -> Dict[str, Any]:
+        return await queue_stats_async(self.redis)
+
+
+def _summarize(depths: List[int], counters: Dict, samples: List) -> Dict[str, Any]:
+    def pct(xs: List[float], q: float) -> Optional[float]:
+        if not xs:
+            return None
+        xs = sorted(xs)
+        return round(xs[min(len(xs) - 1, int(q * len(xs)))], 1)
+
+    waits, runs = [], []
+    for s in samples:
+        w, r = (s.decode() if isinstance(s, bytes) else s).split()
+        waits.append(float(w))
+        runs.append(float(r))
+    counters = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in counters.items()}
+    return {
+        "ready": depths[0], "delayed": depths[1], "inflight": depths[2], "dead": depths[3],
+        "counters": counters,
+        "wait_ms": {"p50": pct(waits, 0.5), "p95": pct(waits, 0.95)},
+        "run_ms": {"p50": pct(runs, 0.5), "p95": pct(runs, 0.95)},
+        "samples": len(samples),
+    }
+
+
+def _stats_pipeline(pipe):
+    pipe.zcard(PREFIX + "ready")
+    pipe.zcard(PREFIX + "delayed")
+    pipe.zcard(PREFIX + "inflight")
+    pipe.llen(PREFIX + "dead")
+    pipe.hgetall(PREFIX + "counters")
+    pipe.lrange(PREFIX + "latency", 0, LATENCY_SAMPLES - 1)
+    return pipe
+
+
+def queue_stats(redis) -> Dict[str, Any]:
+    """Depth + latency percentiles (sync client; used by /admin/metrics)."""
+    res = _stats_pipeline(redis.pipeline()).execute()
+    return _summarize(res[:4], res[4], res[5])
+
+
+async def queue_stats_async(redis) -> Dict[str, Any]:
+    res = await _stats_pipeline(redis.pipeline()).execute()
+    return _summarize(res[:4], res[4], res[5])
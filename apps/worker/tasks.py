@@ -1,9 +1,37 @@
-from rq import Queue
+# apps/worker/tasks.py
+# Producer side of the worker queue. Tasks carry IDs only; the worker
+# (apps/worker/worker.py) loads the job / checkpoint from the DB when it runs.
+import threading
+from typing import Optional
+
 from redis import Redis
-from automation.form_filler import submit_application
 
-redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
-q = Queue("autoapply", connection=redis)
+from apps.api.settings import settings
+from .task_queue import enqueue_sync, queue_stats
+
+_redis: Optional[Redis] = None
+_redis_lock = threading.Lock()
+
+
+def get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        with _redis_lock:
+            if _redis is None:
+                _redis = Redis.from_url(settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _redis
+
+
+def enqueue_submit(job_id: str, hitl_required: bool = True, priority: int = 0, user_id: Optional[str] = None) -> str:
+    """Queue a job for plan + fill (+ checkpoint for review when hitl_required); user_id picks the profile."""
+    return enqueue_sync(get_redis(), "submit", priority=priority, job_id=str(job_id),
+                        hitl_required=hitl_required, user_id=user_id)
+
+
+def enqueue_resume(checkpoint_id: str, priority: int = 10) -> str:
+    """Queue an approved checkpoint for submission; ahead of new fills by default."""
+    return enqueue_sync(get_redis(), "resume", priority=priority, checkpoint_id=str(checkpoint_id))
+
 
-def enqueue_submit(job, plan):
-    return q.enqueue(submit_application, job, plan, job_timeout=600)
\ No newline at end of file
+def stats() -> dict:
+    return queue_stats(get_redis())
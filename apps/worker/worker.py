@@ -0,0 +1,249 @@
+# apps/worker/worker.py
+# Async worker process (Dockerfile.worker: python apps/worker/worker.py).
+#
+# One asyncio loop per process pulls ID-only tasks from the Redis queue
+# (apps/worker/task_queue.py) and runs up to WORKER_CONCURRENCY of them at
+# once, sharing one browser pool and one SubmissionScheduler, so per-site
+# pacing and quotas from policies/sites.yaml still apply across slots.
+# Running tasks heartbeat their lease; if the process dies the lease expires
+# after WORKER_VISIBILITY_TIMEOUT and another worker picks the task up.
+# SIGTERM/SIGINT stop claiming, give running tasks WORKER_DRAIN_SECONDS to
+# finish, then cancel the rest and hand them straight back to the queue.
+import asyncio
+import logging
+import signal
+import sys
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+if __package__ in (None, ""):
+    # run as a script: import from the repo root, not from apps/worker
+    _here = Path(__file__).resolve().parent
+    sys.path[:] = [p for p in sys.path if Path(p or ".").resolve() != _here]
+    sys.path.insert(0, str(_here.parents[1]))
+
+from apps.api.models.db import SessionLocal, engine
+from apps.api.models.schema import ensure_schema
+from apps.api.services.application_service import plan_application
+from apps.api.services.checkpoint_service import get_checkpoint
+from apps.api.services.discovery_service import get_job
+from apps.api.services.profile_service import profile_for
+from apps.api.settings import settings
+from apps.worker.task_queue import TaskQueue
+
+log = logging.getLogger("autoapply.worker")
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class Defer(Exception):
+    """Run the task again after delay seconds without spending an attempt."""
+    def __init__(self, reason: str, delay: float):
+        super().__init__(reason)
+        self.delay = delay
+
+
+class Discard(Exception):
+    """The task can never succeed; dead-letter it without retrying."""
+
+
+def _db_call(fn, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def _seconds_to_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+# ---- handlers ----
+def _outcome(result, retry_failed: bool = True) -> Dict[str, Any]:
+    """Map a SubmissionResult onto the queue: retry, Defer (quota) or Discard (blocked)."""
+    if result.status == "failed":
+        if retry_failed:
+            raise RuntimeError(result.error)
+        raise Discard(result.error)
+    if result.status == "quota_exceeded":
+        raise Defer(result.error, _seconds_to_utc_midnight() + 60)
+    if result.status == "blocked":
+        raise Discard(result.error or f"{result.site}: blocked by policy")
+    return {"status": result.status, "waited_seconds": result.waited_seconds, "timings": result.timings}
+
+
+async def handle_submit(task: Dict[str, Any], scheduler) -> Dict[str, Any]:
+    job = await asyncio.to_thread(_db_call, get_job, task["job_id"])
+    if job is None:
+        raise Discard(f"job {task['job_id']} not found")
+    try:
+        plan = await asyncio.to_thread(plan_application, job, True, task.get("user_id"))
+        profile = await asyncio.to_thread(profile_for, task.get("user_id"))
+    except LookupError as e:   # no such user profile
+        raise Discard(str(e)) from e
+    result = await scheduler.submit(job, plan, hitl_required=task.get("hitl_required", True),
+                                    resume_path=profile.resume_path if profile else None)
+    return _outcome(result)
+
+
+async def handle_resume(task: Dict[str, Any], scheduler) -> Dict[str, Any]:
+    row = await asyncio.to_thread(_db_call, get_checkpoint, task["checkpoint_id"])
+    if row is None:
+        raise Discard(f"checkpoint {task['checkpoint_id']} not found")
+    if row.status != "approved":
+        raise Discard(f"checkpoint {row.id} is {row.status}, not approved")
+    result = await scheduler.resume(row.id, row.source, row.job_id)
+    # a failed resume marks the checkpoint failed; re-approving it through the
+    # API enqueues a fresh task, so retrying here is pointless
+    return _outcome(result, retry_failed=False)
+
+
+# ---- runtime ----
+class Worker:
+    def __init__(
+        self,
+        queue: TaskQueue,
+        handlers: Dict[str, Handler],
+        concurrency: int = 3,
+        poll_seconds: float = 1.0,
+        drain_seconds: float = 60.0,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.drain_seconds = drain_seconds
+        self._slots = asyncio.Semaphore(concurrency)
+        self._running: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self) -> None:
+        if not self._stopping.is_set():
+            log.info("worker: draining %d running task(s)", len(self._running))
+            self._stopping.set()
+
+    async def _idle(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            task: Optional[Dict[str, Any]] = None
+            try:
+                if not self._stopping.is_set():
+                    task = await self.queue.claim()
+            except Exception as e:
+                log.warning("worker: claim failed: %s", e)
+            if task is None:
+                self._slots.release()
+                await self._idle(self.poll_seconds)
+                continue
+            t = asyncio.create_task(self._run_one(task), name=f"task-{task['id']}")
+            self._running.add(t)
+            t.add_done_callback(self._running.discard)
+        await self._drain()
+
+    async def _drain(self) -> None:
+        if not self._running:
+            return
+        _, pending = await asyncio.wait(set(self._running), timeout=self.drain_seconds)
+        for t in pending:
+            t.cancel()
+        if pending:
+            log.warning("worker: cancelled %d task(s) still running after %ss", len(pending), self.drain_seconds)
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _heartbeat(self, task: Dict[str, Any]) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, self.queue.visibility_timeout / 3))
+            try:
+                await self.queue.extend(task)
+            except Exception as e:
+                log.warning("worker: heartbeat for %s failed: %s", task["id"], e)
+
+    async def _run_one(self, task: Dict[str, Any]) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+        try:
+            handler = self.handlers.get(task["kind"])
+            if handler is None:
+                raise Discard(f"no handler for task kind {task['kind']!r}")
+            await handler(task)
+        except Defer as e:
+            await self._settle(self.queue.retry(task, str(e), delay=e.delay, count_attempt=False))
+        except Discard as e:
+            self.failed += 1
+            log.warning("worker: %s %s discarded: %s", task["kind"], task["id"], e)
+            task["attempts"] = self.queue.max_attempts
+            await self._settle(self.queue.retry(task, str(e)))
+        except asyncio.CancelledError:
+            # shutdown: hand the task back immediately, not after the lease expires
+            await self._settle(self.queue.retry(task, "cancelled during shutdown", delay=0, count_attempt=False))
+            raise
+        except Exception as e:
+            self.failed += 1
+            log.warning("worker: %s %s failed (attempt %d): %s", task["kind"], task["id"], task["attempts"], e)
+            await self._settle(self.queue.retry(task, f"{type(e).__name__}: {e}"))
+        else:
+            self.processed += 1
+            await self._settle(self.queue.ack(task))
+        finally:
+            heartbeat.cancel()
+            self._slots.release()
+
+    async def _settle(self, op: Awaitable) -> None:
+        # if Redis is unreachable the lease simply expires and the task is re-run
+        try:
+            await op
+        except Exception as e:
+            log.warning("worker: queue bookkeeping failed: %s", e)
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    from redis.asyncio import Redis
+    from automation.browser_pool import close_browser_pool
+    from automation.scheduler import SubmissionScheduler
+
+    await asyncio.to_thread(ensure_schema, engine)
+    redis = Redis.from_url(settings.REDIS_URL)
+    queue = TaskQueue(
+        redis,
+        visibility_timeout=settings.WORKER_VISIBILITY_TIMEOUT,
+        max_attempts=settings.WORKER_MAX_ATTEMPTS,
+        backoff_seconds=settings.WORKER_RETRY_BACKOFF_SECONDS,
+    )
+    scheduler = SubmissionScheduler()   # one per process: site locks and fallback limits are shared
+    handlers = {
+        "submit": partial(handle_submit, scheduler=scheduler),
+        "resume": partial(handle_resume, scheduler=scheduler),
+    }
+    worker = Worker(
+        queue, handlers,
+        concurrency=settings.WORKER_CONCURRENCY,
+        poll_seconds=settings.WORKER_POLL_SECONDS,
+        drain_seconds=settings.WORKER_DRAIN_SECONDS,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    log.info("worker: %d slot(s), redis %s", worker.concurrency, settings.REDIS_URL.rsplit("@", 1)[-1])
+    try:
+        await worker.run()
+    finally:
+        await close_browser_pool()
+        await redis.aclose()
+        log.info("worker: stopped (%d processed, %d failed)", worker.processed, worker.failed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
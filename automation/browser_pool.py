@@ -0,0 +1,237 @@
+# automation/browser_pool.py
+# Long-lived Chromium shared by application flows.
+#
+# Each application gets its own BrowserContext (isolated cookies/storage), so
+# one browser can serve many submissions back to back and concurrently. The
+# browser is relaunched when it disconnects/crashes, after max_uses contexts,
+# or when Chromium's resident memory crosses max_memory_mb (sampled at most
+# every memory_check_seconds, walking /proc is not free). A retired browser
+# keeps serving the contexts it already handed out and closes after the last.
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from apps.api.settings import settings
+
+log = logging.getLogger(__name__)
+
+_CHROMIUM_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+def chromium_rss_mb(root_pid: Optional[int] = None) -> Optional[float]:
+    """
+    Resident memory of Chromium processes descended from this process, via
+    /proc (Linux). None where /proc is unavailable.
+    """
+    proc = Path("/proc")
+    if not (proc / "self" / "stat").exists():
+        return None
+    root_pid = root_pid or os.getpid()
+    children: Dict[int, list] = {}
+    info: Dict[int, tuple] = {}
+    for d in proc.iterdir():
+        if not d.name.isdigit():
+            continue
+        try:
+            stat = (d / "stat").read_text()
+        except OSError:
+            continue
+        # comm may contain spaces; it is wrapped in the last parentheses
+        comm = stat[stat.index("(") + 1:stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2:].split()
+        pid, ppid, rss_pages = int(d.name), int(fields[1]), int(fields[21])
+        children.setdefault(ppid, []).append(pid)
+        info[pid] = (comm.lower(), rss_pages)
+    page = os.sysconf("SC_PAGE_SIZE")
+    total, stack = 0, list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        comm, rss = info.get(pid, ("", 0))
+        if any(n in comm for n in _CHROMIUM_NAMES):
+            total += rss * page
+        stack.extend(children.get(pid, []))
+    return total / (1024 * 1024)
+
+
+class _Slot:
+    """One launched browser and its bookkeeping."""
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retired = False
+        self.launched_at = time.monotonic()
+
+    @property
+    def healthy(self) -> bool:
+        return not self.retired and self.browser.is_connected()
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        max_contexts: int = 4,
+        max_uses: int = 50,
+        max_memory_mb: Optional[float] = 1500,
+        memory_check_seconds: float = 10.0,
+        headless: bool = True,
+        launch: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        self.max_contexts = max_contexts
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_seconds = memory_check_seconds
+        self._memory_checked_at: Optional[float] = None
+        self.headless = headless
+        self._launch_fn = launch
+        self._playwright = None
+        self._slot: Optional[_Slot] = None
+        self._sem = asyncio.Semaphore(max_contexts)
+        self._lock = asyncio.Lock()
+        self._closed = False
+        self.launches = 0
+        self.recycles = 0
+        self.contexts_served = 0
+
+    async def _launch(self):
+        if self._launch_fn is not None:
+            return await self._launch_fn()
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=self.headless)
+
+    async def _acquire_slot(self) -> _Slot:
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed")
+            slot = self._slot
+            if slot is None or not slot.healthy:
+                if slot is not None:
+                    log.info("browser pool: replacing %s browser", "retired" if slot.retired else "disconnected")
+                    await self._retire(slot)
+                slot = self._slot = _Slot(await self._launch())
+                self.launches += 1
+            slot.uses += 1
+            slot.active += 1
+            return slot
+
+    async def _release_slot(self, slot: _Slot) -> None:
+        async with self._lock:
+            slot.active -= 1
+            if slot is self._slot and not slot.retired:
+                reason = None
+                if self.max_uses and slot.uses >= self.max_uses:
+                    reason = f"{slot.uses} uses"
+                elif self.max_memory_mb and self._memory_check_due():
+                    rss = chromium_rss_mb()
+                    if rss is not None and rss > self.max_memory_mb:
+                        reason = f"{rss:.0f} MB resident"
+                if reason:
+                    log.info("browser pool: recycling browser after %s", reason)
+                    self.recycles += 1
+                    slot.retired = True
+                    self._slot = None
+            if slot.retired and slot.active == 0:
+                await self._close_browser(slot)
+
+    def _memory_check_due(self) -> bool:
+        now = time.monotonic()
+        if self._memory_checked_at is not None and now - self._memory_checked_at < self.memory_check_seconds:
+            return False
+        self._memory_checked_at = now
+        return True
+
+    async def _retire(self, slot: _Slot) -> None:
+        slot.retired = True
+        if slot.active == 0:
+            await self._close_browser(slot)
+
+    @staticmethod
+    async def _close_browser(slot: _Slot) -> None:
+        try:
+            await slot.browser.close()
+        except Exception as e:  # already gone
+            log.debug("browser pool: close failed: %s", e)
+
+    @asynccontextmanager
+    async def context(self, **context_kwargs) -> AsyncIterator[Any]:
+        """
+        An isolated BrowserContext; waits while max_contexts are in use.
+        context_kwargs go to browser.new_context (e.g. storage_state).
+        """
+        async with self._sem:
+            slot = await self._acquire_slot()
+            ctx = None
+            try:
+                ctx = await slot.browser.new_context(**context_kwargs)
+                self.contexts_served += 1
+                yield ctx
+            finally:
+                if ctx is not None:
+                    try:
+                        await ctx.close()
+                    except Exception as e:
+                        log.debug("browser pool: context close failed: %s", e)
+                await self._release_slot(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        slot = self._slot
+        return {
+            "max_contexts": self.max_contexts,
+            "active_contexts": slot.active if slot else 0,
+            "browser_uses": slot.uses if slot else 0,
+            "browser_age_seconds": round(time.monotonic() - slot.launched_at, 1) if slot else None,
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "contexts_served": self.contexts_served,
+        }
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._closed = True
+            if self._slot is not None:
+                self._slot.retired = True
+                await self._close_browser(self._slot)
+                self._slot = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+_default: Optional[BrowserPool] = None
+_default_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Pool for the running event loop (Playwright objects are loop-bound).
+    Raises if the pool is still open on another loop: its browser can only be
+    closed from there, so await close_browser_pool() before that loop exits.
+    """
+    global _default, _default_loop
+    loop = asyncio.get_running_loop()
+    if _default is not None and not _default._closed and _default_loop is not loop:
+        raise RuntimeError("browser pool is still open on another event loop; "
+                           "await close_browser_pool() there first")
+    if _default is None or _default._closed:
+        _default = BrowserPool(
+            max_contexts=settings.BROWSER_POOL_MAX_CONTEXTS,
+            max_uses=settings.BROWSER_POOL_MAX_USES,
+            max_memory_mb=settings.BROWSER_POOL_MAX_MEMORY_MB,
+            memory_check_seconds=settings.BROWSER_POOL_MEMORY_CHECK_SECONDS,
+            headless=settings.HEADLESS,
+        )
+        _default_loop = loop
+    return _default
+
+
+async def close_browser_pool() -> None:
+    global _default
+    if _default is not None:
+        await _default.close()
+        _default = None
@@ -0,0 +1,119 @@
+# automation/checkpoints.py
+# HITL checkpoint / resume for application flows.
+#
+# Instead of holding a live browser context while a reviewer looks at the
+# draft, save_checkpoint persists everything needed to pick up again —
+# filled form values (per frame), the context's storage_state (cookies,
+# localStorage), the page URL and a JPEG screenshot — to the
+# application_checkpoints table, and the caller closes the context.
+# After approval (POST /apply/checkpoints/{id}/approve), resume_application
+# opens a fresh pooled context with that storage_state, reloads the URL,
+# restores the form in one evaluate per frame and submits.
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from apps.api.models.db import SessionLocal
+from apps.api.services import checkpoint_service
+from apps.api.settings import settings
+from .browser_pool import BrowserPool, get_browser_pool
+from .form_schema import capture_form, extract_form_schema, restore_form
+from .lean_mode import StepTimings, enable_lean_mode, require_form, wait_for_form
+
+log = logging.getLogger(__name__)
+
+SUBMIT_SELECTORS = {
+    "greenhouse": "#submit_app, button[type=submit], input[type=submit]",
+    "lever": "#btn-submit, button[type=submit]",
+}
+OPEN_FORM_SELECTOR = "text=Apply for this job"
+
+
+def _db_call(fn, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def save_checkpoint(page, context, job, plan, files: Optional[Dict[str, str]] = None) -> str:
+    """Persist the filled form for review; returns the checkpoint id. The caller closes the context."""
+    schema = await extract_form_schema(page, job.source, job.company)
+    form_state = await capture_form(page, schema)
+    storage_state = await context.storage_state()
+    screenshot = await page.screenshot(full_page=True, type="jpeg", quality=70)
+    plan_data = plan.model_dump(mode="json") if hasattr(plan, "model_dump") else dict(plan)
+    return await asyncio.to_thread(
+        _db_call, checkpoint_service.create_checkpoint,
+        job_id=str(job.id), source=job.source, company=job.company, url=page.url,
+        storage_state=storage_state, form_state=form_state, plan=plan_data,
+        screenshot=screenshot, files=files,
+    )
+
+
+async def resume_application(checkpoint_id: str, pool: BrowserPool = None, lean=None, pace=None) -> Dict[str, Any]:
+    """
+    Rehydrate an approved checkpoint and submit it. Marks the checkpoint
+    submitted or failed and returns the timings summary. Once the submit
+    click has gone through the checkpoint is submitted even if the page then
+    errors (summary "unconfirmed"): failing it would invite a duplicate
+    application on re-approval. pace is awaited
+    between page actions, as in submit_application (SubmissionScheduler.resume
+    passes the site's delay); it is not counted in step time.
+    """
+    row = await asyncio.to_thread(_db_call, checkpoint_service.get_checkpoint, checkpoint_id)
+    if row is None:
+        raise LookupError(f"checkpoint {checkpoint_id} not found")
+    if row.status != "approved":
+        raise ValueError(f"checkpoint {checkpoint_id} is {row.status}, not approved")
+    if row.source not in SUBMIT_SELECTORS:
+        raise ValueError(f"Unsupported site: {row.source}")
+
+    lean = settings.BROWSER_LEAN_MODE if lean is None else lean
+    timings = StepTimings()
+    pool = pool or get_browser_pool()
+
+    async def step(name):
+        timings.mark(name)
+        if pace is not None:
+            await pace()
+        timings.resume()
+
+    clicked, unconfirmed = False, None
+    try:
+        async with pool.context(storage_state=row.storage_state) as context:
+            if lean:
+                await enable_lean_mode(context, timings)
+            page = await context.new_page()
+            timings.resume()
+            await page.goto(row.url, wait_until="domcontentloaded")
+            if await wait_for_form(page) is None:
+                # form is opened by a click on this board (not URL-addressable)
+                await page.click(OPEN_FORM_SELECTOR, timeout=10_000)
+                await require_form(page)
+            await step("rehydrate")
+            missing = await restore_form(page, row.form_state)
+            if missing:
+                raise RuntimeError(f"form changed since checkpoint; missing {missing[:5]}")
+            for selector, path in (row.files or {}).items():
+                await page.set_input_files(selector, path)
+            await step("restore_form")
+            await page.click(SUBMIT_SELECTORS[row.source], timeout=10_000)
+            clicked = True
+            await page.wait_for_load_state("domcontentloaded")
+            timings.mark("submit")
+    except Exception as e:
+        if not clicked:
+            log.warning("resume %s failed: %s", checkpoint_id, e)
+            await asyncio.to_thread(_db_call, checkpoint_service.set_status, checkpoint_id, "failed",
+                                    error=f"{type(e).__name__}: {e}")
+            raise
+        unconfirmed = f"submit unconfirmed: {type(e).__name__}: {e}"
+        log.warning("resume %s: %s", checkpoint_id, unconfirmed)
+    await asyncio.to_thread(_db_call, checkpoint_service.set_status, checkpoint_id, "submitted",
+                            error=unconfirmed)
+    summary = timings.summary()
+    summary["checkpoint_id"] = checkpoint_id
+    summary["unconfirmed"] = unconfirmed is not None
+    return summary
@@ -1,35 +1,72 @@
-import asyncio, os, re
-from playwright.async_api import async_playwright
+import asyncio, logging, os, re
+from apps.api.settings import settings
+from .browser_pool import BrowserPool, get_browser_pool
+from .checkpoints import save_checkpoint
+from .lean_mode import StepTimings, enable_lean_mode, no_pace, track_traffic
 from .steps.greenhouse_steps import apply_greenhouse
 from .steps.lever_steps import apply_lever
 
+log = logging.getLogger(__name__)
+
 SITE_MAP = {
   "greenhouse": apply_greenhouse,
   "lever": apply_lever,
 }
 
-async def submit_application(job, plan, hitl_required=True):
+async def submit_application(job, plan, hitl_required=True, pool: BrowserPool = None, pace=None, lean=None,
+                             resume_path=None):
+    """
+    Run the site flow for job in a pooled browser context and return the
+    per-step timings summary (ms per step, requests, blocked requests, bytes).
+    With hitl_required the filled form is checkpointed for review (summary
+    "checkpoint_id") and the context is released; see automation/checkpoints.py.
+    pace: awaited between page actions (automation/scheduler.py passes the
+    site's jittered delay_seconds_between_actions); not counted in step time.
+    lean: block images/fonts/media/trackers (default BROWSER_LEAN_MODE).
+    resume_path: local file the site flow attaches as the resume.
+    """
     site = job.source
     if site not in SITE_MAP:
         raise ValueError(f"Unsupported site: {site}")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=os.getenv("HEADLESS","true").lower()=="true")
-        context = await browser.new_context()
+    lean = settings.BROWSER_LEAN_MODE if lean is None else lean
+    timings = StepTimings()
+    checkpoint_id = None
+
+    async def step(name):
+        # steps report their boundaries here; pauses are excluded from timing
+        timings.mark(name)
+        await (pace or no_pace)()
+        timings.resume()
+
+    # Shared browser; each application gets its own isolated context
+    pool = pool or get_browser_pool()
+    async with pool.context() as context:
+        if lean:
+            await enable_lean_mode(context, timings)
         page = await context.new_page()
+        track_traffic(page, timings)
+        timings.resume()
 
         # Load job URL and delegate to site-specific flow
         await page.goto(job.url, wait_until="domcontentloaded")
-        await SITE_MAP[site](page, job, plan)
+        timings.mark("goto")
+        # file inputs are not part of the captured form state: the flow reports
+        # what it attached so a resumed checkpoint can attach it again
+        files = await SITE_MAP[site](page, job, plan, pace=step, resume_path=resume_path)
 
         # Optional: present summary for human approval
         if hitl_required:
-            # Snapshot / store draft state (screenshot + JSON answers)
-            await page.screenshot(path=f"/tmp/{job.id}_review.png")
-            # In a real system, pause and await approval via dashboard/webhook.
+            # Park the draft (form state + storage state + screenshot) in the DB
+            # and let the context go; resume_application submits after approval.
+            checkpoint_id = await save_checkpoint(page, context, job, plan, files=files or None)
+            timings.mark("checkpoint")
 
         # Finalize submission if allowed and approved
         # NOTE: Respect policies/sites.yaml; do not auto-submit when disallowed.
 
-        await context.close()
-        await browser.close()
\ No newline at end of file
+    summary = timings.summary()
+    summary["lean"] = lean
+    summary["checkpoint_id"] = checkpoint_id
+    log.info("submit %s/%s: %s", site, job.id, summary)
+    return summary
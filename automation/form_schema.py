@@ -0,0 +1,356 @@
+# automation/form_schema.py
+# Application-form schema extraction, caching and batched filling.
+#
+# Instead of probing selectors one DOM round-trip at a time:
+#   - FINGERPRINT_JS lists each frame's field types/names in one evaluate;
+#     its hash is the form hash, and (source, company, form hash) keys the
+#     schema cache. A hit skips extraction entirely; a changed form misses.
+#   - On a miss EXTRACT_JS walks the form once per frame (the page itself
+#     plus embedded-board iframes) and records selector, name, type, label,
+#     required flag and options.
+#   - FILL_JS fills every matched field in one evaluate per frame, using the
+#     native value setters and input/change events so React/Vue forms notice.
+# Frames are referenced by their index among form-bearing frames, not by URL
+# (embedded iframe URLs carry per-job tokens).
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from apps.api.settings import settings
+
+log = logging.getLogger(__name__)
+
+FINGERPRINT_JS = r"""
+() => Array.from(document.querySelectorAll("form input, form textarea, form select"))
+  .filter(el => !["hidden", "submit", "button", "reset", "image"].includes((el.type || "").toLowerCase()))
+  .map(el => `${el.tagName === "INPUT" ? (el.type || "text").toLowerCase() : el.tagName.toLowerCase()}:${el.name || el.id || ""}`)
+"""
+
+EXTRACT_JS = r"""
+() => {
+  const clean = s => (s || "").replace(/\s+/g, " ").trim();
+  const cssEscape = s => (window.CSS && CSS.escape) ? CSS.escape(s) : s.replace(/["\\]/g, "\\$&");
+  const labelFor = el => {
+    if (el.id) {
+      const l = document.querySelector(`label[for="${cssEscape(el.id)}"]`);
+      if (l) return clean(l.innerText);
+    }
+    if (el.getAttribute("aria-label")) return clean(el.getAttribute("aria-label"));
+    const by = el.getAttribute("aria-labelledby");
+    if (by) return clean(by.split(/\s+/).map(i => (document.getElementById(i) || {}).innerText || "").join(" "));
+    const wrap = el.closest("label");
+    if (wrap) return clean(wrap.innerText);
+    const field = el.closest(".field, .application-question, .form-group, li");
+    const l = field && field.querySelector("label, .application-label, legend");
+    if (l) return clean(l.innerText);
+    return clean(el.getAttribute("placeholder"));
+  };
+  const selectorFor = el => {
+    if (el.id) return `#${cssEscape(el.id)}`;
+    const tag = el.tagName.toLowerCase();
+    if (el.name) {
+      const sel = `${tag}[name="${cssEscape(el.name)}"]`;
+      const all = document.querySelectorAll(sel);
+      if (el.type === "radio" || el.type === "checkbox") return `${sel}[value="${cssEscape(el.value)}"]`;
+      if (all.length === 1) return sel;
+    }
+    const idx = Array.prototype.indexOf.call(document.querySelectorAll(tag), el);
+    return `${tag} >> nth=${idx}`;
+  };
+  const out = [];
+  const skip = new Set(["hidden", "submit", "button", "reset", "image"]);
+  document.querySelectorAll("form input, form textarea, form select").forEach(el => {
+    const type = el.tagName === "INPUT" ? (el.type || "text").toLowerCase() : el.tagName.toLowerCase();
+    if (skip.has(type)) return;
+    const label = labelFor(el);
+    out.push({
+      selector: selectorFor(el),
+      name: el.name || el.id || "",
+      type,
+      label,
+      required: !!(el.required || el.getAttribute("aria-required") === "true" || /\*\s*$/.test(label)),
+      options: el.tagName === "SELECT" ? Array.from(el.options).map(o => clean(o.text)).filter(Boolean) : [],
+      value: type === "radio" || type === "checkbox" ? el.value : undefined,
+    });
+  });
+  return out;
+}
+"""
+
+FILL_JS = r"""
+(items) => {
+  const proto = {INPUT: HTMLInputElement, TEXTAREA: HTMLTextAreaElement, SELECT: HTMLSelectElement};
+  const missing = [];
+  for (const {selector, value} of items) {
+    let el = null;
+    try {
+      const m = selector.match(/^(\w+) >> nth=(\d+)$/);
+      el = m ? document.querySelectorAll(m[1])[+m[2]] : document.querySelector(selector);
+    } catch (e) { el = null; }
+    if (!el) { missing.push(selector); continue; }
+    const type = (el.type || "").toLowerCase();
+    if (type === "checkbox" || type === "radio") {
+      const want = value === true || /^(true|yes|1|on)$/i.test(String(value));
+      if (el.checked !== want) el.click();
+    } else if (el.tagName === "SELECT") {
+      const opt = Array.from(el.options).find(o => o.value === value || o.text.trim() === value);
+      if (!opt) { missing.push(selector); continue; }
+      el.value = opt.value;
+    } else {
+      const setter = Object.getOwnPropertyDescriptor(proto[el.tagName].prototype, "value").set;
+      setter.call(el, value);
+    }
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+  }
+  return missing;
+}
+"""
+
+CAPTURE_JS = r"""
+(selectors) => {
+  const out = {};
+  for (const selector of selectors) {
+    let el = null;
+    try {
+      const m = selector.match(/^(\w+) >> nth=(\d+)$/);
+      el = m ? document.querySelectorAll(m[1])[+m[2]] : document.querySelector(selector);
+    } catch (e) { el = null; }
+    if (!el) continue;
+    const type = (el.type || "").toLowerCase();
+    if (type === "checkbox" || type === "radio") out[selector] = el.checked;
+    else if (type !== "file" && el.value !== "") out[selector] = el.value;
+  }
+  return out;
+}
+"""
+
+
+@dataclass
+class FormField:
+    selector: str
+    name: str
+    type: str
+    label: str = ""
+    required: bool = False
+    options: List[str] = field(default_factory=list)
+    value: Optional[str] = None   # radio/checkbox option value
+    frame: int = 0                # index among form-bearing frames (0 = first, usually the page)
+
+
+@dataclass
+class FormSchema:
+    source: str
+    company: str
+    form_hash: str
+    fields: List[FormField] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "FormSchema":
+        data = json.loads(raw)
+        data["fields"] = [FormField(**f) for f in data["fields"]]
+        return cls(**data)
+
+
+def form_hash(fingerprints: List[List[str]]) -> str:
+    h = hashlib.sha1()
+    for fp in fingerprints:
+        h.update("\x1f".join(fp).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def _slug(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (s or "").lower()).strip("-") or "unknown"
+
+
+class FormSchemaCache:
+    """
+    In-process dict in front of JSON files:
+    <root>/<source>/<company>/<form_hash>.json
+    """
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        self._mem: Dict[tuple, FormSchema] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _dir(self, source: str, company: str) -> Path:
+        return self.root / _slug(source) / _slug(company)
+
+    def get(self, source: str, company: str, fhash: str) -> Optional[FormSchema]:
+        key = (source, _slug(company), fhash)
+        with self._lock:
+            schema = self._mem.get(key)
+            if schema is None:
+                path = self._dir(source, company) / f"{fhash}.json"
+                if path.exists():
+                    schema = self._mem[key] = FormSchema.from_json(path.read_text())
+            if schema is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return schema
+
+    def put(self, schema: FormSchema) -> None:
+        d = self._dir(schema.source, schema.company)
+        with self._lock:
+            self._mem[(schema.source, _slug(schema.company), schema.form_hash)] = schema
+            d.mkdir(parents=True, exist_ok=True)
+            tmp = d / f".{schema.form_hash}.tmp"
+            tmp.write_text(schema.to_json())
+            tmp.replace(d / f"{schema.form_hash}.json")
+
+
+_cache: Optional[FormSchemaCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_form_schema_cache() -> FormSchemaCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FormSchemaCache(settings.FORM_SCHEMA_DIR)
+        return _cache
+
+
+def _frames(page) -> list:
+    # the page itself, then iframes (embedded boards render the form there)
+    return [page.main_frame] + [f for f in page.frames if f is not page.main_frame]
+
+
+async def _form_frames(page) -> tuple:
+    """(frames that contain form fields, their fingerprints), in page order."""
+    frames, fps = [], []
+    for frame in _frames(page):
+        try:
+            fp = await frame.evaluate(FINGERPRINT_JS)
+        except Exception as e:  # detached / navigating / not yet loaded frame
+            log.debug("form schema: skipping frame %s: %s", getattr(frame, "url", "?"), e)
+            continue
+        if fp:
+            frames.append(frame)
+            fps.append(fp)
+    return frames, fps
+
+
+async def extract_form_schema(page, source: str, company: str, cache: Optional[FormSchemaCache] = None) -> FormSchema:
+    """
+    Schema of the application form on page: from the cache when this
+    company's form is unchanged (fingerprint only), else extracted with one
+    evaluate per form frame and cached.
+    """
+    frames, fps = await _form_frames(page)
+    return await _schema_for(frames, fps, source, company, cache)
+
+
+async def _schema_for(frames: list, fps: List[List[str]], source: str, company: str,
+                      cache: Optional[FormSchemaCache]) -> FormSchema:
+    cache = cache or get_form_schema_cache()
+    fhash = form_hash(fps)
+    hit = cache.get(source, company, fhash)
+    if hit is not None:
+        return hit
+    fields: List[FormField] = []
+    for idx, frame in enumerate(frames):
+        fields.extend(FormField(frame=idx, **f) for f in await frame.evaluate(EXTRACT_JS))
+    schema = FormSchema(source=source, company=company, form_hash=fhash, fields=fields)
+    cache.put(schema)
+    return schema
+
+
+_NORM = re.compile(r"[^a-z0-9]+")
+
+
+def _norm(s: str) -> str:
+    return _NORM.sub(" ", (s or "").lower()).strip()
+
+
+def match_values(schema: FormSchema, values: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    """
+    Map values (keyed by field name or question text) onto schema fields:
+    exact name match first, then the question's first 30 characters within the
+    field label. Returns {frame index: {selector: value}}; file inputs are
+    skipped (they need set_input_files).
+    """
+    by_name = {f.name: f for f in schema.fields if f.name and f.type != "file"}
+    out: Dict[int, Dict[str, Any]] = {}
+    used = set()
+    for key, value in values.items():
+        if value is None or value == "":
+            continue
+        f = by_name.get(key)
+        if f is None:
+            q = _norm(key)[:30]
+            f = next((c for c in schema.fields
+                      if c.type != "file" and c.selector not in used and q and q in _norm(c.label)), None)
+        if f is not None and f.type == "radio":
+            # a radio answer names one option of the group: check that one
+            want = _norm(str(value))
+            f = next((c for c in schema.fields if c.type == "radio" and c.name == f.name
+                      and want in (_norm(c.value or ""), _norm(c.label))), None)
+            value = True
+        if f is None or f.selector in used:
+            continue
+        used.add(f.selector)
+        out.setdefault(f.frame, {})[f.selector] = value
+    return out
+
+
+async def fill_form(page, schema: FormSchema, values: Dict[str, Any], frames: Optional[list] = None) -> List[str]:
+    """Fill all matched fields with one evaluate per frame; returns selectors that were not found."""
+    if frames is None:
+        frames, _ = await _form_frames(page)
+    missing: List[str] = []
+    for idx, items in match_values(schema, values).items():
+        if idx >= len(frames):
+            missing.extend(items)
+            continue
+        missing.extend(await frames[idx].evaluate(FILL_JS, [{"selector": s, "value": v} for s, v in items.items()]))
+    return missing
+
+
+async def autofill(page, source: str, company: str, values: Dict[str, Any],
+                   cache: Optional[FormSchemaCache] = None) -> Tuple[FormSchema, List[str]]:
+    """Schema lookup/extraction + batched fill sharing one fingerprint pass."""
+    frames, fps = await _form_frames(page)
+    schema = await _schema_for(frames, fps, source, company, cache)
+    return schema, await fill_form(page, schema, values, frames=frames)
+
+
+async def capture_form(page, schema: FormSchema) -> Dict[str, Dict[str, Any]]:
+    """Current field values {frame index (str, JSON-safe): {selector: value}}, one evaluate per frame."""
+    frames, _ = await _form_frames(page)
+    by_frame: Dict[int, List[str]] = {}
+    for f in schema.fields:
+        if f.type != "file":
+            by_frame.setdefault(f.frame, []).append(f.selector)
+    out = {}
+    for idx, selectors in by_frame.items():
+        if idx < len(frames):
+            out[str(idx)] = await frames[idx].evaluate(CAPTURE_JS, selectors)
+    return out
+
+
+async def restore_form(page, state: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Re-apply capture_form output with one FILL_JS evaluate per frame; returns missing selectors."""
+    frames, _ = await _form_frames(page)
+    missing: List[str] = []
+    for idx, items in state.items():
+        idx = int(idx)
+        if idx >= len(frames):
+            missing.extend(items)
+            continue
+        missing.extend(await frames[idx].evaluate(FILL_JS, [{"selector": s, "value": v} for s, v in items.items()]))
+    return missing
@@ -0,0 +1,149 @@
+# automation/lean_mode.py
+# Opt-in lean page loading for application flows, plus per-step timings.
+#
+# Lean mode routes every request of a BrowserContext through block_unneeded:
+# images, fonts and media never load, nor do known analytics/ad trackers.
+# Documents, scripts, stylesheets and XHR still load, so forms behave as usual
+# (captcha providers are deliberately not on the tracker list).
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+log = logging.getLogger(__name__)
+
+BLOCKED_RESOURCE_TYPES = frozenset(("image", "font", "media"))
+
+TRACKER_DOMAINS = frozenset((
+    "google-analytics.com", "googletagmanager.com", "googleadservices.com", "doubleclick.net",
+    "facebook.net", "connect.facebook.net", "hotjar.com", "segment.io", "segment.com",
+    "mixpanel.com", "fullstory.com", "amplitude.com", "heap.io", "heapanalytics.com",
+    "clarity.ms", "bat.bing.com", "px.ads.linkedin.com", "snap.licdn.com", "ads-twitter.com",
+    "analytics.tiktok.com", "optimizely.com", "quantserve.com", "adroll.com", "newrelic.com",
+    "nr-data.net", "intercom.io", "intercomcdn.com", "drift.com", "driftt.com", "hubspot.com",
+    "hs-analytics.net", "hs-scripts.com", "cookielaw.org", "onetrust.com",
+))
+
+# Fields that mean an application form is ready to fill
+FORM_READY_SELECTOR = (
+    "form input:not([type=hidden]), form textarea, form select, "
+    "#application_form, #application-form, .application-form"
+)
+
+
+def is_tracker(url: str) -> bool:
+    host = (urlsplit(url).hostname or "").lower()
+    parts = host.split(".")
+    # match the host and every parent domain against the list
+    return any(".".join(parts[i:]) in TRACKER_DOMAINS for i in range(len(parts) - 1))
+
+
+async def no_pace(step: Optional[str] = None) -> None:
+    """Default pacer: site flows await pace(step) at each step boundary."""
+
+
+class StepTimings:
+    """Wall time per named step, plus request/byte counters for the page."""
+    def __init__(self):
+        self.steps: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self._t0 = self._last = time.perf_counter()
+
+    def mark(self, name: str) -> None:
+        """Close the step that started at the previous mark/resume."""
+        now = time.perf_counter()
+        self.steps.append({"step": name, "ms": round((now - self._last) * 1000, 1)})
+        self._last = now
+
+    def resume(self) -> None:
+        """Start timing the next step (excludes deliberate pauses)."""
+        self._last = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "steps": list(self.steps),
+            "total_ms": round((time.perf_counter() - self._t0) * 1000, 1),
+            "requests": self.requests,
+            "blocked_requests": self.blocked,
+            "bytes": self.bytes,
+        }
+
+
+async def enable_lean_mode(context, timings: Optional[StepTimings] = None) -> None:
+    async def block_unneeded(route):
+        req = route.request
+        if req.resource_type in BLOCKED_RESOURCE_TYPES or is_tracker(req.url):
+            if timings is not None:
+                timings.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", block_unneeded)
+
+
+def track_traffic(page, timings: StepTimings) -> None:
+    """Count finished requests and their transferred bytes on page."""
+    async def on_finished(request):
+        timings.requests += 1
+        try:
+            sizes = await request.sizes()
+            timings.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:  # page closed mid-request
+            pass
+
+    page.on("requestfinished", on_finished)
+
+
+async def wait_for_form(page, timeout: float = 15_000):
+    """
+    Wait until an application form has visible fields, in the page or any
+    iframe (embedded boards), instead of sleeping. Frames attached while
+    waiting (a board injected after the Apply click) are watched too.
+    Returns the frame holding the form, or None on timeout.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout / 1000
+    waits: Dict[asyncio.Future, Any] = {}
+    attached = asyncio.Event()
+
+    def watch(frame) -> None:
+        # Playwright treats timeout=0 as "no timeout": keep at least 1ms
+        remaining = max(1.0, (deadline - loop.time()) * 1000)
+        fut = asyncio.ensure_future(frame.wait_for_selector(FORM_READY_SELECTOR, state="visible", timeout=remaining))
+        waits[fut] = frame
+        attached.set()
+
+    for frame in [page.main_frame] + [f for f in page.frames if f is not page.main_frame]:
+        watch(frame)
+    page.on("frameattached", watch)
+    try:
+        while True:
+            for fut in [f for f in waits if f.done()]:
+                frame = waits.pop(fut)
+                if not fut.cancelled() and fut.exception() is None:
+                    return frame
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            attached.clear()
+            woke = asyncio.ensure_future(attached.wait())
+            await asyncio.wait([*waits, woke], timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            woke.cancel()
+        log.debug("wait_for_form: no form fields within %sms", timeout)
+        return None
+    finally:
+        page.remove_listener("frameattached", watch)
+        for fut in waits:
+            fut.cancel()
+
+
+async def require_form(page, timeout: float = 15_000):
+    """wait_for_form, raising when no form shows up (the step cannot go on)."""
+    frame = await wait_for_form(page, timeout)
+    if frame is None:
+        raise RuntimeError(f"no application form within {timeout / 1000:g}s")
+    return frame
@@ -0,0 +1,291 @@
+# automation/scheduler.py
+# Policy-aware front door for submit_application.
+#
+# policies/sites.yaml decides, per site:
+#   allow_auto_submit               false -> always stop for human review
+#   max_submissions_per_day         daily quota (UTC day)
+#   max_submissions_per_hour/burst  token bucket pacing submissions
+#   delay_seconds_between_actions   "lo-hi" jittered pause between page actions
+# plus a global token bucket of RATE_LIMIT_GLOBAL_PER_MIN across all sites.
+# Buckets and quotas live in Redis so every worker process shares them; if
+# Redis is unreachable the limits degrade to per-process (never to none).
+# Submissions for one site run one at a time; different sites run in parallel.
+# Approved HITL checkpoints (resume()) go through the same limits as fills.
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+from apps.api.settings import settings
+
+log = logging.getLogger(__name__)
+
+SITES_YAML = Path("policies/sites.yaml")
+KEY_PREFIX = "autoapply:ratelimit:"
+GLOBAL_BUCKET = "global"
+
+
+def _parse_range(value: Any) -> Tuple[float, float]:
+    if value is None:
+        return (0.0, 0.0)
+    if isinstance(value, (int, float)):
+        return (float(value), float(value))
+    lo, _, hi = str(value).partition("-")
+    lo = float(lo)
+    return (lo, float(hi) if hi else lo)
+
+
+@dataclass
+class SitePolicy:
+    site: str
+    allow_auto_submit: bool = False
+    max_submissions_per_day: Optional[int] = None
+    max_submissions_per_hour: float = 6
+    burst: int = 1
+    delay_seconds_between_actions: Tuple[float, float] = (0.0, 0.0)
+    reason: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, site: str, raw: Dict[str, Any]) -> "SitePolicy":
+        return cls(
+            site=site,
+            allow_auto_submit=bool(raw.get("allow_auto_submit", False)),
+            max_submissions_per_day=raw.get("max_submissions_per_day"),
+            max_submissions_per_hour=float(raw.get("max_submissions_per_hour", 6)),
+            burst=int(raw.get("burst", 1)),
+            delay_seconds_between_actions=_parse_range(raw.get("delay_seconds_between_actions")),
+            reason=raw.get("reason"),
+        )
+
+
+def load_site_policies(path: Path = SITES_YAML) -> Dict[str, SitePolicy]:
+    raw = (yaml.safe_load(Path(path).read_text()) or {}).get("sites") or {}
+    return {site: SitePolicy.from_dict(site, cfg or {}) for site, cfg in raw.items()}
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+
+# ---- limit stores ----
+class MemoryLimits:
+    """Per-process buckets/quotas (tests, and the fallback when Redis is down)."""
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._quotas: Dict[str, int] = {}
+
+    async def take(self, bucket: str, rate_per_sec: float, capacity: float) -> float:
+        """Take one token; 0 on success, else seconds until one is available."""
+        now = time.time()
+        tokens, ts = self._buckets.get(bucket, (capacity, now))
+        tokens = min(capacity, tokens + (now - ts) * rate_per_sec)
+        if tokens >= 1:
+            self._buckets[bucket] = (tokens - 1, now)
+            return 0.0
+        self._buckets[bucket] = (tokens, now)
+        return (1 - tokens) / rate_per_sec
+
+    async def reserve(self, site: str, limit: int) -> bool:
+        key = f"{site}:{_today()}"
+        if self._quotas.get(key, 0) >= limit:
+            return False
+        self._quotas[key] = self._quotas.get(key, 0) + 1
+        return True
+
+    async def release(self, site: str) -> None:
+        key = f"{site}:{_today()}"
+        if self._quotas.get(key):
+            self._quotas[key] -= 1
+
+    async def used_today(self, site: str) -> int:
+        return self._quotas.get(f"{site}:{_today()}", 0)
+
+
+_TAKE_LUA = """
+local rate, cap, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local v = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(v[1]) or cap
+local ts = tonumber(v[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(cap / rate) + 60)
+return tostring(wait)
+"""
+
+_RESERVE_LUA = """
+local n = tonumber(redis.call('GET', KEYS[1]) or '0')
+if n >= tonumber(ARGV[1]) then return -1 end
+n = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], 172800)
+return n
+"""
+
+
+class RedisLimits:
+    """Shared buckets/quotas; atomic via Lua. Falls back to MemoryLimits on errors."""
+    def __init__(self, url: str):
+        from redis.asyncio import Redis
+        self._redis = Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self._take = self._redis.register_script(_TAKE_LUA)
+        self._reserve = self._redis.register_script(_RESERVE_LUA)
+        self._fallback = MemoryLimits()
+        self.errors = 0
+
+    def _degraded(self, e: Exception):
+        self.errors += 1
+        log.warning("scheduler: redis unavailable (%s); using per-process limits", e)
+        return self._fallback
+
+    async def take(self, bucket: str, rate_per_sec: float, capacity: float) -> float:
+        try:
+            wait = await self._take(keys=[KEY_PREFIX + "bucket:" + bucket], args=[rate_per_sec, capacity, time.time()])
+            return float(wait)
+        except Exception as e:
+            return await self._degraded(e).take(bucket, rate_per_sec, capacity)
+
+    async def reserve(self, site: str, limit: int) -> bool:
+        try:
+            return int(await self._reserve(keys=[f"{KEY_PREFIX}quota:{site}:{_today()}"], args=[limit])) >= 0
+        except Exception as e:
+            return await self._degraded(e).reserve(site, limit)
+
+    async def release(self, site: str) -> None:
+        try:
+            await self._redis.decr(f"{KEY_PREFIX}quota:{site}:{_today()}")
+        except Exception as e:
+            await self._degraded(e).release(site)
+
+    async def used_today(self, site: str) -> int:
+        try:
+            return int(await self._redis.get(f"{KEY_PREFIX}quota:{site}:{_today()}") or 0)
+        except Exception as e:
+            return await self._degraded(e).used_today(site)
+
+
+# ---- scheduler ----
+@dataclass
+class SubmissionResult:
+    job_id: str
+    site: str
+    status: str                # "submitted" | "review" | "quota_exceeded" | "blocked" | "failed"
+    error: Optional[str] = None
+    waited_seconds: float = 0.0
+    timings: Optional[Dict[str, Any]] = None   # submit_application step timings
+
+
+def make_pacer(policy: SitePolicy, rng: random.Random = random) -> Callable[[], Awaitable[None]]:
+    lo, hi = policy.delay_seconds_between_actions
+
+    async def pace() -> None:
+        if hi > 0:
+            await asyncio.sleep(rng.uniform(lo, hi))
+    return pace
+
+
+class SubmissionScheduler:
+    def __init__(
+        self,
+        policies: Optional[Dict[str, SitePolicy]] = None,
+        limits=None,
+        global_per_min: Optional[float] = None,
+        submit: Optional[Callable[..., Awaitable[Any]]] = None,
+        resume: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        self.policies = load_site_policies() if policies is None else policies
+        self.limits = limits or (RedisLimits(settings.REDIS_URL) if settings.REDIS_URL else MemoryLimits())
+        self.global_per_min = settings.RATE_LIMIT_GLOBAL_PER_MIN if global_per_min is None else global_per_min
+        if submit is None:
+            from .form_filler import submit_application as submit
+        if resume is None:
+            from .checkpoints import resume_application as resume
+        self._submit = submit
+        self._resume = resume
+        self._site_locks: Dict[str, asyncio.Lock] = {}
+
+    def policy(self, site: str) -> SitePolicy:
+        # unknown sites get the most conservative policy
+        return self.policies.get(site) or SitePolicy(site=site, reason="no policy in sites.yaml")
+
+    async def _wait_for(self, bucket: str, rate_per_sec: float, capacity: float) -> float:
+        waited = 0.0
+        while True:
+            wait = await self.limits.take(bucket, rate_per_sec, capacity)
+            if wait <= 0:
+                return waited
+            # +jitter so workers sharing a bucket do not retry in lockstep
+            wait += random.uniform(0, min(1.0, wait * 0.1))
+            await asyncio.sleep(wait)
+            waited += wait
+
+    async def submit(self, job, plan, hitl_required: bool = True, **submit_kwargs) -> SubmissionResult:
+        """submit_kwargs go to the submit function (e.g. resume_path)."""
+        # sites that disallow automation still get assisted fill, never auto-submit
+        review = hitl_required or not self.policy(job.source).allow_auto_submit
+        return await self._gated(
+            job.source, str(job.id), "review" if review else "submitted",
+            lambda pace: self._submit(job, plan, hitl_required=review, pace=pace, **submit_kwargs),
+        )
+
+    async def resume(self, checkpoint_id: str, site: str, job_id: str) -> SubmissionResult:
+        """Submit an approved checkpoint; a human signed off, so allow_auto_submit does not apply."""
+        return await self._gated(site, str(job_id), "submitted",
+                                 lambda pace: self._resume(checkpoint_id, pace=pace))
+
+    async def _gated(self, site: str, job_id: str, done_status: str,
+                     run: Callable[[Callable[[], Awaitable[None]]], Awaitable[Any]]) -> SubmissionResult:
+        # site lock, daily quota, site + global buckets, then run(pace)
+        policy = self.policy(site)
+        result = SubmissionResult(job_id=job_id, site=site, status="failed")
+        if site not in self.policies:
+            result.status, result.error = "blocked", policy.reason
+            return result
+
+        lock = self._site_locks.setdefault(site, asyncio.Lock())
+        async with lock:
+            if policy.max_submissions_per_day is not None and not await self.limits.reserve(site, policy.max_submissions_per_day):
+                result.status = "quota_exceeded"
+                result.error = f"{site}: daily quota of {policy.max_submissions_per_day} reached"
+                return result
+            try:
+                started = time.monotonic()
+                await self._wait_for(f"site:{site}", policy.max_submissions_per_hour / 3600, max(1, policy.burst))
+                if self.global_per_min:
+                    await self._wait_for(GLOBAL_BUCKET, self.global_per_min / 60, max(1.0, self.global_per_min / 60))
+                result.waited_seconds = round(time.monotonic() - started, 3)
+                trace = await run(make_pacer(policy))
+                result.timings = trace if isinstance(trace, dict) else None
+            except BaseException as e:
+                # nothing was submitted: give the quota slot back
+                if policy.max_submissions_per_day is not None:
+                    await self.limits.release(site)
+                if not isinstance(e, Exception):
+                    raise
+                log.warning("scheduler: %s submission for job %s failed: %s", site, job_id, e)
+                result.error = f"{type(e).__name__}: {e}"
+                return result
+        result.status = done_status
+        return result
+
+    async def submit_many(self, items: Sequence[Tuple[Any, Any]], hitl_required: bool = True) -> List[SubmissionResult]:
+        """Run (job, plan) pairs: serial within a site, parallel across sites."""
+        return list(await asyncio.gather(*(self.submit(job, plan, hitl_required) for job, plan in items)))
+
+    async def quota_status(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for site, p in self.policies.items():
+            out[site] = {
+                "allow_auto_submit": p.allow_auto_submit,
+                "used_today": await self.limits.used_today(site),
+                "max_per_day": p.max_submissions_per_day,
+            }
+        return out
@@ -1,28 +1,37 @@
+from typing import Dict, Optional
 from playwright.async_api import Page
-import asyncio
+from ..form_schema import autofill
+from ..lean_mode import no_pace, require_form
 
-async def apply_greenhouse(page: Page, job, plan):
+RESUME_INPUT = "input[type=file]"
+
+async def apply_greenhouse(page: Page, job, plan, pace=no_pace, resume_path: Optional[str] = None) -> Dict[str, str]:
     # Example selectors vary per company; this is a template.
+    # pace(step) marks the end of a step (timings) and applies the site delay.
+    # Returns selector -> path of every file attached, for the HITL checkpoint.
+    files: Dict[str, str] = {}
     # 1) Click "Apply for this job"
     await page.click("text=Apply for this job", timeout=10_000)
+    await require_form(page)
+    await pace("open_form")
 
     # 2) Upload resume
-    if plan.job and plan.job.url:
-        # Suppose iframe form
-        frames = page.frames
-    await page.set_input_files("input[type=file]", plan.job.id and plan.job.id)  # replace with plan.resume path
-
-    # 3) Fill required fields
-    await page.fill("input[name='first_name']", plan.answers.get("first_name",""))
-    await page.fill("input[name='last_name']", plan.answers.get("last_name",""))
-    await page.fill("input[name='email']", plan.answers.get("email",""))
+    if resume_path:
+        await page.set_input_files(RESUME_INPUT, resume_path)
+        files[RESUME_INPUT] = resume_path
+    await pace("upload_resume")
 
-    # 4) Free-text questions
-    for q, a in plan.answers.items():
-        locator = page.locator(f"textarea[aria-label*='{q[:30]}']")
-        if await locator.count():
-            await locator.first.fill(a)
+    # 3) Required fields + free-text questions, matched against the cached
+    #    form schema by field name / label and filled in one evaluate
+    values = {
+        "first_name": plan.answers.get("first_name",""),
+        "last_name": plan.answers.get("last_name",""),
+        "email": plan.answers.get("email",""),
+        **plan.answers,
+    }
+    await autofill(page, "greenhouse", job.company, values)
+    await pace("fill_form")
 
-    # 5) Submit (IF ALLOWED)
+    # 4) Submit (IF ALLOWED)
     # await page.click("button[type=submit]")
-    await asyncio.sleep(1)
\ No newline at end of file
+    return files
@@ -1,8 +1,26 @@
+from typing import Dict, Optional
 from playwright.async_api import Page
+from ..form_schema import autofill
+from ..lean_mode import no_pace, require_form
 
-async def apply_lever(page: Page, job, plan):
+RESUME_INPUT = "input[type=file][name=resume]"
+
+async def apply_lever(page: Page, job, plan, pace=no_pace, resume_path: Optional[str] = None) -> Dict[str, str]:
     # Similar logic; selectors must be tailored per form
+    files: Dict[str, str] = {}
     await page.click("text=Apply for this job")
-    await page.fill("input[name='name']", plan.answers.get("full_name",""))
-    await page.fill("input[name='email']", plan.answers.get("email",""))
-    # Upload resume, cover letter, etc.
\ No newline at end of file
+    await require_form(page)
+    await pace("open_form")
+    values = {
+        "name": plan.answers.get("full_name",""),
+        "email": plan.answers.get("email",""),
+        **plan.answers,
+    }
+    await autofill(page, "lever", job.company, values)
+    await pace("fill_form")
+    # Upload resume (cover letter etc. follow the same pattern)
+    if resume_path:
+        await page.set_input_files(RESUME_INPUT, resume_path)
+        files[RESUME_INPUT] = resume_path
+        await pace("upload_resume")
+    return files
@@ -1,8 +1,101 @@
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import List
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+import requests
+
 from apps.api.models.domain import Job
 
-class JobConnector(ABC):
+# Fields that define a posting's identity/content for change detection.
+POSTING_FIELDS = ("id", "title", "company", "url", "location", "source", "description_html")
+
+def posting_hash(p: Union[Job, Mapping[str, Any]]) -> str:
+    get = p.get if isinstance(p, Mapping) else (lambda k: getattr(p, k, None))
+    vals = ["" if get(f) is None else str(get(f)) for f in POSTING_FIELDS]
+    return hashlib.sha1(json.dumps(vals, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def board_hash(postings: List[Union[Job, Mapping[str, Any]]]) -> str:
+    h = hashlib.sha256()
+    for ph in sorted(posting_hash(p) for p in postings):
+        h.update(ph.encode("ascii"))
+    return h.hexdigest()
+
+@dataclass
+class BoardState:
+    source: str
+    company: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    fetched_at: Optional[datetime] = None
+
+@dataclass
+class BoardFetch:
+    state: BoardState
+    changed: bool = True
+    jobs: List[Job] = field(default_factory=list)
+
+class BoardConnector(ABC):
+    """
+    Base for public ATS board APIs that return one JSON document per company.
+    Subclasses set source/host and implement board_url() and postings().
+    search(company) replaces the old JobConnector.search(query, locations):
+    boards are fetched per company and filtered after ingestion.
+    """
+    source: str = ""
+    host: str = ""
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        # A shared Session keeps connections alive across boards (see connectors/crawl.py)
+        self.session = session or requests
+
+    @abstractmethod
+    def board_url(self, company: str) -> str:
+        ...
+
     @abstractmethod
-    def search(self, query: str, locations: list[str]) -> List[Job]:
-        ...
\ No newline at end of file
+    def postings(self, company: str, payload: Any) -> List[Dict[str, Any]]:
+        """Normalize the raw payload into plain dicts keyed like Job fields."""
+        ...
+
+    def parse(self, company: str, payload: Any) -> List[Job]:
+        return [Job(**p) for p in self.postings(company, payload)]
+
+    def search(self, company: str, timeout: float = 15) -> List[Job]:
+        r = self.session.get(self.board_url(company), timeout=timeout)
+        r.raise_for_status()
+        return self.parse(company, r.json())
+
+    def fetch(self, company: str, state: Optional[BoardState] = None, timeout: float = 15) -> BoardFetch:
+        """
+        Conditional fetch. Returns changed=False (and no jobs) when the server
+        answers 304 or the normalized posting list hashes the same as last time.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        headers = {}
+        if state is not None:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+
+        r = self.session.get(self.board_url(company), headers=headers, timeout=timeout)
+        if r.status_code == 304 and state is not None:
+            return BoardFetch(state=replace(state, fetched_at=now), changed=False)
+        r.raise_for_status()
+
+        posts = self.postings(company, r.json())
+        new_state = BoardState(
+            source=self.source,
+            company=company,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+            content_hash=board_hash(posts),
+            fetched_at=now,
+        )
+        if state is not None and state.content_hash == new_state.content_hash:
+            return BoardFetch(state=new_state, changed=False)
+        return BoardFetch(state=new_state, changed=True, jobs=[Job(**p) for p in posts])
@@ -0,0 +1,202 @@
+# connectors/crawl.py
+# Concurrent multi-board crawler on top of the per-source connectors.
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from apps.api.models.domain import Job
+from connectors.base import BoardState
+from connectors.greenhouse import GreenhouseConnector
+from connectors.lever import LeverConnector
+
+log = logging.getLogger(__name__)
+
+CONNECTORS = {
+    "greenhouse": GreenhouseConnector,
+    "lever": LeverConnector,
+}
+
+Target = Tuple[str, str]  # (source, company)
+
+
+@dataclass
+class BoardResult:
+    source: str
+    company: str
+    jobs: List[Job] = field(default_factory=list)
+    latency_s: float = 0.0
+    error: Optional[str] = None
+    # False when a conditional fetch found the board unchanged (jobs is then empty)
+    changed: bool = True
+    state: Optional[BoardState] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class CrawlStats:
+    boards: int = 0
+    failed: int = 0
+    unchanged: int = 0
+    jobs: int = 0
+    elapsed_s: float = 0.0
+    latency_total_s: float = 0.0
+    latency_max_s: float = 0.0
+
+    def record(self, res: BoardResult) -> None:
+        self.boards += 1
+        self.jobs += len(res.jobs)
+        self.latency_total_s += res.latency_s
+        self.latency_max_s = max(self.latency_max_s, res.latency_s)
+        if not res.ok:
+            self.failed += 1
+        elif not res.changed:
+            self.unchanged += 1
+
+    def as_dict(self) -> dict:
+        avg = self.latency_total_s / self.boards if self.boards else 0.0
+        return {
+            "boards": self.boards,
+            "failed": self.failed,
+            "unchanged": self.unchanged,
+            "jobs": self.jobs,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "latency_avg_s": round(avg, 3),
+            "latency_max_s": round(self.latency_max_s, 3),
+        }
+
+
+def make_session(pool_maxsize: int = 16, retries: int = 2) -> requests.Session:
+    """Session with a keep-alive pool large enough for per_host concurrent requests."""
+    s = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+    )
+    adapter = HTTPAdapter(pool_connections=len(CONNECTORS), pool_maxsize=pool_maxsize, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"Accept": "application/json", "User-Agent": "autoapply-pro-crawler/0.1"})
+    return s
+
+
+class Crawler:
+    """
+    Fetches many (source, company) boards concurrently over one pooled Session.
+
+    Boards are dispatched per host so no host ever has more than `per_host`
+    requests in flight; worker threads never sit blocked on a host limit.
+    Results are yielded as each board finishes; failures are reported on the
+    BoardResult instead of aborting the run.
+
+    When a `states` mapping is passed to crawl(), boards are fetched
+    conditionally against their last BoardState and the mapping is updated
+    in place, so callers can persist it between runs.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 32,
+        per_host: int = 8,
+        timeout: float = 15,
+        session: Optional[requests.Session] = None,
+    ):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = session or make_session(pool_maxsize=per_host)
+        self.connectors = {name: cls(session=self.session) for name, cls in CONNECTORS.items()}
+        self.stats = CrawlStats()
+
+    def _fetch(self, source: str, company: str, state: Optional[BoardState], conditional: bool) -> BoardResult:
+        t0 = time.perf_counter()
+        res = BoardResult(source=source, company=company)
+        try:
+            conn = self.connectors[source]
+            if conditional:
+                fetched = conn.fetch(company, state=state, timeout=self.timeout)
+                res.jobs, res.changed, res.state = fetched.jobs, fetched.changed, fetched.state
+            else:
+                res.jobs = conn.search(company, timeout=self.timeout)
+        except Exception as e:  # one bad board must not sink the crawl
+            res.error = f"{type(e).__name__}: {e}"
+        res.latency_s = time.perf_counter() - t0
+        return res
+
+    def crawl(
+        self,
+        targets: Iterable[Target],
+        states: Optional[MutableMapping[Target, BoardState]] = None,
+    ) -> Iterator[BoardResult]:
+        self.stats = CrawlStats()
+        started = time.perf_counter()
+
+        pending: Dict[str, Deque[Target]] = {}
+        for source, company in targets:
+            conn = self.connectors.get(source)
+            if conn is None:
+                res = BoardResult(source=source, company=company, error=f"Unsupported source: {source}")
+                self.stats.record(res)
+                yield res
+                continue
+            pending.setdefault(conn.host, deque()).append((source, company))
+
+        in_flight: Dict[Future, str] = {}
+        per_host_running: Dict[str, int] = {h: 0 for h in pending}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawl") as pool:
+            def _fill() -> None:
+                for host, queue in pending.items():
+                    while queue and per_host_running[host] < self.per_host and len(in_flight) < self.max_workers:
+                        source, company = queue.popleft()
+                        state = states.get((source, company)) if states is not None else None
+                        fut = pool.submit(self._fetch, source, company, state, states is not None)
+                        in_flight[fut] = host
+                        per_host_running[host] += 1
+
+            _fill()
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    host = in_flight.pop(fut)
+                    per_host_running[host] -= 1
+                    res = fut.result()
+                    self.stats.record(res)
+                    if states is not None and res.state is not None:
+                        states[(res.source, res.company)] = res.state
+                    if not res.ok:
+                        log.warning("crawl %s/%s failed after %.2fs: %s", res.source, res.company, res.latency_s, res.error)
+                    yield res
+                _fill()
+
+        self.stats.elapsed_s = time.perf_counter() - started
+        log.info("crawl finished: %s", self.stats.as_dict())
+
+    def iter_jobs(
+        self,
+        targets: Iterable[Target],
+        states: Optional[MutableMapping[Target, BoardState]] = None,
+    ) -> Iterator[Job]:
+        for res in self.crawl(targets, states=states):
+            yield from res.jobs
+
+
+def crawl_boards(
+    targets: Iterable[Target],
+    states: Optional[MutableMapping[Target, BoardState]] = None,
+    **kwargs,
+) -> Iterator[BoardResult]:
+    return Crawler(**kwargs).crawl(targets, states=states)
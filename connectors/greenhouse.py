@@ -1,22 +1,21 @@
-import requests
-from typing import List
-from apps.api.models.domain import Job
+from typing import Any, Dict, List
+from connectors.base import BoardConnector
 
 API = "https://boards-api.greenhouse.io/v1/boards/{company}/jobs"
 
-class GreenhouseConnector:
-    def search(self, company: str) -> List[Job]:
-        url = API.format(company=company)
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
-        jobs = []
-        for j in r.json().get("jobs", []):
-            jobs.append(Job(
-                id=str(j["id"]),
-                title=j("title"),
-                company=company,
-                url=j("absolute_url"),
-                location=(j.get("location") or {}).get("name"),
-                source="greenhouse",
-            ))
-        return jobs
\ No newline at end of file
+class GreenhouseConnector(BoardConnector):
+    source = "greenhouse"
+    host = "boards-api.greenhouse.io"
+
+    def board_url(self, company: str) -> str:
+        return API.format(company=company)
+
+    def postings(self, company: str, payload: Any) -> List[Dict[str, Any]]:
+        return [{
+            "id": str(j["id"]),
+            "title": j.get("title", ""),
+            "company": company,
+            "url": j.get("absolute_url", ""),
+            "location": (j.get("location") or {}).get("name"),
+            "source": self.source,
+        } for j in (payload or {}).get("jobs", [])]
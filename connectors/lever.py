@@ -1,22 +1,21 @@
-import requests
-from typing import List
-from apps.api.models.domain import Job
+from typing import Any, Dict, List
+from connectors.base import BoardConnector
 
 API = "https://api.lever.co/v0/postings/{company}?mode=json"
 
-class LeverConnector:
-    def search(self, company: str) -> List[Job]:
-        url = API.format(company=company)
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
-        jobs = []
-        for j in r.json():
-            jobs.append(Job(
-                id=j.get("id") or j.get("_id",""),
-                title=j("text"),
-                company=company,
-                url=j("hostedUrl"),
-                location=(j.get("categories") or {}).get("location"),
-                source="lever",
-            ))
-        return jobs
\ No newline at end of file
+class LeverConnector(BoardConnector):
+    source = "lever"
+    host = "api.lever.co"
+
+    def board_url(self, company: str) -> str:
+        return API.format(company=company)
+
+    def postings(self, company: str, payload: Any) -> List[Dict[str, Any]]:
+        return [{
+            "id": j.get("id") or j.get("_id", ""),
+            "title": j.get("text", ""),
+            "company": company,
+            "url": j.get("hostedUrl", ""),
+            "location": (j.get("categories") or {}).get("location"),
+            "source": self.source,
+        } for j in payload or []]
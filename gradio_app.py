@@ -123,10 +123,27 @@ def search_jobs(query: str, location: str, limit: int = 50, offset: int = 0
         empty_df = pd.DataFrame(columns=["Job ID","Title","Company","Location","Source","URL"])
         return empty_df, {}, gr.update(choices=[], value=None), f"Search error: {e}"
 
+def api_get_job(job_id: str) -> Dict[str, Any]:
+    try:
+        r = requests.get(f"{API}/discovery/jobs/{job_id}", timeout=20)
+        r.raise_for_status()
+        return r.json() or {}
+    except Exception:
+        return {}
+
+def _full_job(job_id: str, idx: Dict[str, Any]) -> Dict[str, Any]:
+    # Search results are summaries; pull the description only for the selected job
+    j = idx[job_id]
+    if "description_html" not in j:
+        full = api_get_job(job_id)
+        if full:
+            j.update(full)
+    return j
+
 def job_details(job_id: str, idx: Dict[str, Any]) -> str:
     if not job_id or job_id not in idx:
         return "Select a job to see details."
-    j = idx[job_id]
+    j = _full_job(job_id, idx)
     lines = [
         f"**{j.get('title','')}** @ **{j.get('company','')}**",
         f"Location: {j.get('location') or 'N/A'}",
@@ -142,34 +159,81 @@ def job_details(job_id: str, idx: Dict[str, Any]) -> str:
         lines.append(str(desc)[:2000])
     return "\n".join(lines)
 
-def plan_application(job_id: str, idx: Dict[str, Any]) -> Dict[str, Any]:
+def _plan_result(plan: Dict[str, Any]) -> Dict[str, Any]:
+    answers = (plan or {}).get("answers") or {}
+    answers_md = "\n".join([f"- **{k}**: {v}" for k, v in answers.items()]) or "_No answers generated_"
+    cl = (plan or {}).get("cover_letter") or "_No cover letter generated_"
+    return {"Plan JSON": plan, "Answers (formatted)": answers_md, "Cover Letter": cl}
+
+def _plan_error(msg: str, detail: Any = None) -> Dict[str, Any]:
+    err = {"error": msg, "detail": detail} if detail is not None else {"error": msg}
+    return {"Plan JSON": err, "Answers (formatted)": "_Error_", "Cover Letter": "_Error_"}
+
+def plan_application(job_id: str, idx: Dict[str, Any]):
+    # Streams /apply/plan/stream (SSE): yields (live text, None) while tokens
+    # arrive, then ("", result) once the validated plan event lands.
     if not job_id or job_id not in idx:
-        return {"Plan JSON": {"error": "No job selected."}, "Answers (formatted)": "_No answers_", "Cover Letter": "_No cover letter_"}
-    job = idx[job_id]
+        yield "", {"Plan JSON": {"error": "No job selected."}, "Answers (formatted)": "_No answers_", "Cover Letter": "_No cover letter_"}
+        return
+    job = _full_job(job_id, idx)
+    live = ""
     try:
-        r = requests.post(f"{API}/apply/plan", json=job, timeout=90)
-        r.raise_for_status()
-        plan = r.json()
-        answers = (plan or {}).get("answers") or {}
-        answers_md = "\n".join([f"- **{k}**: {v}" for k, v in answers.items()]) or "_No answers generated_"
-        cl = (plan or {}).get("cover_letter") or "_No cover letter generated_"
-        return {"Plan JSON": plan, "Answers (formatted)": answers_md, "Cover Letter": cl}
+        with requests.post(f"{API}/apply/plan/stream", json=job, stream=True, timeout=(10, 90)) as r:
+            r.raise_for_status()
+            event = None
+            for line in r.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[7:]
+                elif line.startswith("data: "):
+                    data = json.loads(line[6:])
+                    if event == "token":
+                        live += data.get("text", "")
+                        yield f"```\n{live[-2000:]}\n```", None
+                    elif event == "plan":
+                        yield "", _plan_result(data)
+                        return
+                    elif event == "error":
+                        yield "", _plan_error(f"/apply/plan/stream failed: {data.get('error')}")
+                        return
+        yield "", _plan_error("/apply/plan/stream ended without a plan")
     except requests.HTTPError as e:
         try:
             detail = r.json()
         except Exception:
             detail = None
-        return {
-            "Plan JSON": {"error": f"/apply/plan failed: {e}", "detail": detail},
-            "Answers (formatted)": "_Error_",
-            "Cover Letter": "_Error_",
-        }
+        yield "", _plan_error(f"/apply/plan/stream failed: {e}", detail)
+    except Exception as e:
+        yield "", _plan_error(f"/apply/plan/stream failed: {e}")
+
+def plan_all(idx: Dict[str, Any]):
+    # Streams /apply/plan_batch (NDJSON) and re-renders a status table as plans arrive
+    if not idx:
+        yield "_Search first, then plan all results._"
+        return
+    ids = list(idx.keys())
+    done: Dict[str, str] = {}
+
+    def render() -> str:
+        lines = [f"**Planned {len(done)}/{len(ids)}**", "", "| Job | Result |", "|---|---|"]
+        for jid, res in done.items():
+            j = idx.get(jid) or {}
+            lines.append(f"| {j.get('title', jid)} — {j.get('company', '')} | {res} |")
+        return "\n".join(lines)
+
+    try:
+        with requests.post(f"{API}/apply/plan_batch", json={"job_ids": ids}, stream=True, timeout=(10, 300)) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                if item.get("error"):
+                    done[item["job_id"]] = f"❌ {item['error']}"
+                else:
+                    done[item["job_id"]] = f"✅ variant `{item['plan'].get('resume_variant')}`"
+                yield render()
     except Exception as e:
-        return {
-            "Plan JSON": {"error": f"/apply/plan failed: {e}"},
-            "Answers (formatted)": "_Error_",
-            "Cover Letter": "_Error_",
-        }
+        yield render() + f"\n\n/apply/plan_batch failed: {e}"
 
 # ---------- UI ----------
 with gr.Blocks(title="AutoApply Pro") as demo:
@@ -254,7 +318,11 @@ with gr.Blocks(title="AutoApply Pro") as demo:
                 job_id_dd = gr.Dropdown(label="Select Job ID", choices=[], interactive=True)
                 gr.Markdown("(Open the job posting from the table’s URL column)")
             details_md = gr.Markdown("Select a job to see details.")
-            plan_btn = gr.Button("Plan Application ✍️", variant="primary")
+            with gr.Row():
+                plan_btn = gr.Button("Plan Application ✍️", variant="primary")
+                plan_all_btn = gr.Button("Plan All Results")
+            plan_all_md = gr.Markdown()
+            live_md = gr.Markdown()
             plan_json = gr.JSON(label="Raw Plan JSON")
             answers_md = gr.Markdown()
             coverletter_md = gr.Markdown()
@@ -284,7 +352,7 @@ with gr.Blocks(title="AutoApply Pro") as demo:
             plan_btn.click(
                 plan_application,
                 inputs=[job_id_dd, state_idx],
-                outputs=[plan_json],
+                outputs=[live_md, plan_json],
             ).then(
                 lambda pj: (pj or {}).get("Answers (formatted)", "_No answers_"),
                 inputs=[plan_json],
@@ -295,5 +363,7 @@ with gr.Blocks(title="AutoApply Pro") as demo:
                 outputs=[coverletter_md],
             )
 
+            plan_all_btn.click(plan_all, inputs=[state_idx], outputs=[plan_all_md])
+
 if __name__ == "__main__":
     demo.launch(server_name="0.0.0.0", server_port=7862)
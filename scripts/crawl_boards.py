@@ -0,0 +1,45 @@
+# scripts/crawl_boards.py
+# Usage: python scripts/crawl_boards.py boards.txt   (one "source,company" per line)
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from apps.api.models.db import SessionLocal, engine
+from apps.api.models.schema import ensure_schema
+from apps.api.services.board_state_service import load_states
+from apps.api.services.ingest_service import ingest_crawl
+from connectors.crawl import Crawler
+
+
+def read_targets(path: str):
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            source, company = (p.strip() for p in line.split(",", 1))
+            yield source, company
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("boards")
+    ap.add_argument("--workers", type=int, default=32)
+    ap.add_argument("--per-host", type=int, default=8)
+    ap.add_argument("--batch-size", type=int, default=500)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    ensure_schema(engine)
+    targets = list(read_targets(args.boards))
+    with SessionLocal() as db:
+        states = load_states(db)
+
+    crawler = Crawler(max_workers=args.workers, per_host=args.per_host)
+    stats = ingest_crawl(crawler.crawl(targets, states=states), batch_size=args.batch_size)
+    print({"crawl": crawler.stats.as_dict(), "ingest": stats.as_dict()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from apps.api.models.db import PoolWaitStats, async_database_url, timed_pool
+from apps.api.models.schema import ensure_schema
+from apps.api.services.discovery_service import (
+    count_jobs_async, find_jobs_async, find_jobs_page, find_jobs_page_async,
+)
+from apps.api.services.ingest_service import upsert_jobs
+
+
+def test_async_database_url_swaps_driver():
+    assert str(async_database_url("postgresql+psycopg2://u:p@db/x")).startswith("postgresql+psycopg://")
+    assert async_database_url("sqlite:///a.db").drivername == "sqlite+aiosqlite"
+
+
+def test_async_search_matches_sync(tmp_path):
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    sync = create_engine(url).execution_options(schema_translate_map={"public": None})
+    ensure_schema(sync)
+    upsert_jobs([{"id": f"j{i:02d}", "source": "greenhouse", "company": "acme", "title": f"Engineer {i}"}
+                 for i in range(7)], engine=sync)
+
+    async def run():
+        eng = create_async_engine(async_database_url(url)).execution_options(schema_translate_map={"public": None})
+        async with async_sessionmaker(eng)() as db:
+            first = await find_jobs_page_async(db, "engineer", None, None, None, limit=4, cursor="", summary=True)
+            rest = await find_jobs_page_async(db, "engineer", None, None, None, limit=10, cursor=first.next_cursor)
+            out = (first, rest, await count_jobs_async(db), await find_jobs_async(db, None, None, None, "lever"))
+        await eng.dispose()
+        return out
+
+    first, rest, count, lever = asyncio.run(run())
+    from sqlalchemy.orm import Session
+    with Session(sync) as db:
+        expected = find_jobs_page(db, "engineer", None, None, None, limit=4, cursor="", summary=True)
+    assert [j.id for j in first.items] == [j.id for j in expected.items]
+    assert first.next_cursor == expected.next_cursor
+    assert len(first.items) + len(rest.items) == count == 7
+    assert lever == []
+
+
+def test_pool_wait_stats_record_checkouts_and_timeouts(tmp_path):
+    stats = PoolWaitStats()
+    eng = create_engine(f"sqlite:///{tmp_path / 'p.db'}", poolclass=timed_pool(QueuePool, stats),
+                        pool_size=1, max_overflow=0, pool_timeout=0.05)
+    held = eng.connect()
+    with pytest.raises(exc.TimeoutError):
+        eng.connect()
+    held.close()
+    eng.connect().close()
+    out = stats.stats()
+    assert (out["checkouts"], out["timeouts"]) == (2, 1)
+    assert out["wait_ms_max"] >= 50
+
+
+def test_search_returns_summaries_and_detail_returns_description(tmp_path):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from apps.api.main import app
+    from apps.api.models.db import get_async_db, get_db
+    from apps.api.services.search_cache import search_cache
+
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    sync = create_engine(url).execution_options(schema_translate_map={"public": None})
+    ensure_schema(sync)
+    upsert_jobs([{"id": "d1", "source": "greenhouse", "company": "acme", "title": "Detail Engineer",
+                  "description_raw": "Full description of the role"}], engine=sync)
+    aeng = create_async_engine(async_database_url(url)).execution_options(schema_translate_map={"public": None})
+    selects = []
+    event.listen(aeng.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, *a: selects.append(stmt) if stmt.lstrip().upper().startswith("SELECT") else None)
+
+    async def async_db():
+        async with async_sessionmaker(aeng)() as s:
+            yield s
+
+    def sync_db():
+        with Session(sync) as s:
+            yield s
+
+    app.dependency_overrides[get_async_db] = async_db
+    app.dependency_overrides[get_db] = sync_db
+    search_cache.bump_generation()
+    try:
+        client = TestClient(app)
+        r = client.get("/discovery/search", params={"query": "detail"})
+        assert r.status_code == 200
+        assert [j["id"] for j in r.json()] == ["d1"]
+        assert "description_html" not in r.json()[0]
+        assert selects and not any("description_raw" in s or "description_md" in s for s in selects)
+
+        r = client.get("/discovery/jobs/d1")
+        assert r.status_code == 200
+        assert r.json()["description_html"] == "Full description of the role"
+
+        r = client.get("/discovery/jobs/missing")
+        assert r.status_code == 404
+        assert r.json()["detail"] == "Job not found: missing"
+    finally:
+        app.dependency_overrides.pop(get_async_db, None)
+        app.dependency_overrides.pop(get_db, None)
+        asyncio.run(aeng.dispose())
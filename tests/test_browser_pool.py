@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from automation.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected and not self.closed
+
+    async def new_context(self, **kwargs):
+        ctx = FakeContext(self)
+        self.contexts.append(ctx)
+        return ctx
+
+    async def close(self):
+        self.closed = True
+
+
+def _pool(**kw):
+    browsers = []
+
+    async def launch():
+        browsers.append(FakeBrowser())
+        return browsers[-1]
+
+    return BrowserPool(launch=launch, max_memory_mb=None, **kw), browsers
+
+
+def test_pool_reuses_browser_and_recycles_after_max_uses():
+    async def run():
+        pool, browsers = _pool(max_contexts=2, max_uses=3)
+        for _ in range(4):
+            async with pool.context() as ctx:
+                assert not ctx.closed
+            assert ctx.closed
+        assert len(browsers) == 2 and browsers[0].closed and not browsers[1].closed
+        assert pool.stats()["recycles"] == 1
+
+        # a crashed browser is replaced on the next checkout
+        browsers[1].connected = False
+        async with pool.context():
+            pass
+        assert len(browsers) == 3
+        await pool.close()
+        assert browsers[2].closed
+
+    asyncio.run(run())
+
+
+def test_pool_bounds_concurrent_contexts():
+    async def run():
+        pool, browsers = _pool(max_contexts=2, max_uses=0)
+        live = peak = 0
+
+        async def use():
+            nonlocal live, peak
+            async with pool.context():
+                live += 1
+                peak = max(peak, live)
+                await asyncio.sleep(0.01)
+                live -= 1
+
+        await asyncio.gather(*(use() for _ in range(6)))
+        assert peak == 2 and len(browsers) == 1 and len(browsers[0].contexts) == 6
+
+    asyncio.run(run())
+
+
+def test_memory_check_is_rate_limited(monkeypatch):
+    from automation import browser_pool
+    samples = []
+    monkeypatch.setattr(browser_pool, "chromium_rss_mb", lambda: samples.append(1) or 10.0)
+
+    async def run():
+        pool, _ = _pool(max_uses=0)
+        pool.max_memory_mb, pool.memory_check_seconds = 1500, 60
+        for _ in range(5):
+            async with pool.context():
+                pass
+        assert len(samples) == 1
+        pool._memory_checked_at -= 61
+        async with pool.context():
+            pass
+        assert len(samples) == 2
+
+    asyncio.run(run())
+
+
+def test_default_pool_is_not_silently_replaced_across_loops(monkeypatch):
+    from automation import browser_pool
+    monkeypatch.setattr(browser_pool, "_default", None)
+
+    async def first():
+        return browser_pool.get_browser_pool()
+
+    async def second():
+        return browser_pool.get_browser_pool()
+
+    pool = asyncio.run(first())
+    with pytest.raises(RuntimeError):
+        asyncio.run(second())
+
+    async def close_then_get():
+        await browser_pool.close_browser_pool()
+        return browser_pool.get_browser_pool()
+
+    assert asyncio.run(close_then_get()) is not pool
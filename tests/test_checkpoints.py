@@ -0,0 +1,204 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from apps.api.main import app
+from apps.api.models.db import get_db
+from apps.api.models.domain import ApplicationPlan, Job
+from apps.api.services import checkpoint_service
+from apps.worker import tasks as worker_tasks
+from automation import checkpoints, form_filler, form_schema
+from automation.form_schema import CAPTURE_JS, EXTRACT_JS, FILL_JS, FINGERPRINT_JS, FormSchemaCache
+
+FIELDS = [
+    {"selector": "#email", "name": "email", "type": "email", "label": "Email", "required": True, "options": []},
+    {"selector": "#q1", "name": "q1", "type": "textarea", "label": "Why us?", "required": False, "options": []},
+]
+
+
+class FakeFrame:
+    def __init__(self, fields):
+        self.fields, self.values, self.url = fields, {}, "https://boards.example.com/acme/jobs/1"
+
+    async def evaluate(self, script, arg=None):
+        if script == FINGERPRINT_JS:
+            return [f"{f['type']}:{f['name']}" for f in self.fields]
+        if script == EXTRACT_JS:
+            return self.fields
+        if script == CAPTURE_JS:
+            return {s: self.values[s] for s in arg if s in self.values}
+        if script == FILL_JS:
+            self.values.update({i["selector"]: i["value"] for i in arg})
+            return []
+        raise AssertionError(script)
+
+    async def wait_for_selector(self, *a, **kw):
+        return True
+
+
+class FakePage:
+    def __init__(self):
+        self.main_frame = FakeFrame(FIELDS)
+        self.frames = [self.main_frame]
+        self.url = self.main_frame.url
+        self.clicked = []
+        self.files = {}
+
+    async def screenshot(self, **kw):
+        return b"\xff\xd8jpeg"
+
+    async def goto(self, url, **kw):
+        self.url = url
+
+    async def click(self, selector, **kw):
+        self.clicked.append(selector)
+
+    async def wait_for_load_state(self, *a):
+        pass
+
+    async def set_input_files(self, selector, path):
+        self.files[selector] = path
+
+    def on(self, event, fn):
+        pass
+
+    def remove_listener(self, event, fn):
+        pass
+
+
+class FakeContext:
+    def __init__(self, page, storage_state=None):
+        self.page, self.state = page, storage_state
+
+    async def storage_state(self):
+        return {"cookies": [{"name": "sid", "value": "abc"}], "origins": []}
+
+    async def new_page(self):
+        return self.page
+
+
+class FakePool:
+    def __init__(self):
+        self.page = FakePage()
+        self.kwargs = None
+
+    @asynccontextmanager
+    async def context(self, **kwargs):
+        self.kwargs = kwargs
+        yield FakeContext(self.page, kwargs.get("storage_state"))
+
+
+def test_checkpoint_review_and_resume(monkeypatch, engine, tmp_path):
+    Session = sessionmaker(bind=engine, future=True)
+    monkeypatch.setattr(checkpoints, "SessionLocal", Session)
+    monkeypatch.setattr(form_schema, "_cache", FormSchemaCache(tmp_path))
+    job = SimpleNamespace(id="j1", source="greenhouse", company="Acme")
+    plan = {"answers": {"Why us?": "Search"}}
+
+    page = FakePage()
+    page.main_frame.values = {"#email": "ada@example.com", "#q1": "Search"}
+    cp_id = asyncio.run(checkpoints.save_checkpoint(page, FakeContext(page), job, plan))
+
+    queued = []
+    monkeypatch.setattr(worker_tasks, "enqueue_resume", queued.append)
+    db = Session()
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        pending = client.get("/apply/checkpoints").json()
+        assert [c["id"] for c in pending] == [cp_id]
+        assert client.get(f"/apply/checkpoints/{cp_id}/screenshot").content == b"\xff\xd8jpeg"
+        assert client.post(f"/apply/checkpoints/{cp_id}/approve").json()["status"] == "approved"
+        assert queued == [cp_id]
+
+        pool = FakePool()
+        asyncio.run(checkpoints.resume_application(cp_id, pool=pool, lean=False))
+        assert pool.kwargs["storage_state"]["cookies"][0]["value"] == "abc"
+        assert pool.page.main_frame.values == {"#email": "ada@example.com", "#q1": "Search"}
+        assert pool.page.clicked == [checkpoints.SUBMIT_SELECTORS["greenhouse"]]
+
+        db.expire_all()
+        done = client.get("/apply/checkpoints", params={"status": "submitted"}).json()
+        assert done[0]["id"] == cp_id
+        # terminal checkpoints cannot be approved again
+        assert client.post(f"/apply/checkpoints/{cp_id}/approve").status_code == 409
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+
+
+def test_approve_leaves_checkpoint_pending_when_queue_is_down(monkeypatch, engine):
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    Session = sessionmaker(bind=engine, future=True)
+    monkeypatch.setattr(checkpoints, "SessionLocal", Session)
+    job = SimpleNamespace(id="j4", source="greenhouse", company="Acme")
+    page = FakePage()
+    cp_id = asyncio.run(checkpoints.save_checkpoint(page, FakeContext(page), job, {}))
+
+    def redis_down(checkpoint_id):
+        raise RedisConnectionError("connection refused")
+
+    db = Session()
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        monkeypatch.setattr(worker_tasks, "enqueue_resume", redis_down)
+        assert client.post(f"/apply/checkpoints/{cp_id}/approve").status_code == 503
+        db.expire_all()
+        assert checkpoint_service.get_checkpoint(db, cp_id).status == "pending"
+
+        queued = []
+        monkeypatch.setattr(worker_tasks, "enqueue_resume", queued.append)
+        assert client.post(f"/apply/checkpoints/{cp_id}/approve").json()["status"] == "approved"
+        assert queued == [cp_id]
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+
+def test_resume_reattaches_files_from_the_fill_step(monkeypatch, engine, tmp_path):
+    Session = sessionmaker(bind=engine, future=True)
+    monkeypatch.setattr(checkpoints, "SessionLocal", Session)
+    monkeypatch.setattr(form_schema, "_cache", FormSchemaCache(tmp_path))
+    job = Job(id="j2", title="ML Engineer", company="Acme", source="greenhouse",
+              url="https://boards.example.com/acme/jobs/2")
+    plan = ApplicationPlan(job=job, resume_variant="default", answers={"Why us?": "Search"})
+    resume = str(tmp_path / "cv.pdf")
+
+    fill = FakePool()
+    summary = asyncio.run(form_filler.submit_application(job, plan, pool=fill, lean=False, resume_path=resume))
+    assert fill.page.files == {"input[type=file]": resume}
+
+    cp_id = summary["checkpoint_id"]
+    with Session() as db:
+        checkpoint_service.set_status(db, cp_id, "approved")
+    pool = FakePool()
+    asyncio.run(checkpoints.resume_application(cp_id, pool=pool, lean=False))
+    assert pool.page.files == {"input[type=file]": resume}
+    assert pool.page.clicked == [checkpoints.SUBMIT_SELECTORS["greenhouse"]]
+
+
+def test_error_after_submit_click_still_marks_submitted(monkeypatch, engine, tmp_path):
+    Session = sessionmaker(bind=engine, future=True)
+    monkeypatch.setattr(checkpoints, "SessionLocal", Session)
+    monkeypatch.setattr(form_schema, "_cache", FormSchemaCache(tmp_path))
+    job = SimpleNamespace(id="j3", source="greenhouse", company="Acme")
+    page = FakePage()
+    page.main_frame.values = {"#email": "ada@example.com"}
+    cp_id = asyncio.run(checkpoints.save_checkpoint(page, FakeContext(page), job, {"answers": {}}))
+    with Session() as db:
+        checkpoint_service.set_status(db, cp_id, "approved")
+
+    async def navigation_dropped(*a):
+        raise RuntimeError("target closed")
+
+    pool = FakePool()
+    pool.page.wait_for_load_state = navigation_dropped
+    summary = asyncio.run(checkpoints.resume_application(cp_id, pool=pool, lean=False))
+    assert summary["unconfirmed"] and pool.page.clicked == [checkpoints.SUBMIT_SELECTORS["greenhouse"]]
+    with Session() as db:
+        row = checkpoint_service.get_checkpoint(db, cp_id)
+        assert row.status == "submitted" and "unconfirmed" in row.error
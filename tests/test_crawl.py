@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from connectors.base import BoardConnector
+from connectors.crawl import Crawler
+
+
+class FakeResponse:
+    def __init__(self, payload, status=200, headers=None):
+        self._payload = payload
+        self.status_code = status
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.max_running = {}
+
+    def get(self, url, timeout=None, **kw):
+        host = url.split("/")[2]
+        with self.lock:
+            self.running[host] = self.running.get(host, 0) + 1
+            self.max_running[host] = max(self.max_running.get(host, 0), self.running[host])
+        time.sleep(0.01)
+        with self.lock:
+            self.running[host] -= 1
+        if "broken" in url:
+            return FakeResponse({}, status=500)
+        if "greenhouse" in url:
+            return FakeResponse({"jobs": [{"id": 1, "title": "ML Engineer", "absolute_url": "https://x/1"}]})
+        return FakeResponse([{"id": "abc", "text": "Data Scientist", "hostedUrl": "https://y/abc"}])
+
+
+def test_crawl_yields_jobs_and_isolates_errors():
+    session = FakeSession()
+    crawler = Crawler(max_workers=8, per_host=2, session=session)
+    targets = [("greenhouse", f"co{i}") for i in range(6)] + [("lever", "acme"), ("lever", "broken"), ("workday", "x")]
+
+    results = list(crawler.crawl(targets))
+
+    assert len(results) == len(targets)
+    failed = {(r.source, r.company) for r in results if not r.ok}
+    assert failed == {("lever", "broken"), ("workday", "x")}
+    assert crawler.stats.jobs == 7
+    assert all(n <= 2 for n in session.max_running.values())
+    titles = {j.title for j in crawler.iter_jobs([("greenhouse", "a"), ("lever", "b")])}
+    assert titles == {"ML Engineer", "Data Scientist"}
+
+
+class ConditionalSession:
+    def __init__(self, payload, etag=None):
+        self.payload = payload
+        self.etag = etag
+
+    def get(self, url, headers=None, timeout=None):
+        if self.etag and (headers or {}).get("If-None-Match") == self.etag:
+            return FakeResponse(None, status=304)
+        return FakeResponse(self.payload, headers={"ETag": self.etag} if self.etag else {})
+
+
+def test_conditional_fetch_skips_unchanged_boards():
+    payload = {"jobs": [{"id": 1, "title": "ML Engineer", "absolute_url": "https://x/1"}]}
+    states = {}
+
+    crawler = Crawler(session=ConditionalSession(payload, etag='"v1"'))
+    first = list(crawler.crawl([("greenhouse", "acme")], states=states))
+    assert first[0].changed and len(first[0].jobs) == 1
+    assert states[("greenhouse", "acme")].etag == '"v1"'
+
+    again = list(crawler.crawl([("greenhouse", "acme")], states=states))
+    assert not again[0].changed and again[0].jobs == []
+    assert crawler.stats.unchanged == 1
+
+    # No validators from the server: falls back to the content hash
+    crawler = Crawler(session=ConditionalSession(payload))
+    states = {}
+    list(crawler.crawl([("greenhouse", "acme")], states=states))
+    res = list(crawler.crawl([("greenhouse", "acme")], states=states))[0]
+    assert not res.changed
+
+
+def test_diff_board_against_jobrows(db):
+    from apps.api.models.domain import Job
+    from apps.api.models.sql.jobs import JobRow
+    from apps.api.services.board_state_service import diff_board
+    from connectors.base import posting_hash
+
+    keep = Job(id="1", title="A", company="acme", url="https://x/1", source="greenhouse")
+    edit = Job(id="2", title="B", company="acme", url="https://x/2", source="greenhouse")
+    for j in (keep, edit):
+        db.add(JobRow(id=j.id, source=j.source, company=j.company, title=j.title, content_hash=posting_hash(j)))
+    db.add(JobRow(id="3", source="greenhouse", company="acme", title="Gone"))
+    db.commit()
+
+    fresh = [keep, edit.model_copy(update={"title": "B2"}), Job(id="4", title="D", company="acme", url="https://x/4", source="greenhouse")]
+    diff = diff_board(db, "greenhouse", "acme", fresh)
+    assert [j.id for j in diff.added] == ["4"]
+    assert [j.id for j in diff.changed] == ["2"]
+    assert diff.removed == ["3"]
+
+
+def test_board_connector_requires_url_and_postings():
+    class Partial(BoardConnector):
+        source = "partial"
+
+        def board_url(self, company):
+            return f"https://example.com/{company}"
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,110 @@
+import random
+import time
+
+from apps.api.models.domain import Job, Profile
+from apps.api.services.decision_engine import DecisionEngine
+
+PROFILE = Profile(full_name="A B", email="a@example.com", skills=["python"])
+
+
+def _job(i, title, location=None, salary=None):
+    return Job(id=str(i), title=title, company="acme", url="https://x", source="lever",
+               location=location, salary=salary)
+
+
+def test_full_preference_schema():
+    engine = DecisionEngine.from_yaml()
+    jobs = [
+        _job(0, "Senior Machine Learning Engineer", "Remote"),
+        _job(1, "AI Engineer Intern", "Remote"),                         # excluded title
+        _job(2, "Data Scientist", "Berlin"),                             # not preferred location
+        _job(3, "AI Engineer", "Seattle, WA", "USD 120,000–140,000/year"),  # below salary_min_usd
+        _job(4, "AI Engineer", "Seattle, WA", "USD 150,000–200,000/year"),
+        _job(5, "Data Scientist", "Remote"),
+    ]
+    scores = engine.score_many(PROFILE, jobs)
+    assert scores[1] == 0.0 and scores[3] == 0.0
+    assert scores[0] == engine.score(PROFILE, jobs[0]) > 0.5
+    assert [j.id for j in engine.filter_rank(PROFILE, jobs)] == ["0", "4", "5"]
+    assert [j.id for j in engine.filter_rank(PROFILE, jobs, k=2)] == ["0", "4"]
+
+
+def test_exclude_terms_match_whole_words_includes_substrings():
+    engine = DecisionEngine({"role_titles": {"include": ["engineer", "c++", "data scientist"], "exclude": ["intern"]},
+                             "locations": {"preferred": ["new york"], "exclude": ["us"]}})
+    prefs = engine.compiled
+    assert prefs.title_part("Internal Tools Engineer") == (0.4, False)
+    assert prefs.title_part("Software Engineer Intern") == (0.0, True)
+    assert prefs.title_part("Engineering Manager") == (0.4, False)
+    assert prefs.title_part("Senior Data Scientists") == (0.4, False)
+    assert prefs.title_part("C++ Developer")[0] > 0
+    assert prefs.location_part("Austin, US") == (0.0, True)
+    assert prefs.location_part("New York City, Houston") == (0.3, False)
+
+
+def test_ranks_100k_jobs_quickly():
+    rng = random.Random(7)
+    titles = ["Senior Machine Learning Engineer", "AI Engineer", "Data Scientist", "Sales Lead",
+              "Data Scientist Intern", "Backend Engineer"] + [f"Engineer {n}" for n in range(500)]
+    locs = ["Remote", "Seattle, WA", "New York", "London", None]
+    jobs = [_job(i, rng.choice(titles), rng.choice(locs)) for i in range(100_000)]
+    engine = DecisionEngine.from_yaml()
+
+    t0 = time.perf_counter()
+    top = engine.filter_rank(PROFILE, jobs, k=50)
+    assert time.perf_counter() - t0 < 1.0
+    assert len(top) == 50
+
+
+def test_embedding_similarity_feeds_ranking(tmp_path):
+    import numpy as np
+    from ai.embeddings import embed_many, job_text
+    from apps.api.services.vector_index import VectorIndex
+
+    jobs = [
+        _job(0, "AI Engineer", "Remote"),
+        _job(1, "AI Engineer", "Remote"),
+        _job(2, "Pastry Chef", "Remote"),
+    ]
+    jobs[0].description_html = "Build LLM agents with Python, LangChain and FastAPI on Azure."
+    jobs[1].description_html = "Maintain COBOL mainframe batch jobs and JCL scripts."
+    jobs[2].description_html = "Bake croissants and laminated dough."
+
+    index = VectorIndex(tmp_path / "vec", initial_capacity=2)
+    index.upsert([j.id for j in jobs], embed_many(job_text(j.title, j.company, j.description_html) for j in jobs))
+    index.remove(["2"])
+    reopened = VectorIndex(tmp_path / "vec")
+    assert len(reopened) == 2
+
+    profile = Profile(full_name="A B", email="a@example.com", skills=["python", "langchain", "fastapi", "azure"],
+                      summary="GenAI engineer building LLM agents")
+    engine = DecisionEngine.from_yaml(index=reopened)
+    assert [jid for jid, _ in engine.top_matches(profile, k=5)] == ["0", "1"]
+    s = engine.score_many(profile, jobs[:2] + [_job(9, "AI Engineer", "Remote")])
+    assert s[0] > s[1] and np.isfinite(s[2])
+
+
+def test_reader_refresh_mid_grow_leaves_writer_intact(tmp_path):
+    import numpy as np
+    from apps.api.services.vector_index import VectorIndex
+
+    writer = VectorIndex(tmp_path / "vec", dim=4, initial_capacity=2)
+    writer.upsert(["a", "b"], np.eye(4)[:2])
+    reader = VectorIndex(tmp_path / "vec", dim=4)
+    commit_meta = writer._write_meta
+
+    def refresh_then_commit(count, capacity):
+        # the writer has grown vectors.f16 and appended ids.log, meta.json is still old
+        reader._meta_mtime = None
+        reader.refresh()
+        assert reader._mat.mode == "r" and reader.capacity == 2 and len(reader) == 2
+        assert (tmp_path / "vec" / "vectors.f16").stat().st_size == capacity * 4 * 2
+        commit_meta(count, capacity)
+
+    writer._write_meta = refresh_then_commit
+    writer.upsert(["c", "d", "e"], np.eye(4)[[2, 3, 0]])
+
+    reader.refresh()
+    assert len(reader) == 5 and reader.capacity == 8
+    assert [jid for jid, _ in reader.search(np.eye(4)[3], k=1)] == ["d"]
+    assert len(VectorIndex(tmp_path / "vec", dim=4)) == 5
@@ -0,0 +1,64 @@
+import asyncio
+
+from automation.form_schema import EXTRACT_JS, FILL_JS, FINGERPRINT_JS, FormSchemaCache, autofill
+
+FIELDS = [
+    {"selector": "#first_name", "name": "first_name", "type": "text", "label": "First Name *", "required": True, "options": []},
+    {"selector": "#email", "name": "email", "type": "email", "label": "Email *", "required": True, "options": []},
+    {"selector": "#resume", "name": "resume", "type": "file", "label": "Resume", "required": True, "options": []},
+    {"selector": "#q1", "name": "job_application[answers][0]", "type": "textarea",
+     "label": "Why do you want to work here?", "required": False, "options": []},
+    {"selector": "input[name=\"sponsor\"][value=\"No\"]", "name": "sponsor", "type": "radio",
+     "label": "No", "required": True, "options": [], "value": "No"},
+    {"selector": "input[name=\"sponsor\"][value=\"Yes\"]", "name": "sponsor", "type": "radio",
+     "label": "Yes", "required": True, "options": [], "value": "Yes"},
+]
+
+
+class FakeFrame:
+    def __init__(self, fields):
+        self.fields = fields
+        self.calls = []
+        self.url = "https://boards.greenhouse.io/embed/job_app?token=1"
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append(script)
+        if script == FINGERPRINT_JS:
+            return [f"{f['type']}:{f['name']}" for f in self.fields]
+        if script == EXTRACT_JS:
+            return self.fields
+        if script == FILL_JS:
+            self.filled = {i["selector"]: i["value"] for i in arg}
+            return []
+        raise AssertionError(script)
+
+
+class FakePage:
+    def __init__(self):
+        self.main_frame = FakeFrame([])
+        self.form = FakeFrame(FIELDS)
+        self.frames = [self.main_frame, self.form]
+
+
+def test_autofill_caches_schema_and_fills_in_one_call(tmp_path):
+    cache = FormSchemaCache(tmp_path)
+    values = {"first_name": "Ada", "email": "ada@example.com", "resume": "/tmp/r.pdf",
+              "Why do you want to work here?": "Search ranking", "sponsor": "yes", "unknown": "x"}
+
+    async def run(page):
+        return await autofill(page, "greenhouse", "Acme Corp", values, cache=cache)
+
+    first = FakePage()
+    schema, missing = asyncio.run(run(first))
+    assert missing == [] and len(schema.fields) == 6 and schema.fields[0].frame == 0
+    assert first.form.filled == {
+        "#first_name": "Ada", "#email": "ada@example.com", "#q1": "Search ranking",
+        "input[name=\"sponsor\"][value=\"Yes\"]": True,
+    }
+    assert first.form.calls.count(FILL_JS) == 1
+
+    # same company + unchanged form: served from the cache (disk), no extraction
+    second = FakePage()
+    again, _ = asyncio.run(run(second))
+    assert EXTRACT_JS not in second.form.calls and again.form_hash == schema.form_hash
+    assert FormSchemaCache(tmp_path).get("greenhouse", "Acme Corp", schema.form_hash) is not None
@@ -0,0 +1,217 @@
+from sqlalchemy import func, select
+
+from apps.api.models.domain import Job
+from apps.api.models.sql.jobs import JobRow
+from apps.api.services.ingest_service import delete_jobs, ingest_crawl, upsert_jobs
+from connectors.base import BoardState
+from connectors.crawl import BoardResult
+
+
+def _jobs(n, company="acme", **kw):
+    for i in range(n):
+        yield Job(id=f"{company}-{i}", title=f"Engineer {i}", company=company,
+                  url=f"https://x/{i}", source="greenhouse", **kw)
+
+
+def test_upsert_jobs_batches_and_updates(engine, db):
+    stats = upsert_jobs(_jobs(1203, description_html="<p>desc</p>"), engine=engine, batch_size=500)
+    assert stats.rows == 1203 and stats.batches == 3
+    assert db.execute(select(func.count()).select_from(JobRow)).scalar_one() == 1203
+
+    # Re-ingest without descriptions: titles update, descriptions are kept
+    upsert_jobs((j.model_copy(update={"title": "Staff " + j.title}) for j in _jobs(3)), engine=engine)
+    row = db.get(JobRow, "acme-0")
+    db.refresh(row)
+    assert row.title == "Staff Engineer 0"
+    assert row.description_raw == "<p>desc</p>"
+
+
+def test_ingest_crawl_writes_only_diffs(engine, db):
+    state = BoardState(source="greenhouse", company="acme", content_hash="h1")
+    first = [BoardResult("greenhouse", "acme", jobs=list(_jobs(3)), state=state)]
+    stats = ingest_crawl(first, engine=engine)
+    assert stats.rows == 3
+
+    jobs = list(_jobs(3))[1:] + [Job(id="acme-9", title="New", company="acme", url="https://x/9", source="greenhouse")]
+    second = [
+        BoardResult("greenhouse", "acme", jobs=jobs, state=state),
+        BoardResult("lever", "quiet", changed=False, state=BoardState(source="lever", company="quiet")),
+    ]
+    stats = ingest_crawl(second, engine=engine)
+    assert stats.rows == 1 and stats.deleted == 1
+    ids = set(db.execute(select(JobRow.id)).scalars())
+    assert ids == {"acme-1", "acme-2", "acme-9"}
+
+
+def test_near_duplicates_are_clustered(engine, db):
+    from apps.api.services.dedup import hamming, simhash
+    from apps.api.services.discovery_service import find_jobs
+
+    desc = "We are hiring a machine learning engineer to build ranking models with Python and PyTorch. " * 5
+    a = simhash("Senior ML Engineer", "acme", desc)
+    assert hamming(a, simhash("Senior ML Engineer", "acme", desc + " Apply now.")) <= 3
+    assert hamming(a, simhash("Payroll Specialist", "globex", "Process payroll and benefits.")) > 3
+
+    jobs = [
+        Job(id="gh-1", title="Senior ML Engineer", company="acme", url="https://x/1", source="greenhouse", description_html=desc),
+        Job(id="lv-1", title="Senior ML Engineer", company="acme", url="https://y/1", source="lever", description_html=desc + " Apply now."),
+        Job(id="gh-2", title="Payroll Specialist", company="globex", url="https://x/2", source="greenhouse", description_html="Process payroll."),
+    ]
+    upsert_jobs(jobs[:1], engine=engine)
+    upsert_jobs(jobs[1:], engine=engine)
+
+    assert db.get(JobRow, "lv-1").dup_of == "gh-1"
+    assert db.get(JobRow, "gh-1").dup_of is None
+    collapsed = {j.id for j in find_jobs(db, None, None, None, None, collapse_duplicates=True)}
+    assert collapsed == {"gh-1", "gh-2"}
+
+
+def test_sparse_reingest_keeps_fingerprint_of_stored_description(engine, db):
+    jobs = [
+        Job(id="gh-1", title="Software Engineer", company="acme", url="https://x/1", source="greenhouse",
+            description_html="Build payment APIs in Go and run them on Kubernetes. " * 5),
+        Job(id="gh-2", title="Software Engineer", company="acme", url="https://x/2", source="greenhouse",
+            description_html="Ship iOS features in Swift for our consumer mobile app. " * 5),
+    ]
+    upsert_jobs(jobs, engine=engine)
+    before = {j.id: db.get(JobRow, j.id).hash_sim for j in jobs}
+
+    # a board re-crawl without descriptions must not collapse same-title postings
+    upsert_jobs((j.model_copy(update={"description_html": None}) for j in jobs), engine=engine)
+    db.expire_all()
+    for j in jobs:
+        row = db.get(JobRow, j.id)
+        assert row.hash_sim == before[j.id] and row.dup_of is None and row.description_raw
+
+
+def test_sparse_reingest_keeps_description_embedding(engine, tmp_path, monkeypatch):
+    from ai.embeddings import embed, job_text
+    from apps.api.services import ingest_service
+    from apps.api.services.vector_index import VectorIndex
+
+    index = VectorIndex(tmp_path / "vec", initial_capacity=2)
+    monkeypatch.setattr(ingest_service, "get_vector_index", lambda: index)
+    job = Job(id="gh-1", title="Software Engineer", company="acme", url="https://x/1", source="greenhouse",
+              description_html="Build payment APIs in Go and run them on Kubernetes.")
+    full = embed(job_text(job.title, job.company, job.description_html))
+
+    upsert_jobs([job], engine=engine)
+    upsert_jobs([job.model_copy(update={"description_html": None})], engine=engine)
+    assert index.similarities(full, ["gh-1"])[0] > 0.99
+
+def test_deleting_canonical_reelects_within_cluster(engine, db):
+    desc = "We are hiring a machine learning engineer to build ranking models with Python and PyTorch. " * 5
+    upsert_jobs([Job(id=f"ml-{i}", title="Senior ML Engineer", company="acme", url=f"https://x/{i}",
+                     source="greenhouse", description_html=desc) for i in range(3)], engine=engine)
+    assert [db.get(JobRow, f"ml-{i}").dup_of for i in range(3)] == [None, "ml-0", "ml-0"]
+
+    assert delete_jobs(["ml-0"], engine=engine) == 1
+    db.expire_all()
+    assert [db.get(JobRow, f"ml-{i}").dup_of for i in (1, 2)] == [None, "ml-1"]
+
+
+def test_full_text_search_ranks_by_relevance(engine, db):
+    from apps.api.services.discovery_service import find_jobs
+
+    upsert_jobs([
+        Job(id="1", title="Data Analyst", company="acme", url="https://x/1", source="greenhouse",
+            description_html="<p>Some machine learning exposure is a plus.</p>"),
+        Job(id="2", title="Machine Learning Engineer", company="globex", url="https://x/2", source="lever",
+            description_html="<div>Train and ship machine learning models.</div>"),
+        Job(id="3", title="Office Manager", company="initech", url="https://x/3", source="lever"),
+    ], engine=engine)
+
+    hits = [j.id for j in find_jobs(db, "machine learn", None, None, None)]
+    assert hits == ["2", "1"]
+    assert [j.id for j in find_jobs(db, "div", None, None, None)] == []  # markup is not indexed
+    assert [j.id for j in find_jobs(db, "initech", None, None, "lever")] == ["3"]
+
+    upsert_jobs([Job(id="3", title="Machine Learning Manager", company="initech", url="https://x/3", source="lever")], engine=engine)
+    assert "3" in {j.id for j in find_jobs(db, "machine", None, None, None)}
+
+
+def test_keyset_pagination_is_stable(engine, db):
+    from datetime import datetime, timedelta
+    from apps.api.services.discovery_service import find_jobs_page
+
+    base = datetime(2025, 1, 1)
+    upsert_jobs([
+        {"id": f"j{i:02d}", "source": "greenhouse", "company": "acme", "title": f"Engineer {i}",
+         "posted_at": (base + timedelta(days=i // 2)) if i < 8 else None}
+        for i in range(11)
+    ], engine=engine)
+
+    seen, cursor = [], ""
+    while True:
+        page = find_jobs_page(db, None, None, None, None, limit=3, cursor=cursor)
+        seen += [j.id for j in page.items]
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+        # a job ingested mid-walk must not shift the remaining pages
+        upsert_jobs([{"id": f"new{len(seen)}", "source": "lever", "company": "x", "title": "t",
+                      "posted_at": base + timedelta(days=30)}], engine=engine)
+
+    assert seen == [j.id for j in find_jobs_page(db, None, None, None, None, limit=100).items if j.id.startswith("j")]
+    assert len(seen) == 11 and seen[-3:] == ["j10", "j09", "j08"]
+
+    searched = find_jobs_page(db, "engineer", None, None, None, limit=4, cursor="")
+    rest = find_jobs_page(db, "engineer", None, None, None, limit=100, cursor=searched.next_cursor)
+    assert len(searched.items) + len(rest.items) == 11
+
+
+def test_search_cache_invalidated_by_ingest(engine, db):
+    from apps.api.services.discovery_service import find_jobs_page
+    from apps.api.services.search_cache import normalize_params, search_cache
+
+    upsert_jobs(_jobs(2), engine=engine)
+    params = normalize_params("  Engineer ", None, None, None, 10, 0, None, collapse=False)
+    assert params == normalize_params("engineer", None, None, None, 10, 0, None, collapse=False)
+
+    def search():
+        return search_cache.get_or_compute(params, lambda: find_jobs_page(db, "engineer", None, None, None, 10))
+
+    before = search_cache.stats()
+    assert len(search().items) == 2
+    assert len(search().items) == 2
+    after = search_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits_local"] == before["hits_local"] + 1
+
+    upsert_jobs(_jobs(3, company="globex"), engine=engine)
+    assert len(search().items) == 5
+
+
+def test_postgres_relevance_cursor_compares_rank_as_float8():
+    from sqlalchemy.dialects import postgresql
+    from apps.api.services.discovery_service import _encode_cursor, _page_query
+
+    stmt, mode = _page_query("postgresql", "ml engineer", None, None, None, 10, 0, False,
+                             _encode_cursor("r", 0.1, "job-1"), True)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    # ORDER BY and the keyset predicate both use the float8 cast, never bare float4
+    assert mode == "r" and "ts_rank_cd(" in sql
+    assert sql.count("CAST(ts_rank_cd(") == sql.count("ts_rank_cd(") >= 3
+    assert "AS DOUBLE" in sql
+
+
+def test_search_cache_generation_shared_without_redis_results():
+    import fakeredis
+    from apps.api.models.domain import JobPage, JobSummary
+    from apps.api.services.search_cache import SearchCache
+
+    server = fakeredis.FakeServer()
+    api, ingest = (SearchCache(redis_url="redis://fake", redis_results=False) for _ in range(2))
+    for c in (api, ingest):
+        c._redis = fakeredis.FakeRedis(server=server)
+    pages = iter([JobPage(items=[JobSummary(id=str(i), title="t", company="c", url="u", source="s")])
+                  for i in range(2)])
+
+    def search():
+        return api.get_or_compute({"query": "x"}, lambda: next(pages)).items[0].id
+
+    assert search() == search() == "0"
+    assert not any(k.startswith(b"autoapply:search:v1:")
+                   for k in fakeredis.FakeRedis(server=server).keys())
+    ingest.bump_generation()
+    assert search() == "1"
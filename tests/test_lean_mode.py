@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from automation.lean_mode import StepTimings, enable_lean_mode, is_tracker, require_form, wait_for_form
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+class FakeContext:
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+def test_lean_mode_blocks_assets_and_trackers():
+    assert is_tracker("https://www.google-analytics.com/g/collect?v=2")
+    assert is_tracker("https://static.hotjar.com/c/hotjar.js")
+    assert not is_tracker("https://boards.greenhouse.io/acme/jobs/1")
+    assert not is_tracker("https://www.google.com/recaptcha/api.js")
+
+    async def run():
+        ctx, timings = FakeContext(), StepTimings()
+        await enable_lean_mode(ctx, timings)
+        routes = [
+            FakeRoute("https://boards.greenhouse.io/acme/jobs/1", "document"),
+            FakeRoute("https://boards.greenhouse.io/logo.png", "image"),
+            FakeRoute("https://fonts.gstatic.com/x.woff2", "font"),
+            FakeRoute("https://www.googletagmanager.com/gtm.js", "script"),
+            FakeRoute("https://boards.greenhouse.io/app.js", "script"),
+        ]
+        for r in routes:
+            await ctx.handler(r)
+        return [r.outcome for r in routes], timings
+
+    outcomes, timings = asyncio.run(run())
+    assert outcomes == ["continue", "abort", "abort", "abort", "continue"]
+    timings.mark("goto")
+    summary = timings.summary()
+    assert summary["blocked_requests"] == 3 and summary["steps"][0]["step"] == "goto"
+
+
+class FakeFrame:
+    def __init__(self, has_form):
+        self.has_form = has_form
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        if self.has_form:
+            return object()
+        await asyncio.sleep(timeout / 1000)
+        raise TimeoutError(selector)
+
+
+class FakePage:
+    def __init__(self):
+        self.main_frame = FakeFrame(has_form=False)
+        self.frames = [self.main_frame]
+        self.listeners = {}
+
+    def on(self, event, fn):
+        self.listeners.setdefault(event, []).append(fn)
+
+    def remove_listener(self, event, fn):
+        self.listeners[event].remove(fn)
+
+    def attach(self, frame):
+        self.frames.append(frame)
+        for fn in list(self.listeners.get("frameattached", [])):
+            fn(frame)
+
+
+def test_wait_for_form_watches_frames_attached_later():
+    async def run():
+        page = FakePage()
+        board = FakeFrame(has_form=True)
+        asyncio.get_running_loop().call_later(0.05, page.attach, board)
+        t0 = asyncio.get_running_loop().time()
+        frame = await wait_for_form(page, timeout=5_000)
+        assert frame is board and asyncio.get_running_loop().time() - t0 < 1
+        assert page.listeners["frameattached"] == []
+
+        with pytest.raises(RuntimeError):
+            await require_form(FakePage(), timeout=50)
+
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ai import llm
+from apps.api.settings import settings
+
+
+class _Completions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    async def create(self, **kwargs):
+        self.owner.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" hi "))])
+
+
+class _FakeAsync:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+
+class FakeChat(llm._OpenAICompatible):
+    built = 0
+
+    def __init__(self):
+        FakeChat.built += 1
+        super().__init__()
+
+    def _make_sync(self):
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **kw: SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="letter"))]))))
+
+    def _make_async(self):
+        return _FakeAsync()
+
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    FakeChat.built = 0
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setitem(llm._PROVIDERS, "openai", FakeChat)
+    llm.reset_chat_client()
+    yield
+    llm.reset_chat_client()
+
+
+def test_imports_without_api_key(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai")
+    llm.reset_chat_client()
+    import ai.cover_letter, ai.qa  # noqa: F401  module import must not build a client
+    assert not llm.is_configured()
+    with pytest.raises(RuntimeError, match="OPENAI_API_KEY"):
+        llm.get_chat_client()
+
+
+def test_one_client_shared_by_ai_callers(fake_provider, monkeypatch):
+    from ai import plan_cache
+    from ai.cover_letter import tailored_cover_letter
+
+    monkeypatch.setattr(plan_cache, "get_plan_cache", lambda: None)
+
+    client = llm.get_chat_client()
+    assert tailored_cover_letter({"full_name": "A"}, {"title": "Engineer", "company": "acme"}, use_cache=False) == "letter"
+    assert llm.get_chat_client() is client and FakeChat.built == 1
+
+
+def test_achat_uses_one_async_client_per_event_loop(fake_provider):
+    client = llm.get_chat_client()
+
+    async def run():
+        out = [await client.achat("m", [{"role": "user", "content": "x"}]) for _ in range(2)]
+        return out, client.aclient
+
+    first, a1 = asyncio.run(run())
+    second, a2 = asyncio.run(run())
+    assert first == second == ["hi", "hi"]
+    assert a1.calls == a2.calls == 2 and a1 is not a2
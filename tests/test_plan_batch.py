@@ -0,0 +1,55 @@
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.models.db import get_db
+from apps.api.models.domain import ApplicationPlan
+from apps.api.services import application_service
+
+
+def _job(i):
+    return {"id": f"j{i}", "title": f"Engineer {i}", "company": "Acme",
+            "url": f"https://example.com/{i}", "source": "greenhouse"}
+
+
+def test_plan_batch_streams_with_bounded_concurrency(monkeypatch, db):
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+
+    def fake_plan(job, use_cache=True, user_id=None):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.02)
+        with lock:
+            state["now"] -= 1
+        if job.title.endswith("3"):
+            raise RuntimeError("llm down")
+        return ApplicationPlan(job=job, resume_variant="default")
+
+    monkeypatch.setattr(application_service, "plan_application", fake_plan)
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        body = {"jobs": [_job(i) for i in range(6)], "job_ids": ["missing"]}
+        r = client.post("/apply/plan_batch?concurrency=2", json=body)
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        items = [json.loads(line) for line in r.text.splitlines()]
+
+        r = client.post("/apply/plan_batch?format=sse", json={"jobs": [_job(0)]})
+        assert "event: plan" in r.text and r.text.rstrip().endswith("data: {}")
+
+        assert client.post("/apply/plan_batch", json={}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+
+    assert sorted(i["index"] for i in items) == list(range(7))
+    by_id = {i["job_id"]: i for i in items}
+    assert by_id["j3"]["error"].startswith("RuntimeError") and by_id["j3"]["plan"] is None
+    assert by_id["missing"]["error"] == "job not found"
+    assert by_id["j0"]["plan"]["job"]["id"] == "j0"
+    assert state["peak"] <= 2
@@ -0,0 +1,45 @@
+import time
+
+from ai.plan_cache import PlanCache, cache_key
+
+
+def test_key_normalizes_markup_and_whitespace():
+    a = cache_key("answers", "<p>Python   dev</p>", "resume", "m", 0.4, "v1")
+    assert a == cache_key("answers", "Python dev", "resume ", "m", 0.4, "v1")
+    assert a != cache_key("answers", "Python dev", "resume", "m", 0.4, "v2")
+    assert a != cache_key("answers", "Python dev", "resume", "m", 0.7, "v1")
+
+
+def test_get_or_compute_hits_bypass_and_eviction(tmp_path):
+    cache = PlanCache(tmp_path / "plans.sqlite3", max_entries=2)
+    calls = []
+
+    def compute(v):
+        calls.append(v)
+        return {"answers": {"q": v}}
+
+    assert cache.get_or_compute("k1", lambda: compute("a")) == {"answers": {"q": "a"}}
+    assert cache.get_or_compute("k1", lambda: compute("b")) == {"answers": {"q": "a"}}
+    assert cache.get_or_compute("k1", lambda: compute("c"), bypass=True) == {"answers": {"q": "c"}}
+    assert calls == ["a", "c"]
+
+    cache.get_or_compute("empty", lambda: {"answers": {}}, cacheable=lambda v: bool(v["answers"]))
+    assert cache.get("empty") is None
+
+    time.sleep(0.01)
+    cache.set("k2", 2)
+    time.sleep(0.01)
+    cache.get("k1")          # k1 is now most recently used
+    cache.set("k3", 3)       # over max_entries: evicts k2
+    assert cache.get("k2") is None and cache.get("k1") is not None
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["hits_local"] >= 2 and stats["bypassed"] == 1
+
+
+def test_ttl_expiry(tmp_path):
+    cache = PlanCache(tmp_path / "plans.sqlite3", ttl_seconds=0.05)
+    cache.set("k", {"v": 1})
+    assert cache.get("k") == {"v": 1}
+    time.sleep(0.1)
+    assert cache.get("k") is None
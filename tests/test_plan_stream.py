@@ -0,0 +1,49 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from ai import llm, plan_cache
+from apps.api.main import app
+from apps.api.services import application_service
+from apps.api.settings import settings
+
+
+class FakeChat(llm.ChatClient):
+    def __init__(self):
+        self.streams = 0
+
+    async def astream(self, model, messages, temperature=0.3, **kwargs):
+        self.streams += 1
+        for part in ['{"resume_variant": "ml", ', '"answers": {"Why": "Because"}, ', '"cover_letter": "Hi"}']:
+            yield part
+
+
+def _events(text):
+    out = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def test_plan_stream_forwards_tokens_then_validated_plan(monkeypatch, tmp_path):
+    fake = FakeChat()
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm, "_client", fake)
+    monkeypatch.setattr(plan_cache, "_default", plan_cache.PlanCache(tmp_path / "plans.sqlite3"))
+    monkeypatch.setattr(application_service, "resume_text_for", lambda user_id=None: "Python, ML")
+
+    job = {"id": "j1", "title": "ML Engineer", "company": "Acme",
+           "url": "https://example.com/1", "source": "lever"}
+    client = TestClient(app)
+
+    events = _events(client.post("/apply/plan/stream", json=job).text)
+    assert [k for k, _ in events] == ["token", "token", "token", "plan"]
+    plan = events[-1][1]
+    assert plan["resume_variant"] == "ml" and plan["answers"] == {"Why": "Because"}
+    assert plan["job"]["id"] == "j1"
+
+    # the streamed result was cached: a repeat is a single plan event, no new completion
+    events = _events(client.post("/apply/plan/stream", json=job).text)
+    assert [k for k, _ in events] == ["plan"] and fake.streams == 1
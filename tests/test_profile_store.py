@@ -0,0 +1,45 @@
+import json
+import os
+
+from apps.api.models.domain import Profile
+from apps.api.services import profile_service
+
+
+def test_file_profile_is_cached_until_mtime_or_size_changes(tmp_path, monkeypatch):
+    path = tmp_path / "profile.json"
+    monkeypatch.setattr(profile_service, "PROFILE_JSON", path)
+    monkeypatch.setattr(profile_service, "_file_cache", None)
+    assert profile_service.get_profile() is None
+
+    profile_service.save_profile(Profile(full_name="Ada", email="ada@example.com"))
+    first = profile_service.get_profile()
+    assert first.full_name == "Ada"
+    assert profile_service.get_profile() is first          # no re-read / re-validation
+
+    # edited by another process
+    path.write_text(json.dumps({"full_name": "Ada Lovelace", "email": "ada@example.com"}))
+    os.utime(path, ns=(1, 1))
+    assert profile_service.get_profile().full_name == "Ada Lovelace"
+
+    path.unlink()
+    assert profile_service.get_profile() is None
+
+
+def test_user_profiles_are_independent_and_cached_by_version(db, monkeypatch):
+    monkeypatch.setattr(profile_service, "_user_cache", type(profile_service._user_cache)())
+    assert profile_service.get_user_profile(db, "u1") is None
+
+    profile_service.save_user_profile(db, "u1", Profile(full_name="Ada", email="ada@example.com", resume_text="Python"))
+    profile_service.save_user_profile(db, "u2", Profile(full_name="Alan", email="alan@example.com"))
+    a = profile_service.get_user_profile(db, "u1")
+    assert a.resume_text == "Python"
+    assert profile_service.get_user_profile(db, "u1") is a
+    assert profile_service.get_user_profile(db, "u2").full_name == "Alan"
+
+    # a save from another process bumps the version; the cached copy is dropped
+    profile_service._user_cache["u1"] = (0, a)
+    assert profile_service.get_user_profile(db, "u1") is not a
+
+    monkeypatch.setattr(profile_service.settings, "PROFILE_CACHE_SIZE", 1)
+    profile_service.save_user_profile(db, "u1", a)
+    assert list(profile_service._user_cache) == ["u1"]
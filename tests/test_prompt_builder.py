@@ -0,0 +1,39 @@
+from ai.prompt_builder import build_context, chunk_text, count_tokens, drop_boilerplate, html_to_text, pack
+
+
+def test_html_to_text_and_boilerplate():
+    html = (
+        "<div><h2>About&nbsp;the role</h2><p>Build <b>ranking</b> models.</p>"
+        "<ul><li>Python</li><li>PyTorch</li></ul><script>track()</script>"
+        "<p>Acme is an Equal Opportunity Employer.</p></div>"
+    )
+    text = drop_boilerplate(html_to_text(html))
+    assert text == "About the role\n\nBuild ranking models.\n\n- Python\n- PyTorch\n"
+    # the heading stays attached to its paragraph
+    assert chunk_text(text)[0] == "About the role\nBuild ranking models."
+
+
+def test_build_context_packs_relevant_chunks_into_budget():
+    filler = "".join(f"<p>Perk {i}: snacks, offsites and a lovely office with plants.</p>" for i in range(80))
+    html = (f"<p>We need an ML Engineer for search ranking.</p>{filler}"
+            "<h3>Requirements</h3><ul><li>PyTorch</li><li>Learning to rank</li></ul>")
+    resume = "\n\n".join(
+        ["Built learning to rank models in PyTorch for search."]
+        + [f"Volunteer {i}: community gardening and bake sales." for i in range(80)]
+    )
+    ctx = build_context("ML Engineer", "Acme", html, resume, budget=200, jd_share=0.5)
+
+    assert count_tokens(ctx.jd_text) + count_tokens(ctx.resume_text) <= 200
+    assert ctx.jd_text.startswith("We need an ML Engineer")
+    assert "- Learning to rank" in ctx.jd_text
+    assert ctx.resume_text.startswith("Built learning to rank models")
+    s = ctx.stats
+    assert s["jd_tokens_after"] < s["jd_tokens_before"] and s["resume_tokens_after"] < s["resume_tokens_before"]
+
+
+def test_pack_counts_separators_against_budget():
+    chunks = ["alpha", "bravo", "charlie", "delta", "echo"]
+    sizes = [count_tokens(c) for c in chunks]
+    budget = sizes[0] + sizes[1] + count_tokens("\n")
+    packed = pack(chunks, "alpha bravo", budget, keep_first=2)
+    assert packed == "alpha\nbravo"
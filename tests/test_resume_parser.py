@@ -0,0 +1,97 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from fastapi import UploadFile
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from apps.api.services import profile_service
+from apps.api.services.resume_parser import ResumeParser
+from apps.api.services.storage import LocalStorage
+
+
+def _pdf(pages):
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for text in pages:
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)}),
+        })
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    buf = BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+class CountingPool(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=4)
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append((fn.__name__, args[1:]))
+        return super().submit(fn, *args)
+
+
+def _wait(parser, sha, timeout=10):
+    deadline = time.time() + timeout
+    while parser.status(sha)["status"] == "pending" and time.time() < deadline:
+        time.sleep(0.01)
+    return parser.status(sha)
+
+
+def test_pdf_pages_fan_out_and_cache_by_hash(tmp_path):
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(_pdf([f"Page {i}" for i in range(5)]))
+    pool = CountingPool()
+    parser = ResumeParser(tmp_path / "cache", pages_per_task=2, pool=pool)
+
+    assert parser.submit(path, "abc")["status"] == "pending"
+    status = _wait(parser, "abc")
+    assert (status["status"], status["pages"]) == ("done", 5)
+    assert [c for c in pool.calls if c[0] == "pdf_pages_text"] == [
+        ("pdf_pages_text", (0, 2)), ("pdf_pages_text", (2, 4)), ("pdf_pages_text", (4, 6))]
+    assert parser.cached("abc")["text"].split("\n") == [f"Page {i}" for i in range(5)]
+
+    # same content hash: answered from the cache, nothing re-parsed
+    pool.calls.clear()
+    hit = ResumeParser(tmp_path / "cache", pool=pool).submit(path, "abc")
+    assert hit["status"] == "done" and hit["cached"] and "Page 4" in hit["text"]
+    assert pool.calls == []
+
+
+def test_broken_file_fails_soft(tmp_path):
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(b"not a pdf")
+    parser = ResumeParser(tmp_path / "cache", pool=ThreadPoolExecutor(1))
+    parser.submit(path, "bad")
+    status = _wait(parser, "bad")
+    assert status["status"] == "failed" and status["error"]
+    assert parser.cached("bad") is None
+
+
+def test_upload_returns_handle_and_profile_gets_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_service, "get_storage", lambda: LocalStorage(tmp_path / "store"))
+    monkeypatch.setattr(profile_service, "PROFILE_JSON", tmp_path / "profile.json")
+    parser = ResumeParser(tmp_path / "cache", pool=ThreadPoolExecutor(2))
+    monkeypatch.setattr(profile_service, "get_resume_parser", lambda: parser)
+    data = _pdf(["Ada Lovelace", "Analytical Engine"])
+
+    prof, handle = profile_service.attach_resume(UploadFile(BytesIO(data), filename="cv.pdf"))
+    assert prof.resume_sha256 == handle["id"]
+    _wait(parser, handle["id"])
+    parser.shutdown()
+    assert profile_service.get_profile().resume_text == "Ada Lovelace\nAnalytical Engine"
+
+    # identical re-upload: done immediately from the cache
+    prof, handle = profile_service.attach_resume(UploadFile(BytesIO(data), filename="cv.pdf"))
+    assert handle["status"] == "done" and "text" not in handle
+    assert prof.resume_text == "Ada Lovelace\nAnalytical Engine"
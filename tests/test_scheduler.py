@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+from automation.scheduler import MemoryLimits, SitePolicy, SubmissionScheduler, load_site_policies
+
+
+def _job(i, source):
+    return SimpleNamespace(id=f"{source}-{i}", source=source)
+
+
+def test_sites_yaml_parses():
+    policies = load_site_policies()
+    assert policies["greenhouse"].delay_seconds_between_actions == (2.0, 4.0)
+    assert policies["workday"].allow_auto_submit is False
+
+
+def test_scheduler_enforces_quota_policy_and_runs_sites_in_parallel():
+    policies = {
+        "greenhouse": SitePolicy("greenhouse", allow_auto_submit=True, max_submissions_per_day=2,
+                                 max_submissions_per_hour=3600 * 100, burst=5),
+        "lever": SitePolicy("lever", allow_auto_submit=False, max_submissions_per_hour=3600 * 100, burst=5),
+    }
+    calls, live = [], {}
+    peak = {"total": 0, "greenhouse": 0}
+
+    async def fake_submit(job, plan, hitl_required=True, pace=None):
+        live[job.source] = live.get(job.source, 0) + 1
+        peak["total"] = max(peak["total"], sum(live.values()))
+        peak["greenhouse"] = max(peak["greenhouse"], live.get("greenhouse", 0))
+        await pace()
+        await asyncio.sleep(0.02)
+        live[job.source] -= 1
+        if job.id == "lever-1":
+            raise RuntimeError("selector missing")
+        calls.append((job.id, hitl_required))
+
+    async def run():
+        limits = MemoryLimits()
+        sched = SubmissionScheduler(policies, limits=limits, global_per_min=0, submit=fake_submit)
+        items = [(_job(i, "greenhouse"), None) for i in range(3)] + [(_job(i, "lever"), None) for i in range(2)]
+        items.append((_job(0, "workday"), None))
+        results = await sched.submit_many(items, hitl_required=False)
+        return results, await sched.quota_status()
+
+    results, quota = asyncio.run(run())
+    status = {r.job_id: r.status for r in results}
+    assert status == {
+        "greenhouse-0": "submitted", "greenhouse-1": "submitted", "greenhouse-2": "quota_exceeded",
+        "lever-0": "review", "lever-1": "failed", "workday-0": "blocked",
+    }
+    # lever disallows auto submit, so it always stops for review
+    assert ("lever-0", True) in calls and ("greenhouse-0", False) in calls
+    assert peak["greenhouse"] == 1 and peak["total"] == 2
+    assert quota["greenhouse"]["used_today"] == 2
+
+
+def test_token_bucket_waits_for_refill():
+    async def run():
+        limits = MemoryLimits()
+        assert await limits.take("b", rate_per_sec=10, capacity=1) == 0
+        wait = await limits.take("b", rate_per_sec=10, capacity=1)
+        assert 0 < wait <= 0.1
+        await asyncio.sleep(wait + 0.01)
+        assert await limits.take("b", rate_per_sec=10, capacity=1) == 0
+
+    asyncio.run(run())
+
+
+def test_resume_goes_through_quota_buckets_and_pacing():
+    policies = {"lever": SitePolicy("lever", allow_auto_submit=False, max_submissions_per_day=1,
+                                    max_submissions_per_hour=3600 * 100, burst=5,
+                                    delay_seconds_between_actions=(0.01, 0.01))}
+    resumed = []
+
+    async def fake_resume(checkpoint_id, pace=None):
+        await pace()
+        resumed.append(checkpoint_id)
+        return {"checkpoint_id": checkpoint_id}
+
+    async def run():
+        sched = SubmissionScheduler(policies, limits=MemoryLimits(), global_per_min=0,
+                                    submit=lambda *a, **k: None, resume=fake_resume)
+        return [await sched.resume("cp1", "lever", "j1"), await sched.resume("cp2", "lever", "j2"),
+                await sched.resume("cp3", "workday", "j3")]
+
+    first, second, third = asyncio.run(run())
+    # approved by a human: submitted even though lever disallows auto submit
+    assert (first.status, first.timings) == ("submitted", {"checkpoint_id": "cp1"})
+    assert second.status == "quota_exceeded" and third.status == "blocked"
+    assert resumed == ["cp1"]
@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from apps.api.services import storage as storage_mod
+from apps.api.services.storage import (
+    LocalStorage, S3Storage, UploadTooLarge, list_versions, object_key, store_upload_stream,
+)
+
+
+class FakeS3:
+    """In-memory stand-in for a boto3 S3 client (the calls S3Storage makes)."""
+    class NotFound(Exception):
+        response = {"Error": {"Code": "404"}}
+
+    def __init__(self):
+        self.objects = {}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.NotFound()
+        return {}
+
+    def upload_file(self, path, Bucket, Key):
+        self.objects[(Bucket, Key)] = open(path, "rb").read()
+
+    def download_file(self, Bucket, Key, path):
+        open(path, "wb").write(self.objects[(Bucket, Key)])
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.NotFound()
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body
+
+
+def test_local_streams_dedupes_and_keeps_versions(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_mod, "CHUNK_BYTES", 4)   # force several chunks
+    store = LocalStorage(tmp_path)
+    a = store_upload_stream(io.BytesIO(b"resume v1"), "resume", filename="cv.PDF", storage=store)
+    assert a.key == object_key(a.sha256, ".pdf") and a.size == 9 and not a.deduped
+    assert store.local_path(a.key).read_bytes() == b"resume v1"
+
+    again = store_upload_stream(io.BytesIO(b"resume v1"), "resume", filename="cv.pdf", storage=store)
+    assert again.deduped and again.key == a.key
+    b = store_upload_stream(io.BytesIO(b"resume v2"), "resume", filename="cv.pdf", storage=store)
+
+    assert [v["sha256"] for v in list_versions("resume", storage=store)] == [a.sha256, b.sha256]
+    assert store.local_path(a.key).exists()            # old versions are kept
+    assert list(store.tmp_dir.iterdir()) == []
+
+
+def test_size_limit_aborts_without_leaving_files(tmp_path):
+    store = LocalStorage(tmp_path)
+    with pytest.raises(UploadTooLarge):
+        store_upload_stream(io.BytesIO(b"x" * 100), "resume", filename="cv.pdf", storage=store, max_bytes=10)
+    assert list(store.tmp_dir.iterdir()) == []
+    assert not (tmp_path / "objects").exists()
+    assert list_versions("resume", storage=store) == []
+
+
+def test_s3_backend_uploads_once_and_serves_local_copies(tmp_path):
+    client = FakeS3()
+    store = S3Storage("bucket", cache_dir=tmp_path, prefix="uploads", client=client)
+    a = store_upload_stream(io.BytesIO(b"%PDF cv"), "resume", filename="cv.pdf", storage=store)
+    assert client.objects[("bucket", "uploads/" + a.key)] == b"%PDF cv"
+    assert store_upload_stream(io.BytesIO(b"%PDF cv"), "resume", filename="cv.pdf", storage=store).deduped
+
+    # another process without the cached copy downloads it on demand
+    fresh = S3Storage("bucket", cache_dir=tmp_path / "other", prefix="uploads", client=client)
+    assert fresh.local_path(a.key).read_bytes() == b"%PDF cv"
+    assert len(list_versions("resume", storage=fresh)) == 1
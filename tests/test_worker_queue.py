@@ -0,0 +1,138 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from apps.worker import task_queue
+from apps.worker.task_queue import TaskQueue, enqueue_sync, queue_stats
+from apps.worker.worker import Defer, Discard, Worker
+
+
+def _queue(server, **kwargs):
+    return TaskQueue(fakeredis.aioredis.FakeRedis(server=server), **kwargs)
+
+
+def test_claim_orders_by_priority_then_fifo():
+    server = fakeredis.FakeServer()
+    sync = fakeredis.FakeRedis(server=server)
+    first = enqueue_sync(sync, "submit", job_id="a")
+    second = enqueue_sync(sync, "submit", job_id="b")
+    urgent = enqueue_sync(sync, "resume", priority=10, checkpoint_id="c")
+
+    async def run():
+        q = _queue(server)
+        return [(await q.claim())["id"] for _ in range(3)] + [await q.claim()]
+
+    assert asyncio.run(run()) == [urgent, first, second, None]
+    stats = queue_stats(sync)
+    assert (stats["ready"], stats["inflight"]) == (0, 3)
+
+
+def test_expired_lease_is_reclaimed_and_retries_dead_letter(monkeypatch):
+    server = fakeredis.FakeServer()
+    now = [1000.0]
+    monkeypatch.setattr(task_queue, "_now", lambda: now[0])
+
+    async def run():
+        q = _queue(server, visibility_timeout=60, max_attempts=2, backoff_seconds=10)
+        tid = await q.enqueue("submit", job_id="a")
+        t = await q.claim()
+        assert await q.claim() is None        # leased
+        now[0] += 61                          # worker died; lease expired
+        t = await q.claim()
+        assert (t["id"], t["attempts"]) == (tid, 2)
+        assert await q.retry(t, "boom") is False
+        return await q.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["dead"], stats["inflight"], stats["ready"]) == (1, 0, 0)
+
+
+def test_worker_runs_concurrently_retries_and_drains():
+    server = fakeredis.FakeServer()
+    seen = []
+    running = 0
+    peak = 0
+
+    async def submit(task):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        seen.append(task["job_id"])
+        if task["job_id"] == "flaky" and task["attempts"] == 1:
+            raise RuntimeError("transient")
+        if task["job_id"] == "later":
+            raise Defer("quota", 3600)
+        if task["job_id"] == "bad":
+            raise Discard("no such job")
+
+    async def run():
+        q = _queue(server, backoff_seconds=0)
+        for job_id in ("a", "b", "c", "flaky", "later", "bad"):
+            await q.enqueue("submit", job_id=job_id)
+        w = Worker(q, {"submit": submit}, concurrency=3, poll_seconds=0.01, drain_seconds=5)
+        runner = asyncio.create_task(w.run())
+        await asyncio.sleep(0.5)
+        w.stop()
+        await runner
+        return w, await q.stats()
+
+    w, stats = asyncio.run(run())
+    assert peak == 3
+    assert seen.count("flaky") == 2 and seen.count("later") == 1
+    assert stats["counters"]["succeeded"] == 4          # a, b, c, flaky on retry
+    assert (stats["delayed"], stats["dead"], stats["inflight"]) == (1, 1, 0)
+    assert stats["samples"] == 4 and stats["run_ms"]["p50"] >= 40
+
+
+def test_drain_cancels_and_requeues_long_tasks():
+    server = fakeredis.FakeServer()
+
+    async def hang(task):
+        await asyncio.sleep(60)
+
+    async def run():
+        q = _queue(server)
+        await q.enqueue("submit", job_id="slow")
+        w = Worker(q, {"submit": hang}, concurrency=2, poll_seconds=0.01, drain_seconds=0.05)
+        runner = asyncio.create_task(w.run())
+        await asyncio.sleep(0.1)
+        w.stop()
+        await runner
+        return await q.stats(), await q.claim()
+
+    stats, task = asyncio.run(run())
+    assert stats["inflight"] == 0
+    # handed straight back without spending an attempt
+    assert task["job_id"] == "slow" and task["attempts"] == 1
+
+
+def test_resume_handler_maps_scheduler_results(monkeypatch):
+    from types import SimpleNamespace
+    from apps.worker import worker
+
+    row = SimpleNamespace(id="cp1", source="lever", job_id="j1", status="approved")
+    monkeypatch.setattr(worker, "_db_call", lambda fn, cid: row if cid == "cp1" else None)
+
+    class FakeScheduler:
+        def __init__(self, status):
+            self.status, self.calls = status, []
+
+        async def resume(self, checkpoint_id, site, job_id):
+            self.calls.append((checkpoint_id, site, job_id))
+            return SimpleNamespace(status=self.status, site=site, error=self.status,
+                                   waited_seconds=0.0, timings=None)
+
+    async def run(status, checkpoint_id="cp1"):
+        return await worker.handle_resume({"checkpoint_id": checkpoint_id}, FakeScheduler(status))
+
+    assert asyncio.run(run("submitted"))["status"] == "submitted"
+    with pytest.raises(Defer):
+        asyncio.run(run("quota_exceeded"))
+    for status in ("blocked", "failed"):
+        with pytest.raises(Discard):
+            asyncio.run(run(status))
+    with pytest.raises(Discard):
+        asyncio.run(run("submitted", "missing"))